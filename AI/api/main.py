@@ -7,26 +7,48 @@ Uses: db_loader, rag_system, role_based_agent
 Port: 8001
 Endpoints:
   - POST /chat
-  - GET /health
+  - POST /chat/stream (Server-Sent Events)
+  - POST /chat/batch (NDJSON, one line per item as it finishes)
+  - GET /health (liveness)
+  - GET /ready (readiness + startup-time breakdown)
   - GET /statistics/technologies
+
+Agent turns are blocking (LLM + MySQL + ChromaDB), so /chat runs them on
+AgentWorkerPool instead of the event loop and returns 503 when saturated.
+
+The heavy components (DB pool, ChromaDB, embedding model, LangChain agent)
+are imported and built by a background warm-up task once the server is
+listening. /ready returns 503 until warm-up finishes; the chat endpoints
+return 503 with Retry-After until the agent is built.
 """
 
+import time
+
+_import_started = time.perf_counter()
+
 import sys
 import os
+import json
+import asyncio
 from typing import List, Optional
 
 # Add parent directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 
-# Import our modules
+# Import our modules (light ones only; RAGSystem and the agent pull in
+# chromadb/torch/langchain and are imported during warm-up)
 from chatbot.db_loader import DatabaseLoader
-from chatbot.rag_system import RAGSystem
-from chatbot.role_based_agent import InternHubAgent
+from chatbot.async_db_loader import AsyncDatabaseLoader
+from chatbot.answer_cache import SemanticAnswerCache
+from api.worker_pool import AgentWorkerPool, PoolSaturatedError
+from api.startup import StartupTracker
 
 # ==================== FASTAPI APP ====================
 app = FastAPI(
@@ -45,21 +67,118 @@ app.add_middleware(
 )
 
 # ==================== GLOBAL INSTANCES ====================
-try:
-    db = DatabaseLoader()
-    rag = RAGSystem(persist_directory=os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), 
-        "..", 
-        "chatbot", 
-        "chroma_db"
-    ))
-    agent = InternHubAgent(db, rag)
-    print(" All modules initialized successfully")
-except Exception as e:
-    print(f" Error initializing modules: {e}")
-    db = None
-    rag = None
-    agent = None
+# Filled in by warm_up(); None until their step is ready
+db = None
+rag = None
+agent = None
+answer_cache = None
+async_db = None
+
+# Dedicated threads for agent turns (see worker_pool.py for env config)
+agent_pool = AgentWorkerPool()
+
+# Steps /ready waits for; "llm" (optional ping, LLM_WARMUP=1) is reported only
+READY_STEPS = ("database", "rag_store", "embedding_model", "agent")
+startup_tracker = StartupTracker(started=_import_started)
+startup_tracker.record("app_import", round((time.perf_counter() - _import_started) * 1000, 1))
+startup_tracker.pending(*READY_STEPS)
+_warm_up_task = None
+
+CHROMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chatbot", "chroma_db")
+
+
+def _build_agent():
+    """Import LangChain and build the agent (runs on a worker thread)."""
+    global agent, answer_cache
+    from chatbot.role_based_agent import InternHubAgent
+
+    # Semantic answer cache for repeated questions (ANSWER_CACHE_ENABLED=0 disables)
+    cache = None
+    if os.getenv("ANSWER_CACHE_ENABLED", "1") != "0":
+        cache = SemanticAnswerCache(rag.embed_query, normalize_fn=rag.normalize_query)
+    answer_cache = cache
+    agent = InternHubAgent(db, rag, answer_cache=cache)
+
+
+def _build_rag():
+    global rag
+    from chatbot.rag_system import RAGSystem
+
+    rag = RAGSystem(persist_directory=CHROMA_DIR)
+
+
+async def _run_step(name: str, fn):
+    with startup_tracker.step(name):
+        await run_in_threadpool(fn)
+
+
+async def warm_up():
+    """Build the heavy components off the request path, recording timings."""
+    global db
+    try:
+        with startup_tracker.step("database"):
+            db = await run_in_threadpool(DatabaseLoader)
+        await _connect_async_db()
+        await _run_step("rag_store", _build_rag)
+        # Model load (torch) and agent build (langchain) are independent
+        results = await asyncio.gather(
+            _run_step("embedding_model", rag.warm_up),
+            _run_step("agent", _build_agent),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    except Exception as e:
+        print(f" Error initializing modules: {e}")
+        return
+
+    startup_tracker.finish()
+    breakdown = ", ".join(
+        f"{name} {step['ms']:.0f} ms" for name, step in startup_tracker.report()["steps"].items()
+        if step["ms"] is not None
+    )
+    print(f" All modules initialized in {startup_tracker.finished_ms:.0f} ms ({breakdown})")
+
+    # Build the skill index now rather than on the first skill question
+    if db.skill_index is not None:
+        try:
+            await _run_step("skill_index", db.skill_index.ensure_fresh)
+        except Exception as e:
+            print(f"  Skill index build failed: {e}")
+
+    # Optional: open the LLM connection before the first user turn
+    if os.getenv("LLM_WARMUP", "0") == "1":
+        try:
+            await _run_step("llm", agent.warm_up_llm)
+        except Exception as e:
+            print(f"  LLM warm-up failed: {e}")
+
+
+async def _connect_async_db():
+    """Async DB access for the statistics endpoints; falls back to the sync
+    loader in a threadpool if aiomysql is unavailable."""
+    global async_db
+    try:
+        with startup_tracker.step("async_db"):
+            loader = AsyncDatabaseLoader(cache=db.cache, skill_index=db.skill_index)
+            await loader.connect()
+        async_db = loader
+        print(" Async database pool ready")
+    except Exception as e:
+        print(f"  Async database pool unavailable, using threadpool fallback: {e}")
+
+
+def _service_unavailable(component: str) -> HTTPException:
+    """503 for a component that is still warming up (retryable) or failed."""
+    if startup_tracker.has_failed(READY_STEPS):
+        return HTTPException(status_code=503, detail=f"{component} not initialized")
+    return HTTPException(
+        status_code=503,
+        detail=f"{component} is starting up",
+        headers={"Retry-After": "5"},
+    )
+
 
 # ==================== REQUEST/RESPONSE MODELS ====================
 class ChatRequest(BaseModel):
@@ -86,6 +205,40 @@ class ChatResponse(BaseModel):
     intent: str
     user_id: Optional[int] = None
     timestamp: Optional[str] = None
+    cached: bool = False
+
+
+class BatchItem(BaseModel):
+    """One question in a /chat/batch request."""
+    message: str
+    user_role: str  # seeker, company, university
+    user_id: Optional[int] = None
+    id: Optional[str] = None  # caller's key, echoed back with the result
+
+
+class BatchRequest(BaseModel):
+    """Many questions answered with bounded concurrency."""
+    items: List[BatchItem]
+    concurrency: Optional[int] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"id": "uni-1", "message": "What is the skills gap?", "user_role": "university"},
+                    {"id": "co-7", "message": "How many React developers are there?", "user_role": "company"},
+                ],
+                "concurrency": 2,
+            }
+        }
+
+
+# Batch limits: concurrent items per batch (defaults to half the agent
+# workers so interactive /chat keeps capacity) and items per request
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", max(1, agent_pool.max_workers // 2)))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 500))
+
+VALID_ROLES = ["seeker", "company", "university"]
 
 
 # ==================== ENDPOINTS ====================
@@ -102,7 +255,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health status."""
+    """Liveness and detailed status; answers while components are still warming up."""
     try:
         posts_count = rag.get_posts_count() if rag else 0
         seekers_count = rag.get_seekers_count() if rag else 0
@@ -110,10 +263,17 @@ async def health_check():
         return {
             "status": "healthy",
             "database": "connected" if db else "disconnected",
+            "db_pool": db.get_pool_statistics() if db else None,
+            "async_db_pool": async_db.get_pool_statistics() if async_db else None,
+            "query_cache": db.get_cache_statistics() if db else None,
+            "skill_index": db.get_skill_index_statistics() if db else None,
             "rag": "ready" if rag else "not_ready",
+            "rag_index": rag.index_status if rag else None,
             "agent": "ready" if agent else "not_ready",
             "posts_indexed": posts_count,
             "seekers_indexed": seekers_count,
+            "agent_pool": agent_pool.get_statistics(),
+            "ready": startup_tracker.is_ready(READY_STEPS),
         }
     except Exception as e:
         return {
@@ -122,6 +282,19 @@ async def health_check():
         }
 
 
+@app.get("/ready")
+async def readiness():
+    """Readiness: 200 once every component is warmed up, else 503.
+
+    Includes the startup-time breakdown (per-step status and milliseconds).
+    """
+    ready = startup_tracker.is_ready(READY_STEPS)
+    body = {"ready": ready, "startup": startup_tracker.report()}
+    if rag:
+        body["rag_load_times"] = rag.load_times
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -135,25 +308,35 @@ async def chat(request: ChatRequest):
     
     Returns:
       - response: Natural language response
-      - intent: Classified intent (top_technologies, company_hiring, etc.)
+      - intent: Fast-path intent that answered (top_technologies,
+        count_developers, ...) or "tool_based" when the agent did
     """
     try:
         # Validate inputs
         if not request.message or not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        if request.user_role not in ["seeker", "company", "university"]:
+        if request.user_role not in VALID_ROLES:
             raise HTTPException(status_code=400, detail="Invalid user_role. Must be: seeker, company, or university")
         
         if not agent or not db or not rag:
-            raise HTTPException(status_code=503, detail="Chatbot service not initialized")
+            raise _service_unavailable("Chatbot service")
         
-        # Get response from agent
-        result = agent.get_response(
-            query=request.message.strip(),
-            role=request.user_role,
-            history=request.conversation_history or []
-        )
+        # Get response from agent (runs on a worker thread, not the event loop)
+        try:
+            result = await agent_pool.run(
+                agent.get_response,
+                query=request.message.strip(),
+                role=request.user_role,
+                history=request.conversation_history or [],
+                session_id=request.user_id,
+            )
+        except PoolSaturatedError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
         
         # Format response
         from datetime import datetime
@@ -161,7 +344,8 @@ async def chat(request: ChatRequest):
             response=result.get("response", ""),
             intent=result.get("intent", "general"),
             user_id=request.user_id,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            cached=result.get("cached", False),
         )
         
         return response
@@ -173,6 +357,170 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    
+    Same request body, validation and status codes as /chat; once the stream
+    starts, progress is sent as events:
+      - tool_start / tool_end: agent tool calls
+      - token: LLM output as it is generated
+      - done: final response, intent, user_id and timestamp
+      - error: the turn failed
+    """
+    if not request.message or not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    if request.user_role not in VALID_ROLES:
+        raise HTTPException(status_code=400, detail="Invalid user_role. Must be: seeker, company, or university")
+    
+    if not agent or not db or not rag:
+        raise _service_unavailable("Chatbot service")
+    
+    try:
+        events = await agent_pool.stream(
+            agent.stream_response,
+            query=request.message.strip(),
+            role=request.user_role,
+            history=request.conversation_history or [],
+            session_id=request.user_id,
+        )
+    except PoolSaturatedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    
+    async def event_source():
+        from datetime import datetime
+        try:
+            async for item in events:
+                data = item["data"]
+                if item["event"] == "done":
+                    data = {**data, "user_id": request.user_id, "timestamp": datetime.now().isoformat()}
+                yield _sse(item["event"], data)
+        except Exception as e:
+            print(f" Error in /chat/stream: {str(e)}")
+            yield _sse("error", {"detail": f"Server error: {str(e)}"})
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/chat/batch")
+async def chat_batch(request: BatchRequest):
+    """
+    Batch chat endpoint (e.g. pre-generated weekly digests).
+    
+    Items run through the agent worker pool, at most `concurrency` at a time
+    (capped by BATCH_MAX_CONCURRENCY); identical questions for the same role
+    are answered once. All items share the answer cache, the query-embedding
+    LRU, the DB aggregate cache and one tool-result memo.
+    
+    Returns NDJSON: one line per item as soon as it finishes
+    ({index, id, user_id, response, intent, cached, error}), then a summary
+    line with "done": true.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch has no items")
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large (max {BATCH_MAX_ITEMS} items)")
+    for index, item in enumerate(request.items):
+        if not item.message or not item.message.strip():
+            raise HTTPException(status_code=400, detail=f"Item {index}: message cannot be empty")
+        if item.user_role not in VALID_ROLES:
+            raise HTTPException(status_code=400, detail=f"Item {index}: invalid user_role")
+    
+    if not agent or not db or not rag:
+        raise _service_unavailable("Chatbot service")
+    
+    from uuid import uuid4
+    concurrency = max(1, min(request.concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    slots = asyncio.Semaphore(concurrency)
+    session_id = f"batch:{uuid4().hex}"
+    
+    # Same role + same normalized question -> answered once
+    groups = {}
+    for index, item in enumerate(request.items):
+        groups.setdefault((item.user_role, rag.normalize_query(item.message)), []).append(index)
+    
+    async def answer(indices):
+        item = request.items[indices[0]]
+        async with slots:
+            while True:
+                try:
+                    result = await agent_pool.run(
+                        agent.get_response,
+                        query=item.message.strip(),
+                        role=item.user_role,
+                        history=[],
+                        session_id=session_id,
+                    )
+                    return indices, result, None
+                except PoolSaturatedError as e:
+                    # Batches wait for capacity instead of failing
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:
+                    return indices, None, f"Server error: {str(e)}"
+    
+    async def lines():
+        started = time.perf_counter()
+        failed = 0
+        tasks = [asyncio.create_task(answer(indices)) for indices in groups.values()]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                indices, result, error = await finished
+                if error is None and result.get("intent") == "error":
+                    error = result.get("response")
+                for index in indices:
+                    item = request.items[index]
+                    failed += error is not None
+                    yield json.dumps({
+                        "index": index,
+                        "id": item.id,
+                        "user_id": item.user_id,
+                        "response": result.get("response", "") if result else "",
+                        "intent": result.get("intent", "general") if result else "error",
+                        "cached": result.get("cached", False) if result else False,
+                        "error": error,
+                    }) + "\n"
+            yield json.dumps({
+                "done": True,
+                "items": len(request.items),
+                "unique_questions": len(groups),
+                "failed": failed,
+                "elapsed_s": round(time.perf_counter() - started, 2),
+            }) + "\n"
+        finally:
+            # Client went away: don't keep queueing agent turns for it
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/chat/stats")
+async def chat_stats():
+    """Agent worker pool, answer cache, LLM provider, fast-path and tool statistics."""
+    return {
+        "agent_pool": agent_pool.get_statistics(),
+        "answer_cache": answer_cache.get_statistics() if answer_cache else None,
+        "llm": agent.llm_router.get_statistics() if agent else None,
+        "intent_router": agent.intent_router.get_statistics() if agent and agent.intent_router else None,
+        "tools": agent.tool_runner.get_statistics() if agent else None,
+    }
+
+
 @app.get("/statistics/technologies")
 async def get_technology_stats():
     """Get top technologies by demand."""
@@ -180,7 +528,10 @@ async def get_technology_stats():
         if not db:
             raise HTTPException(status_code=503, detail="Database not available")
         
-        stats = db.get_top_technologies(limit=10)
+        if async_db:
+            stats = await async_db.get_top_technologies(limit=10)
+        else:
+            stats = await run_in_threadpool(db.get_top_technologies, limit=10)
         return {
             "technologies": stats,
             "total": len(stats)
@@ -196,7 +547,10 @@ async def get_skill_stats():
         if not db:
             raise HTTPException(status_code=503, detail="Database not available")
         
-        stats = db.get_skill_distribution(limit=15)
+        if async_db:
+            stats = await async_db.get_skill_distribution(limit=15)
+        else:
+            stats = await run_in_threadpool(db.get_skill_distribution, limit=15)
         return {
             "skills": stats,
             "total": len(stats)
@@ -205,6 +559,14 @@ async def get_skill_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/cache/invalidate")
+async def invalidate_cache(name: Optional[str] = None):
+    """Drop cached market aggregates, e.g. after bulk post/skill changes."""
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not available")
+    return {"invalidated": db.invalidate_cache(name)}
+
+
 @app.get("/rag/stats")
 async def rag_stats():
     """RAG system statistics."""
@@ -219,13 +581,28 @@ async def rag_stats():
 
 
 # ==================== STARTUP/SHUTDOWN ====================
+@app.on_event("startup")
+async def startup():
+    """Start warming up in the background so the server listens right away."""
+    global _warm_up_task
+    _warm_up_task = asyncio.create_task(warm_up())
+
+
 @app.on_event("shutdown")
 async def shutdown():
     """Cleanup on shutdown."""
+    if _warm_up_task and not _warm_up_task.done():
+        _warm_up_task.cancel()
+    agent_pool.shutdown()
+    if agent:
+        agent.llm_router.shutdown()
+        agent.tool_runner.shutdown()
     try:
+        if async_db:
+            await async_db.close()
         if db:
             db.close()
-            print(" Database connection closed")
+            print(" Database connection pool closed")
     except Exception as e:
         print(f"  Error during shutdown: {e}")
 
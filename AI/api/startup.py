@@ -0,0 +1,78 @@
+"""
+Startup tracking for the chatbot API.
+
+The heavy components (DB pool, ChromaDB store, embedding model, LangChain
+agent) are built in the background after the server starts listening, so
+liveness (/health) answers immediately while readiness (/ready) waits for
+them. StartupTracker records each warm-up step's state and duration for a
+startup-time breakdown.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+
+class StartupTracker:
+    """Per-component warm-up state (pending/loading/ready/failed) and timings."""
+
+    def __init__(self, started: Optional[float] = None):
+        # perf_counter() at module import, so the breakdown covers app import too
+        self.started = started if started is not None else time.perf_counter()
+        self._steps: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.finished_ms: Optional[float] = None
+
+    def _elapsed_ms(self, since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 1)
+
+    def record(self, name: str, ms: float, status: str = "ready"):
+        """Record a step that was timed elsewhere (e.g. app import)."""
+        with self._lock:
+            self._steps[name] = {"status": status, "ms": ms, "error": None}
+
+    def pending(self, *names: str):
+        with self._lock:
+            for name in names:
+                self._steps.setdefault(name, {"status": "pending", "ms": None, "error": None})
+
+    @contextmanager
+    def step(self, name: str):
+        """Time a warm-up step; exceptions mark it failed and propagate."""
+        with self._lock:
+            self._steps[name] = {"status": "loading", "ms": None, "error": None}
+        began = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self._steps[name] = {"status": "failed", "ms": self._elapsed_ms(began), "error": str(e)}
+            raise
+        with self._lock:
+            self._steps[name] = {"status": "ready", "ms": self._elapsed_ms(began), "error": None}
+
+    def finish(self):
+        self.finished_ms = self._elapsed_ms(self.started)
+
+    def status(self, name: str) -> str:
+        with self._lock:
+            return self._steps.get(name, {}).get("status", "pending")
+
+    def is_ready(self, required: Iterable[str]) -> bool:
+        return all(self.status(name) == "ready" for name in required)
+
+    def has_failed(self, required: Iterable[str]) -> bool:
+        return any(self.status(name) == "failed" for name in required)
+
+    def report(self) -> Dict:
+        """Step states/timings and total time to ready (None while warming up)."""
+        with self._lock:
+            return {
+                "steps": {name: dict(step) for name, step in self._steps.items()},
+                "total_ms": self.finished_ms,
+                "uptime_s": round(time.perf_counter() - self.started, 1),
+            }
+
+
+__all__ = ["StartupTracker"]
@@ -0,0 +1,197 @@
+"""
+Bounded worker pool for blocking agent turns.
+
+The LangChain agent, pymysql and ChromaDB are all synchronous, so running
+them directly inside an `async def` endpoint blocks the event loop for the
+whole turn. AgentWorkerPool runs that work on a dedicated thread pool with a
+concurrency limit and a bounded admission queue, so the loop stays free for
+other requests (including /health) and overload is rejected quickly instead
+of piling up.
+
+Config (env):
+  - AGENT_MAX_WORKERS: concurrent agent turns (default 4)
+  - AGENT_MAX_QUEUE: turns allowed to wait for a worker (default 16)
+  - AGENT_QUEUE_TIMEOUT: seconds a turn may wait for a worker (default 15)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+_END = object()
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a turn cannot be admitted (queue full or wait timed out)."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AgentWorkerPool:
+    """Runs blocking callables on a thread pool with admission control."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        self.max_workers = max_workers or int(os.getenv("AGENT_MAX_WORKERS", 4))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("AGENT_MAX_QUEUE", 16))
+        self.queue_timeout = queue_timeout or float(os.getenv("AGENT_QUEUE_TIMEOUT", 15))
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="agent-worker"
+        )
+        self._slots = asyncio.Semaphore(self.max_workers)
+
+        # Counters are only touched from the event loop thread
+        self._waiting = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on a worker thread and await its result.
+
+        Raises:
+            PoolSaturatedError: if the admission queue is full or no worker
+                                frees up within `queue_timeout` seconds.
+        """
+        await self._admit()
+
+        future = self._submit(partial(fn, *args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, gen_fn: Callable[..., Iterator], *args, **kwargs) -> AsyncIterator:
+        """Run a blocking generator on a worker thread and relay its items.
+
+        Admission happens here (so callers can still turn PoolSaturatedError
+        into an HTTP error before a streaming response starts); the returned
+        async iterator yields items as the thread produces them. If the
+        consumer stops early (client disconnected) the thread stops at the
+        next item.
+        """
+        await self._admit()
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def post(item, error=None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                stop.set()  # event loop already closed
+
+        def produce():
+            try:
+                for item in gen_fn(*args, **kwargs):
+                    if stop.is_set():
+                        break
+                    post(item)
+            except BaseException as e:
+                post(_END, e)
+                raise
+            post(_END)
+
+        self._submit(produce)
+
+        async def relay():
+            try:
+                while True:
+                    item, error = await queue.get()
+                    if item is _END:
+                        if error is not None:
+                            raise error
+                        return
+                    yield item
+            finally:
+                stop.set()
+
+        return relay()
+
+    async def _admit(self):
+        """Wait for a free worker slot, rejecting when the queue is full."""
+        if self._waiting + self._active >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise PoolSaturatedError("Chatbot is busy, too many queued requests")
+
+        self._waiting += 1
+        enqueued = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise PoolSaturatedError(
+                "Chatbot is busy, timed out waiting for a worker",
+                retry_after=int(self.queue_timeout),
+            )
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - enqueued
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def _submit(self, fn: Callable[[], Any]):
+        """Start `fn` on a worker thread in the slot taken by _admit()."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._active += 1
+        try:
+            future = self._executor.submit(fn)
+        except BaseException:
+            # e.g. RuntimeError after shutdown(): no callback will free the slot
+            self._active -= 1
+            self._slots.release()
+            raise
+        # Free the slot when the thread really finishes, even if the
+        # awaiting request was cancelled (client disconnected).
+        future.add_done_callback(
+            lambda f: loop.call_soon_threadsafe(self._release, f, started)
+        )
+        return future
+
+    def _release(self, future, started: float):
+        self._active -= 1
+        self._total_run += time.perf_counter() - started
+        if future.cancelled() or future.exception() is not None:
+            self._failed += 1
+        else:
+            self._completed += 1
+        self._slots.release()
+
+    def get_statistics(self) -> Dict:
+        """Queue depth, in-flight turns and wait/run times."""
+        finished = self._completed + self._failed
+        admitted = finished + self._active
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._total_wait / admitted * 1000, 2) if admitted else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+            "avg_run_ms": round(self._total_run / finished * 1000, 2) if finished else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop accepting work; running turns are left to finish."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ["AgentWorkerPool", "PoolSaturatedError"]
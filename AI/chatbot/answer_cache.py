@@ -0,0 +1,191 @@
+"""
+Semantic answer cache for /chat.
+
+Many chat turns are near-identical questions ("what technologies are
+trending?") that would each pay a full multi-step agent run. The cache
+stores finished answers per user role and serves a new question when its
+embedding is close enough (cosine similarity >= threshold) to a cached one
+asked by the same role.
+
+Similar is not the same question: "jobs for Java" and "jobs for JavaScript"
+or "top 5" and "top 10" embed above the threshold. A semantic hit therefore
+also needs the same signature: the technologies named (canonical spellings,
+terms_fn), the numbers and whether the question is negated.
+
+Answers are only valid for the data they were computed from: every lookup
+passes the current DB data version and the whole cache is dropped when it
+changes. Size is bounded with LRU eviction.
+
+Config (env):
+  - ANSWER_CACHE_SIZE: max cached answers across roles (default 512)
+  - ANSWER_CACHE_THRESHOLD: min cosine similarity for a hit (default 0.92)
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from chatbot.intent_router import QUALIFIERS
+from chatbot.lexical_index import tokenize
+from chatbot.skill_index import SKILL_ALIASES
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_CANONICAL_SKILLS = {name.lower() for name in SKILL_ALIASES.values()}
+
+
+def skill_terms(text: str) -> Iterable[str]:
+    """Canonical skills named in `text` (used when no IntentRouter vocabulary is wired in)."""
+    return {token for token in tokenize(text) if token in _CANONICAL_SKILLS}
+
+
+class SemanticAnswerCache:
+    """Role-scoped, embedding-matched, data-versioned answer cache."""
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], List[float]],
+        normalize_fn: Callable[[str], str] = lambda text: " ".join(text.lower().split()),
+        max_size: Optional[int] = None,
+        threshold: Optional[float] = None,
+        terms_fn: Optional[Callable[[str], Iterable[str]]] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.normalize_fn = normalize_fn
+        # Technologies named in a question; InternHubAgent wires in its IntentRouter
+        self.terms_fn = terms_fn
+        self.max_size = max_size or int(os.getenv("ANSWER_CACHE_SIZE", 512))
+        self.threshold = threshold or float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+
+        # (role, normalized question) -> entry, in LRU order
+        self._entries: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+
+        self._hits = 0
+        self._exact_hits = 0
+        self._misses = 0
+        self._signature_misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._latency_saved = 0.0
+
+    def _signature(self, question: str) -> tuple:
+        """What two questions must share for one's answer to serve the other."""
+        text = " ".join(question.lower().replace("\u2019", "'").split())
+        terms = (self.terms_fn or skill_terms)(text)
+        negated = QUALIFIERS["negation"].search(text) is not None
+        return frozenset(t.lower() for t in terms), frozenset(_NUMBER.findall(text)), negated
+
+    def _sync_version(self, data_version):
+        """Drop everything when the underlying posts/seekers data changed."""
+        if data_version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._version = data_version
+
+    def lookup(self, role: str, question: str, data_version) -> Optional[Dict]:
+        """Cached answer for a similar question from the same role, or None.
+
+        Returns:
+            Dict with 'response', 'intent', 'similarity' and 'matched_question'.
+        """
+        key = (role, self.normalize_fn(question))
+        with self._lock:
+            self._sync_version(data_version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._exact_hits += 1
+                self._latency_saved += entry["latency"]
+                return self._hit(entry, 1.0)
+            candidates = [(k, e) for k, e in self._entries.items() if k[0] == role]
+
+        if candidates:
+            signature = self._signature(question)
+            matching = [(k, e) for k, e in candidates if e["signature"] == signature]
+            if not matching:
+                with self._lock:
+                    self._signature_misses += 1
+            candidates = matching
+        if not candidates:
+            with self._lock:
+                self._misses += 1
+            return None
+
+        # Vectors are L2-normalized, so a dot product is cosine similarity
+        query_vector = np.asarray(self.embed_fn(question), dtype=np.float32)
+        matrix = np.stack([e["vector"] for _, e in candidates])
+        scores = matrix @ query_vector
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+
+        with self._lock:
+            best_key, entry = candidates[best]
+            if similarity < self.threshold or best_key not in self._entries or data_version != self._version:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self._hits += 1
+            self._latency_saved += entry["latency"]
+            return self._hit(entry, similarity)
+
+    @staticmethod
+    def _hit(entry: Dict, similarity: float) -> Dict:
+        return {
+            "response": entry["response"],
+            "intent": entry["intent"],
+            "similarity": round(similarity, 4),
+            "matched_question": entry["question"],
+        }
+
+    def store(self, role: str, question: str, response: str, intent: str, latency: float, data_version):
+        """Remember a finished answer and how long it took to produce."""
+        key = (role, self.normalize_fn(question))
+        vector = np.asarray(self.embed_fn(question), dtype=np.float32)
+        signature = self._signature(question)
+        with self._lock:
+            self._sync_version(data_version)
+            self._entries[key] = {
+                "question": question,
+                "vector": vector,
+                "signature": signature,
+                "response": response,
+                "intent": intent,
+                "latency": latency,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def get_statistics(self) -> Dict:
+        """Hit rate, size and total agent time saved."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "hits": self._hits,
+                "exact_hits": self._exact_hits,
+                "misses": self._misses,
+                "signature_misses": self._signature_misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "latency_saved_s": round(self._latency_saved, 2),
+            }
+
+
+__all__ = ["SemanticAnswerCache"]
@@ -0,0 +1,268 @@
+"""
+Async variant of DatabaseLoader for `async def` endpoints.
+
+Same query surface and SQL as DatabaseLoader (see db_loader.py), but backed
+by an aiomysql pool so the event loop awaits DB I/O instead of blocking on
+it. Independent queries (demand vs supply, pivot vs free-text skills,
+snapshot counts) are issued concurrently on separate pooled connections.
+
+Given the sync loader's SkillIndex, the skill lookups (technology and
+skill lookups, technology statistics, skill distribution, demand vs supply)
+are answered from it in a worker thread, so both loaders return the same alias-merged results; only
+the SQL fallbacks go through the shared query cache.
+
+Requires the optional `aiomysql` package; it is imported on connect() so the
+rest of the chatbot keeps working without it.
+"""
+
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional
+
+from chatbot.db_loader import (
+    AGGREGATE_CACHE_TTL,
+    AVAILABLE_SEEKERS_WITH_SKILL_SQL,
+    COMPANY_COUNT_BY_TECHNOLOGY_SQL,
+    DATA_VERSION_SQL,
+    PARTNERSHIP_CANDIDATES_SQL,
+    POSTS_BY_IDS_SQL,
+    POSTS_BY_TECHNOLOGY_SQL,
+    POSTS_FOR_INDEX_SQL,
+    SEEKERS_BY_SKILL_PIVOT_SQL,
+    SEEKERS_BY_SKILL_TEXT_SQL,
+    SEEKERS_BY_IDS_SQL,
+    SKILL_DISTRIBUTION_SQL,
+    SKILL_SUPPLY_SQL,
+    SNAPSHOT_TABLES,
+    TECHNOLOGY_DEMAND_SQL,
+    TECHNOLOGY_USAGE_COUNTS_SQL,
+    TOP_TECHNOLOGIES_SQL,
+    combine_demand_supply,
+    connection_settings,
+    format_data_version,
+    merge_seekers,
+    shape_technology_statistics,
+    technology_statistics_params,
+    technology_statistics_sql,
+)
+from chatbot.query_cache import QueryCache, cached_query
+from chatbot.skill_index import SkillIndex
+
+
+class AsyncDatabaseLoader:
+    """Async DB helper with the same methods as DatabaseLoader (awaitable)."""
+
+    def __init__(
+        self,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        recycle: Optional[int] = None,
+        cache: Optional[QueryCache] = None,
+        skill_index: Optional[SkillIndex] = None,
+    ):
+        self.min_size = min_size if min_size is not None else int(os.getenv("DB_POOL_MIN_SIZE", 1))
+        self.max_size = max_size or int(os.getenv("DB_POOL_MAX_SIZE", 10))
+        # Reopen connections before MySQL's wait_timeout (default 8h) drops them
+        self.recycle = recycle or int(os.getenv("DB_POOL_RECYCLE", 3600))
+        self.pool = None
+        self._connect_lock = asyncio.Lock()
+        # Pass DatabaseLoader.cache to share cached aggregates with the sync loader
+        self.cache = cache
+        # Pass DatabaseLoader.skill_index to answer skill lookups like the sync loader
+        self.skill_index = skill_index
+
+    # -------------------- Pool lifecycle --------------------
+    async def connect(self):
+        """Create the aiomysql pool (idempotent)."""
+        async with self._connect_lock:
+            if self.pool is not None:
+                return
+            try:
+                import aiomysql
+            except ImportError as e:
+                raise ImportError(
+                    "AsyncDatabaseLoader needs the aiomysql package (pip install aiomysql)"
+                ) from e
+
+            settings = connection_settings()
+            self.pool = await aiomysql.create_pool(
+                host=settings["host"],
+                port=settings["port"],
+                user=settings["user"],
+                password=settings["password"],
+                db=settings["database"],
+                minsize=self.min_size,
+                maxsize=self.max_size,
+                pool_recycle=self.recycle,
+                autocommit=True,
+                cursorclass=aiomysql.DictCursor,
+            )
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    def get_pool_statistics(self) -> Dict:
+        """Async pool size and free connections."""
+        if self.pool is None:
+            return {"connected": False}
+        return {
+            "connected": True,
+            "min_size": self.pool.minsize,
+            "max_size": self.pool.maxsize,
+            "size": self.pool.size,
+            "idle": self.pool.freesize,
+            "in_use": self.pool.size - self.pool.freesize,
+        }
+
+    # -------------------- Cache / data version --------------------
+    async def get_data_version(self) -> str:
+        """Fingerprint of posts/seekers/skills/companies (counts + last update)."""
+        return format_data_version(await self._fetchone(DATA_VERSION_SQL))
+
+    async def _check_data_version(self):
+        """Re-probe the data version at most once per interval; clears the cache on change."""
+        if self.cache is None or not self.cache.version_check_due():
+            return
+        try:
+            self.cache.update_version(await self.get_data_version())
+        except Exception as e:
+            print(f"  Data version check failed: {e}")
+
+    # -------------------- Generic helpers --------------------
+    async def _fetchall(self, query: str, params: Optional[tuple] = None) -> List[Dict]:
+        if self.pool is None:
+            await self.connect()
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params or ())
+                return list(await cursor.fetchall())
+
+    async def _fetchone(self, query: str, params: Optional[tuple] = None) -> Optional[Dict]:
+        if self.pool is None:
+            await self.connect()
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params or ())
+                return await cursor.fetchone()
+
+    async def _from_index(self, lookup: Callable, *args):
+        """Run a SkillIndex lookup off the event loop (a due refresh queries MySQL)."""
+        return await asyncio.get_running_loop().run_in_executor(None, lookup, *args)
+
+    # -------------------- Content for RAG indexing --------------------
+    async def get_all_posts(self) -> List[Dict]:
+        """Fetch all posts with company info for indexing."""
+        return await self._fetchall(POSTS_FOR_INDEX_SQL)
+
+    # -------------------- Technology demand --------------------
+    @cached_query("top_technologies", ttl=AGGREGATE_CACHE_TTL)
+    async def get_top_technologies(self, limit: int = 10) -> List[Dict]:
+        """Most required technologies ranked by post count."""
+        return await self._fetchall(TOP_TECHNOLOGIES_SQL, (limit,))
+
+    async def get_company_count_by_technology(self, technology: str) -> int:
+        """Number of distinct companies posting for a technology."""
+        if self.skill_index is not None:
+            return await self._from_index(self.skill_index.company_count, technology)
+        row = await self._fetchone(COMPANY_COUNT_BY_TECHNOLOGY_SQL, (f"%{technology}%",))
+        return int(row["companies"] if row else 0)
+
+    async def get_posts_by_technology(self, technology: str, limit: int = 20) -> List[Dict]:
+        """Posts for a given technology with company context."""
+        if self.skill_index is not None:
+            ids = await self._from_index(self.skill_index.recent_posts, technology, limit)
+            if not ids:
+                return []
+            return await self._fetchall(POSTS_BY_IDS_SQL.format(ids=", ".join(["%s"] * len(ids))), tuple(ids))
+        return await self._fetchall(POSTS_BY_TECHNOLOGY_SQL, (f"%{technology}%", limit))
+
+    async def get_technology_statistics(self, *technologies: str) -> Dict:
+        """Post/company counts and market share for one or more technologies (one query)."""
+        if self.skill_index is not None:
+            row = await self._from_index(self.skill_index.technology_counts, technologies)
+            return shape_technology_statistics(technologies, row)
+        return await self._get_technology_statistics_sql(*technologies)
+
+    @cached_query("technology_statistics", ttl=AGGREGATE_CACHE_TTL)
+    async def _get_technology_statistics_sql(self, *technologies: str) -> Dict:
+        row = await self._fetchone(
+            technology_statistics_sql(len(technologies)),
+            technology_statistics_params(technologies),
+        )
+        return shape_technology_statistics(technologies, row)
+
+    # -------------------- Seeker supply --------------------
+    async def get_seekers_by_skill(self, skill_name: str, limit: int = 25) -> List[Dict]:
+        """Seekers whose skills include the given term (pivot + free-text, concurrently)."""
+        if self.skill_index is not None:
+            ids = sorted(await self._from_index(self.skill_index.seekers_with, skill_name))[:limit]
+            if not ids:
+                return []
+            return await self._fetchall(SEEKERS_BY_IDS_SQL.format(ids=", ".join(["%s"] * len(ids))), tuple(ids))
+        pivot_rows, text_rows = await asyncio.gather(
+            self._fetchall(SEEKERS_BY_SKILL_PIVOT_SQL, (f"%{skill_name}%", limit)),
+            self._fetchall(SEEKERS_BY_SKILL_TEXT_SQL, (f"%{skill_name}%", limit)),
+        )
+        return merge_seekers(pivot_rows, text_rows, limit)
+
+    async def count_available_seekers_with_skill(self, skill_name: str) -> int:
+        """Count seekers with a skill who are not in accepted applications."""
+        if self.skill_index is not None:
+            return await self._from_index(self.skill_index.count_available_seekers, skill_name)
+        row = await self._fetchone(
+            AVAILABLE_SEEKERS_WITH_SKILL_SQL, (f"%{skill_name}%", f"%{skill_name}%")
+        )
+        return int(row["available"] if row else 0)
+
+    async def get_skill_distribution(self, limit: int = 15) -> List[Dict]:
+        """Top skills by seeker count (active skills only without the skill index)."""
+        if self.skill_index is not None:
+            return await self._from_index(self.skill_index.skill_distribution, limit)
+        return await self._get_skill_distribution_sql(limit)
+
+    @cached_query("skill_distribution", ttl=AGGREGATE_CACHE_TTL)
+    async def _get_skill_distribution_sql(self, limit: int) -> List[Dict]:
+        return await self._fetchall(SKILL_DISTRIBUTION_SQL, (limit,))
+
+    # -------------------- Demand vs supply for universities --------------------
+    async def get_demand_supply_gap(self, limit: int = 15) -> List[Dict]:
+        """Compare company demand (posts) vs seeker supply (skills), queried concurrently."""
+        if self.skill_index is not None:
+            return await self._from_index(self.skill_index.demand_supply_gap, limit)
+        return await self._get_demand_supply_gap_sql(limit)
+
+    @cached_query("demand_supply_gap", ttl=AGGREGATE_CACHE_TTL)
+    async def _get_demand_supply_gap_sql(self, limit: int) -> List[Dict]:
+        demand, supply = await asyncio.gather(
+            self._fetchall(TECHNOLOGY_DEMAND_SQL),
+            self._fetchall(SKILL_SUPPLY_SQL),
+        )
+        return combine_demand_supply(demand, supply, limit)
+
+    # -------------------- Partnership candidates for universities --------------------
+    @cached_query("partnership_candidates", ttl=AGGREGATE_CACHE_TTL)
+    async def get_partnership_candidates(self, limit: int = 20) -> List[Dict]:
+        """Verified companies with active posts and their tech/position coverage."""
+        return await self._fetchall(PARTNERSHIP_CANDIDATES_SQL, (limit,))
+
+    # -------------------- Technology statistics helpers --------------------
+    @cached_query("technology_usage_counts", ttl=AGGREGATE_CACHE_TTL)
+    async def get_technology_usage_counts(self) -> List[Dict]:
+        """Counts of posts per technology with company coverage."""
+        return await self._fetchall(TECHNOLOGY_USAGE_COUNTS_SQL)
+
+    async def get_statistics_snapshot(self) -> Dict:
+        """High-level snapshot for health endpoints (all counts in parallel)."""
+        rows = await asyncio.gather(
+            *(self._fetchone(f"SELECT COUNT(*) AS n FROM {table}") for table in SNAPSHOT_TABLES)
+        )
+        return {
+            table: int(row["n"]) if row else 0
+            for table, row in zip(SNAPSHOT_TABLES, rows)
+        }
+
+
+__all__ = ["AsyncDatabaseLoader"]
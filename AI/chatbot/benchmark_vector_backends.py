@@ -0,0 +1,173 @@
+"""
+Benchmark the RAG vector backends: query latency and recall@k.
+
+Indexes the same clustered, unit-length synthetic embeddings (with a
+'technology' metadata field) into each backend and runs the same queries,
+unfiltered and with a `where` filter. Recall@k is measured against exact
+brute-force results, so the float NumPy backend should report 1.0 and
+Chroma (HNSW) shows what its approximation costs.
+
+Backends: chroma, numpy, and numpy-int8 once per --rerank-factors value
+(int8 codes + float re-ranking). 'scan MB' is the matrix each query scans
+and 'resident MB' what the index keeps in memory. The NumPy stores are
+in memory unless --store-dir is given, and an in-memory int8 store keeps
+the float matrix for re-ranking too; memory-map them (as RAG_STORE=
+persistent does) to see int8 shrink the resident index. The NumPy
+backends index 'technology' (as RAGSystem does for post metadata), so
+filtered queries resolve their candidate rows from the value sets and score
+only those; pass --no-filter-index to compare against a row-by-row scan.
+
+Usage:
+    python benchmark_vector_backends.py
+    python benchmark_vector_backends.py --docs 50000 --queries 500 --k 10
+    python benchmark_vector_backends.py --backends numpy,numpy-int8 --rerank-factors 1,2,4,8
+    python benchmark_vector_backends.py --backends numpy,numpy-int8 --store-dir /tmp/bench
+"""
+
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+
+# Add parent directory to path (so `chatbot.*` imports resolve like in the API)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.rag_system import EMBEDDING_DIM
+from chatbot.vector_backends import BACKENDS, NumpyVectorStore
+
+WRITE_BATCH = 1000
+
+
+def synthetic_corpus(docs: int, queries: int, dim: int, clusters: int, technologies: int, seed: int):
+    """Clustered unit vectors (like real embeddings, not uniform noise) plus metadata."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def sample(n):
+        vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    vectors = sample(docs)
+    ids = [f"post_{i}" for i in range(docs)]
+    metadatas = [{"technology": f"tech_{i % technologies}"} for i in range(docs)]
+    return ids, vectors, metadatas, sample(queries)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, mask=None):
+    """Ground truth: indices of the k most similar rows per query."""
+    scores = queries @ vectors.T
+    if mask is not None:
+        scores[:, ~mask] = -np.inf
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def open_collection(backend: str, dim: int, rerank_factor: int, indexed_fields=(), store_dir=None):
+    if backend in ("numpy", "numpy-int8"):
+        quantize = "int8" if backend == "numpy-int8" else "none"
+        directory = os.path.join(store_dir, f"{backend}_{rerank_factor}") if store_dir else None
+        store = NumpyVectorStore(
+            directory, dim, quantize=quantize, rerank_factor=rerank_factor, indexed_fields=indexed_fields
+        )
+        store.delete_collection("benchmark")  # left over from a previous run
+        return store.create_collection("benchmark")
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.Client(Settings(anonymized_telemetry=False))
+    return client.create_collection("benchmark", embedding_function=None)
+
+
+def run_backend(backend: str, ids, vectors, metadatas, queries, k: int, where, truth, filtered_truth, rerank_factor=4, indexed_fields=(), store_dir=None):
+    collection = open_collection(backend, vectors.shape[1], rerank_factor, indexed_fields, store_dir)
+
+    started = time.perf_counter()
+    for start in range(0, len(ids), WRITE_BATCH):
+        end = start + WRITE_BATCH
+        collection.add(
+            ids=ids[start:end],
+            documents=ids[start:end],
+            metadatas=metadatas[start:end],
+            embeddings=vectors[start:end].tolist(),
+        )
+    index_s = time.perf_counter() - started
+
+    numpy_backend = hasattr(collection, "memory_bytes")
+    scan_mb = collection.scan_bytes() / (1024 * 1024) if numpy_backend else None
+    resident_mb = collection.memory_bytes() / (1024 * 1024) if numpy_backend else None
+    report = {"backend": backend, "index_s": index_s, "scan_mb": scan_mb, "resident_mb": resident_mb}
+    for label, filter_clause, expected in (("all", None, truth), ("filtered", where, filtered_truth)):
+        latencies = []
+        hits = 0
+        for query, relevant in zip(queries, expected):
+            started = time.perf_counter()
+            result = collection.query(query_embeddings=[query.tolist()], n_results=k, where=filter_clause)
+            latencies.append(time.perf_counter() - started)
+            found = {int(doc_id.split("_")[1]) for doc_id in result["ids"][0]}
+            hits += len(found & set(relevant.tolist()))
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        report[label] = {"p50_ms": p50, "p95_ms": p95, "recall": hits / (len(queries) * k)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare RAG vector backends (latency, recall@k)")
+    parser.add_argument("--docs", type=int, default=20000, help="documents to index")
+    parser.add_argument("--queries", type=int, default=200, help="queries to time")
+    parser.add_argument("--k", type=int, default=10, help="results per query")
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM, help="embedding dimension")
+    parser.add_argument("--clusters", type=int, default=200, help="topic clusters in the synthetic corpus")
+    parser.add_argument("--technologies", type=int, default=20, help="distinct 'technology' filter values")
+    parser.add_argument(
+        "--backends", default=",".join(BACKENDS + ("numpy-int8",)), help="comma-separated backends"
+    )
+    parser.add_argument(
+        "--rerank-factors", default="1,4", help="shortlist sizes (x k) to try for numpy-int8"
+    )
+    parser.add_argument(
+        "--no-filter-index", action="store_true", help="scan metadata row by row instead of using value sets"
+    )
+    parser.add_argument(
+        "--store-dir", help="memory-map the NumPy stores under this directory (default: in memory)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"\n Building {args.docs} x {args.dim} corpus, {args.queries} queries, k={args.k}")
+    ids, vectors, metadatas, queries = synthetic_corpus(
+        args.docs, args.queries, args.dim, args.clusters, args.technologies, args.seed
+    )
+    where = {"technology": "tech_0"}
+    mask = np.array([m["technology"] == where["technology"] for m in metadatas])
+    truth = exact_top_k(vectors, queries, args.k)
+    filtered_truth = exact_top_k(vectors, queries, args.k, mask)
+
+    indexed_fields = () if args.no_filter_index else ("technology",)
+    runs = []
+    for backend in args.backends.split(","):
+        if backend == "numpy-int8":
+            runs += [(backend, f"int8 x{factor}", int(factor)) for factor in args.rerank_factors.split(",")]
+        else:
+            runs.append((backend, backend, 4))
+
+    print(f"\n {'backend':<12} {'index s':>8} {'scan MB':>8} {'resident MB':>11} | {'p50 ms':>7} {'p95 ms':>7} {'recall':>6} | "
+          f"{'filtered p50':>12} {'p95':>7} {'recall':>6}")
+    for backend, label, factor in runs:
+        try:
+            r = run_backend(
+                backend, ids, vectors, metadatas, queries, args.k, where, truth, filtered_truth,
+                factor, indexed_fields, args.store_dir,
+            )
+        except ImportError as e:
+            print(f" {label:<12} skipped ({e})")
+            continue
+        a, f = r["all"], r["filtered"]
+        scan = f"{r['scan_mb']:>8.1f}" if r["scan_mb"] is not None else f"{'-':>8}"
+        resident = f"{r['resident_mb']:>11.1f}" if r["resident_mb"] is not None else f"{'-':>11}"
+        print(f" {label:<12} {r['index_s']:>8.1f} {scan} {resident} | {a['p50_ms']:>7.2f} {a['p95_ms']:>7.2f} {a['recall']:>6.3f} | "
+              f"{f['p50_ms']:>12.2f} {f['p95_ms']:>7.2f} {f['recall']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,264 +1,714 @@
 ﻿import os
 import pymysql
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Set
 from dotenv import load_dotenv
 
+from chatbot.db_pool import ConnectionPool
+from chatbot.query_cache import QueryCache, cached_query
+from chatbot.skill_index import SkillIndex
+
 # Load .env from project root (one level up from this folder)
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
+
+def connection_settings() -> Dict:
+    """MySQL credentials from .env, shared by the sync and async loaders."""
+    return {
+        "host": os.getenv("DB_HOST", "127.0.0.1"),
+        "port": int(os.getenv("DB_PORT", 3306)),
+        "user": os.getenv("DB_USERNAME", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("DB_DATABASE", "capstone"),
+    }
+
+
+# -------------------- SQL (shared by DatabaseLoader and AsyncDatabaseLoader) --------------------
+POSTS_FOR_INDEX_SQL = """
+    SELECT 
+        p.id,
+        p.position,
+        p.technology,
+        p.description,
+        c.id AS company_id,
+        u.name AS company_name,
+        c.address AS company_location,
+        c.verification_status,
+        c.description AS company_description
+    FROM posts p
+    JOIN companies c ON p.company_id = c.id
+    JOIN users u ON c.user_id = u.id
+"""
+
+# Incremental reindex: a post's document also depends on its company/user rows
+POSTS_CHANGED_SINCE_SQL = POSTS_FOR_INDEX_SQL.rstrip() + """
+    WHERE p.updated_at >= %s OR c.updated_at >= %s OR u.updated_at >= %s
+"""
+
+SEEKERS_FOR_INDEX_SQL = """
+    SELECT 
+        s.id,
+        u.name as seeker_name,
+        u.email,
+        s.description,
+        s.skills,
+        GROUP_CONCAT(sk.name SEPARATOR ', ') as skill_names,
+        GROUP_CONCAT(CASE WHEN sk.is_active = 1 THEN sk.name END SEPARATOR ', ') as active_skill_names
+    FROM seekers s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
+    LEFT JOIN skills sk ON ss.skill_id = sk.id
+    {where}
+    GROUP BY s.id, u.name, u.email, s.description, s.skills
+"""
+
+# A seeker's document changes with its own row, its user row, a new/updated
+# skill assignment or a renamed skill. (Detaching a skill leaves no timestamp
+# behind; a periodic full reindex picks that up.)
+SEEKERS_CHANGED_WHERE = """
+    WHERE s.updated_at >= %s
+       OR u.updated_at >= %s
+       OR s.id IN (
+            SELECT ss2.seeker_id
+            FROM seeker_skill ss2
+            JOIN skills sk2 ON ss2.skill_id = sk2.id
+            WHERE ss2.updated_at >= %s OR sk2.updated_at >= %s
+       )
+"""
+
+INDEX_WATERMARK_SQL = """
+    SELECT GREATEST(
+        COALESCE((SELECT MAX(updated_at) FROM posts), '1970-01-01'),
+        COALESCE((SELECT MAX(updated_at) FROM companies), '1970-01-01'),
+        COALESCE((SELECT MAX(updated_at) FROM users), '1970-01-01'),
+        COALESCE((SELECT MAX(updated_at) FROM seekers), '1970-01-01'),
+        COALESCE((SELECT MAX(updated_at) FROM seeker_skill), '1970-01-01'),
+        COALESCE((SELECT MAX(updated_at) FROM skills), '1970-01-01')
+    ) AS watermark
+"""
+
+TOP_TECHNOLOGIES_SQL = """
+    SELECT 
+        technology,
+        COUNT(*) AS post_count,
+        COUNT(DISTINCT company_id) AS company_count
+    FROM posts
+    WHERE technology IS NOT NULL AND technology != ''
+    GROUP BY technology
+    ORDER BY post_count DESC
+    LIMIT %s
+"""
+
+COMPANY_COUNT_BY_TECHNOLOGY_SQL = """
+    SELECT COUNT(DISTINCT company_id) AS companies
+    FROM posts
+    WHERE technology LIKE %s
+"""
+
+POSTS_BY_TECHNOLOGY_SQL = """
+    SELECT 
+        p.id AS post_id,
+        p.position,
+        p.technology,
+        p.description,
+        u.name AS company_name,
+        u.email AS company_email,
+        c.address,
+        c.website_link,
+        c.verification_status,
+        p.created_at
+    FROM posts p
+    JOIN companies c ON p.company_id = c.id
+    JOIN users u ON c.user_id = u.id
+    WHERE p.technology LIKE %s
+    ORDER BY p.created_at DESC
+    LIMIT %s
+"""
+
+SEEKERS_BY_SKILL_PIVOT_SQL = """
+    SELECT DISTINCT 
+        s.id,
+        u.name AS seeker_name,
+        u.email,
+        s.description,
+        GROUP_CONCAT(DISTINCT sk.name SEPARATOR ', ') AS skills
+    FROM seekers s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
+    LEFT JOIN skills sk ON ss.skill_id = sk.id
+    WHERE sk.name LIKE %s
+    GROUP BY s.id, u.name, u.email, s.description
+    LIMIT %s
+"""
+
+SEEKERS_BY_SKILL_TEXT_SQL = """
+    SELECT DISTINCT 
+        s.id,
+        u.name AS seeker_name,
+        u.email,
+        s.description,
+        s.skills AS skills
+    FROM seekers s
+    JOIN users u ON s.user_id = u.id
+    WHERE s.skills LIKE %s
+    LIMIT %s
+"""
+
+AVAILABLE_SEEKERS_WITH_SKILL_SQL = """
+    SELECT COUNT(DISTINCT s.id) AS available
+    FROM seekers s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
+    LEFT JOIN skills sk ON ss.skill_id = sk.id
+    LEFT JOIN applications a 
+      ON a.internship_seeker_id = s.id AND a.status = 'accepted'
+    WHERE (sk.name LIKE %s OR s.skills LIKE %s)
+      AND a.id IS NULL
+"""
+
+# -------------------- Skill index (see skill_index.py) --------------------
+SKILL_INDEX_POSTS_SQL = """
+    SELECT id, company_id, technology, created_at
+    FROM posts
+    {where}
+"""
+
+ACCEPTED_SEEKER_IDS_SQL = """
+    SELECT DISTINCT internship_seeker_id AS seeker_id
+    FROM applications
+    WHERE status = 'accepted'
+"""
+
+# Detail rows for ids resolved by the skill index ({ids} = placeholders)
+POSTS_BY_IDS_SQL = """
+    SELECT 
+        p.id AS post_id,
+        p.position,
+        p.technology,
+        p.description,
+        u.name AS company_name,
+        u.email AS company_email,
+        c.address,
+        c.website_link,
+        c.verification_status,
+        p.created_at
+    FROM posts p
+    JOIN companies c ON p.company_id = c.id
+    JOIN users u ON c.user_id = u.id
+    WHERE p.id IN ({ids})
+    ORDER BY p.created_at DESC
+"""
+
+SEEKERS_BY_IDS_SQL = """
+    SELECT 
+        s.id,
+        u.name AS seeker_name,
+        u.email,
+        s.description,
+        CONCAT_WS(', ', GROUP_CONCAT(DISTINCT sk.name SEPARATOR ', '), NULLIF(s.skills, '')) AS skills
+    FROM seekers s
+    JOIN users u ON s.user_id = u.id
+    LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
+    LEFT JOIN skills sk ON ss.skill_id = sk.id
+    WHERE s.id IN ({ids})
+    GROUP BY s.id, u.name, u.email, s.description, s.skills
+    ORDER BY s.id
+"""
+
+SKILL_DISTRIBUTION_SQL = """
+    SELECT 
+        sk.name AS skill,
+        COUNT(DISTINCT ss.seeker_id) AS seeker_count
+    FROM skills sk
+    LEFT JOIN seeker_skill ss ON sk.id = ss.skill_id
+    WHERE sk.is_active = 1
+    GROUP BY sk.id, sk.name
+    ORDER BY seeker_count DESC
+    LIMIT %s
+"""
+
+TECHNOLOGY_DEMAND_SQL = """
+    SELECT technology AS name, COUNT(*) AS demand
+    FROM posts
+    WHERE technology IS NOT NULL AND technology != ''
+    GROUP BY technology
+"""
+
+SKILL_SUPPLY_SQL = """
+    SELECT sk.name AS name, COUNT(DISTINCT ss.seeker_id) AS supply
+    FROM skills sk
+    LEFT JOIN seeker_skill ss ON sk.id = ss.skill_id
+    WHERE sk.is_active = 1
+    GROUP BY sk.id, sk.name
+"""
+
+PARTNERSHIP_CANDIDATES_SQL = """
+    SELECT 
+        u.name AS company_name,
+        u.email AS company_email,
+        c.address,
+        c.website_link,
+        c.verification_status,
+        COUNT(p.id) AS active_posts,
+        GROUP_CONCAT(DISTINCT p.technology SEPARATOR ', ') AS technologies,
+        GROUP_CONCAT(DISTINCT p.position SEPARATOR ', ') AS positions
+    FROM companies c
+    JOIN users u ON c.user_id = u.id
+    LEFT JOIN posts p ON c.id = p.company_id
+    WHERE c.verification_status = 'verified'
+    GROUP BY c.id, u.name, u.email, c.address, c.website_link, c.verification_status
+    HAVING active_posts > 0
+    ORDER BY active_posts DESC
+    LIMIT %s
+"""
+
+TECHNOLOGY_USAGE_COUNTS_SQL = """
+    SELECT technology, COUNT(*) AS post_count, COUNT(DISTINCT company_id) AS company_count
+    FROM posts
+    WHERE technology IS NOT NULL AND technology != ''
+    GROUP BY technology
+    ORDER BY post_count DESC
+"""
+
+SNAPSHOT_TABLES = ("posts", "seekers", "companies", "skills")
+
+
+def technology_statistics_sql(count: int) -> str:
+    """One aggregate pass over posts: market totals plus per-technology counts.
+
+    Each technology adds a conditional SUM / COUNT(DISTINCT CASE ...) pair,
+    so N technologies still cost a single scan and a single round trip.
+    """
+    columns = []
+    for i in range(count):
+        columns.append(f"SUM(technology LIKE %s) AS posts_{i}")
+        columns.append(
+            f"COUNT(DISTINCT CASE WHEN technology LIKE %s THEN company_id END) AS companies_{i}"
+        )
+    per_technology = "".join(f",\n        {column}" for column in columns)
+    return f"""
+    SELECT
+        COUNT(*) AS total_posts,
+        COUNT(DISTINCT company_id) AS total_companies{per_technology}
+    FROM posts
+    WHERE technology IS NOT NULL AND technology != ''
+"""
+
+# Cheap fingerprint of everything the cached aggregates read; any insert,
+# delete or update on these tables changes it and invalidates the cache.
+DATA_VERSION_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM posts) AS posts,
+        (SELECT MAX(updated_at) FROM posts) AS posts_updated_at,
+        (SELECT COUNT(*) FROM seekers) AS seekers,
+        (SELECT MAX(updated_at) FROM seekers) AS seekers_updated_at,
+        (SELECT COUNT(*) FROM seeker_skill) AS seeker_skills,
+        (SELECT MAX(updated_at) FROM seeker_skill) AS seeker_skills_updated_at,
+        (SELECT COUNT(*) FROM skills) AS skills,
+        (SELECT MAX(updated_at) FROM skills) AS skills_updated_at,
+        (SELECT COUNT(*) FROM companies) AS companies,
+        (SELECT MAX(updated_at) FROM companies) AS companies_updated_at
+"""
+
+# Cache TTLs (seconds) for the aggregate queries; data-version changes
+# invalidate earlier, the TTL is only a safety net.
+AGGREGATE_CACHE_TTL = 300
+
+
+# -------------------- Shared result shaping (sync + async loaders) --------------------
+def merge_seekers(pivot_rows: List[Dict], text_rows: List[Dict], limit: int) -> List[Dict]:
+    """Merge pivot-table and free-text seeker matches, unique by id."""
+    seen = set()
+    merged = []
+    for row in list(pivot_rows) + list(text_rows):
+        if row["id"] in seen:
+            continue
+        seen.add(row["id"])
+        merged.append(row)
+    return merged[:limit]
+
+
+def technology_statistics_params(technologies: tuple) -> tuple:
+    """LIKE parameters matching technology_statistics_sql's column order."""
+    params = []
+    for tech in technologies:
+        params.extend([f"%{tech}%", f"%{tech}%"])
+    return tuple(params)
+
+
+def shape_technology_statistics(technologies: tuple, row: Optional[Dict]) -> Dict:
+    """Turn the single aggregate row into totals + per-technology counts and percentages."""
+    row = row or {}
+    total_posts = int(row.get("total_posts") or 0)
+    total_companies = int(row.get("total_companies") or 0)
+    stats = []
+    for i, tech in enumerate(technologies):
+        post_count = int(row.get(f"posts_{i}") or 0)
+        company_count = int(row.get(f"companies_{i}") or 0)
+        stats.append(
+            {
+                "technology": tech,
+                "post_count": post_count,
+                "company_count": company_count,
+                "post_pct": round(post_count / total_posts * 100, 1) if total_posts else 0.0,
+                "company_pct": round(company_count / total_companies * 100, 1) if total_companies else 0.0,
+            }
+        )
+    return {
+        "total_posts": total_posts,
+        "total_companies": total_companies,
+        "technologies": stats,
+    }
+
+
+def format_data_version(row: Optional[Dict]) -> str:
+    """Collapse a DATA_VERSION_SQL row into a comparable string."""
+    if not row:
+        return ""
+    return "|".join(str(value) for value in row.values())
+
+
+def combine_demand_supply(demand: List[Dict], supply: List[Dict], limit: int) -> List[Dict]:
+    """Join demand (posts) and supply (skills) rows on lower-cased name, largest gap first."""
+    demand_rows = {row["name"].lower(): row["demand"] for row in demand}
+    supply_rows = {row["name"].lower(): row["supply"] for row in supply}
+
+    combined_keys = set(demand_rows.keys()) | set(supply_rows.keys())
+    combined = []
+    for key in combined_keys:
+        combined.append(
+            {
+                "technology": key,
+                "demand": demand_rows.get(key, 0),
+                "supply": supply_rows.get(key, 0),
+                "gap": demand_rows.get(key, 0) - supply_rows.get(key, 0),
+            }
+        )
+    combined.sort(key=lambda x: x["gap"], reverse=True)
+    return combined[:limit]
+
+
 class DatabaseLoader:
     """DB helper focused on chatbot needs (counts, stats, and lookups)."""
 
-    def __init__(self):
-        self.connection = pymysql.connect(
-            host=os.getenv("DB_HOST", "127.0.0.1"),
-            port=int(os.getenv("DB_PORT", 3306)),
-            user=os.getenv("DB_USERNAME", "root"),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_DATABASE", "capstone"),
-            cursorclass=pymysql.cursors.DictCursor,
+    def __init__(
+        self,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[QueryCache] = None,
+    ):
+        # Pooled connections: each query borrows its own, so concurrent agent
+        # turns and tool calls can hit MySQL in parallel (see db_pool.py).
+        # autocommit keeps pooled connections from pinning an old snapshot.
+        self.pool = ConnectionPool(
+            {
+                **connection_settings(),
+                "cursorclass": pymysql.cursors.DictCursor,
+                "autocommit": True,
+            },
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
         )
 
+        # Indexing reads stream rows in chunks of this size (see _stream)
+        self.stream_chunk_size = int(os.getenv("DB_STREAM_CHUNK_SIZE", 1000))
+        # An unbuffered read stays open while the consumer embeds a chunk;
+        # keep MySQL from timing out the send in the meantime
+        self.stream_write_timeout = int(os.getenv("DB_STREAM_NET_WRITE_TIMEOUT", 3600))
+
+        # Aggregate query cache (set DB_CACHE_ENABLED=0 to disable)
+        if cache is None and os.getenv("DB_CACHE_ENABLED", "1") != "0":
+            cache = QueryCache()
+        self.cache = cache
+
+        # Skill/technology lookups answered from posting lists instead of
+        # LIKE scans (set SKILL_INDEX_ENABLED=0 to query MySQL directly)
+        self.skill_index = SkillIndex(self) if os.getenv("SKILL_INDEX_ENABLED", "1") != "0" else None
+
     # -------------------- Generic helpers --------------------
     def _fetchall(self, query: str, params: Optional[tuple] = None) -> List[Dict]:
-        with self.connection.cursor() as cursor:
-            cursor.execute(query, params or ())
-            return cursor.fetchall()
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params or ())
+                return cursor.fetchall()
 
     def _fetchone(self, query: str, params: Optional[tuple] = None) -> Optional[Dict]:
-        with self.connection.cursor() as cursor:
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params or ())
+                return cursor.fetchone()
+
+    def _stream(self, query: str, params: Optional[tuple] = None, chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """Yield result rows in chunks from an unbuffered server-side cursor.
+
+        Only one chunk is held in memory at a time. The connection stays
+        borrowed until the generator finishes; if it is abandoned (or fails)
+        part-way, the connection is discarded rather than drained. The raised
+        net_write_timeout is set back before the connection returns to the pool.
+        """
+        chunk_size = chunk_size or self.stream_chunk_size
+        conn = self.pool.acquire()
+        finished = False
+        try:
+            # Not a `with` block: closing an SSCursor early would read (and
+            # throw away) every remaining row first
+            cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(
+                "SET @saved_net_write_timeout = @@SESSION.net_write_timeout, SESSION net_write_timeout = %s",
+                (self.stream_write_timeout,),
+            )
             cursor.execute(query, params or ())
-            return cursor.fetchone()
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+            with conn.cursor() as cursor:
+                cursor.execute("SET SESSION net_write_timeout = @saved_net_write_timeout")
+            finished = True
+        finally:
+            self.pool.release(conn, discard=not finished)
+
+    def get_pool_statistics(self) -> Dict:
+        """Connection pool metrics (size, in use, waits, reconnects)."""
+        return self.pool.get_statistics()
+
+    # -------------------- Cache / data version --------------------
+    def get_data_version(self) -> str:
+        """Fingerprint of posts/seekers/skills/companies (counts + last update)."""
+        return format_data_version(self._fetchone(DATA_VERSION_SQL))
+
+    def _check_data_version(self):
+        """Re-probe the data version at most once per interval; clears the cache on change."""
+        if self.cache is None or not self.cache.version_check_due():
+            return
+        try:
+            self.cache.update_version(self.get_data_version())
+        except Exception as e:
+            print(f"  Data version check failed: {e}")
+
+    def get_current_data_version(self) -> str:
+        """Data version, re-probed at most once per cache interval (cheap to call per request)."""
+        if self.cache is None:
+            return self.get_data_version()
+        self._check_data_version()
+        return self.cache.version
+
+    def invalidate_cache(self, name: Optional[str] = None) -> int:
+        """Drop cached aggregates (all, or one query name). Returns entries dropped."""
+        return self.cache.invalidate(name) if self.cache else 0
+
+    def get_cache_statistics(self) -> Dict:
+        """Aggregate query cache metrics (hit rate, size, evictions)."""
+        return self.cache.get_statistics() if self.cache else {"enabled": False}
 
     # -------------------- Content for RAG indexing --------------------
     def get_all_posts(self) -> List[Dict]:
         """Fetch all posts with company info for indexing."""
-        query = """
-            SELECT 
-                p.id,
-                p.position,
-                p.technology,
-                p.description,
-                u.name AS company_name,
-                c.address AS company_location,
-                c.description AS company_description
-            FROM posts p
-            JOIN companies c ON p.company_id = c.id
-            JOIN users u ON c.user_id = u.id
+        return self._fetchall(POSTS_FOR_INDEX_SQL)
+
+    def get_all_seekers(self) -> List[Dict]:
+        """Fetch all seekers with free-text skills and pivot skill names for indexing."""
+        return self._fetchall(SEEKERS_FOR_INDEX_SQL.format(where=""))
+
+    def get_posts_changed_since(self, since) -> List[Dict]:
+        """Posts (indexing shape) whose post, company or user row changed at/after `since`."""
+        return self._fetchall(POSTS_CHANGED_SINCE_SQL, (since, since, since))
+
+    def get_seekers_changed_since(self, since) -> List[Dict]:
+        """Seekers (indexing shape) whose profile, user or skills changed at/after `since`."""
+        return self._fetchall(
+            SEEKERS_FOR_INDEX_SQL.format(where=SEEKERS_CHANGED_WHERE),
+            (since, since, since, since),
+        )
+
+    def iter_all_posts(self, chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """get_all_posts() streamed in chunks (flat memory for large tables)."""
+        return self._stream(POSTS_FOR_INDEX_SQL, chunk_size=chunk_size)
+
+    def iter_all_seekers(self, chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """get_all_seekers() streamed in chunks."""
+        return self._stream(SEEKERS_FOR_INDEX_SQL.format(where=""), chunk_size=chunk_size)
+
+    def iter_posts_changed_since(self, since, chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """get_posts_changed_since() streamed in chunks."""
+        return self._stream(POSTS_CHANGED_SINCE_SQL, (since, since, since), chunk_size=chunk_size)
+
+    def iter_seekers_changed_since(self, since, chunk_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        """get_seekers_changed_since() streamed in chunks."""
+        return self._stream(
+            SEEKERS_FOR_INDEX_SQL.format(where=SEEKERS_CHANGED_WHERE),
+            (since, since, since, since),
+            chunk_size=chunk_size,
+        )
+
+    def get_post_ids(self) -> Set[int]:
+        """Ids of all posts (used to detect deletions during incremental reindex)."""
+        return {int(row["id"]) for row in self._fetchall("SELECT id FROM posts")}
+
+    def get_seeker_ids(self) -> Set[int]:
+        """Ids of all seekers (used to detect deletions during incremental reindex)."""
+        return {int(row["id"]) for row in self._fetchall("SELECT id FROM seekers")}
+
+    def iter_skill_index_posts(self, since=None) -> Iterator[List[Dict]]:
+        """id/company/technology/created_at of posts (changed at/after `since`) for the skill index."""
+        if since is None:
+            return self._stream(SKILL_INDEX_POSTS_SQL.format(where=""))
+        return self._stream(SKILL_INDEX_POSTS_SQL.format(where="WHERE updated_at >= %s"), (since,))
+
+    def iter_skill_index_seekers(self, since=None) -> Iterator[List[Dict]]:
+        """Seekers with free-text and pivot skills (changed at/after `since`) for the skill index."""
+        if since is None:
+            return self.iter_all_seekers()
+        return self.iter_seekers_changed_since(since)
+
+    def get_accepted_seeker_ids(self) -> Set[int]:
+        """Seekers with at least one accepted application."""
+        return {int(row["seeker_id"]) for row in self._fetchall(ACCEPTED_SEEKER_IDS_SQL)}
+
+    def get_skill_index_statistics(self) -> Dict:
+        """Skill index size and refresh metrics."""
+        return self.skill_index.get_statistics() if self.skill_index else {"enabled": False}
+
+    def get_index_watermark(self):
+        """Latest updated_at across every table that feeds the RAG documents.
+
+        Taken from the data itself (not NOW()) so app/DB timezone differences
+        can't make an incremental reindex skip rows.
         """
-        return self._fetchall(query)
+        row = self._fetchone(INDEX_WATERMARK_SQL)
+        return row["watermark"] if row else None
 
     # -------------------- Technology demand --------------------
+    @cached_query("top_technologies", ttl=AGGREGATE_CACHE_TTL)
     def get_top_technologies(self, limit: int = 10) -> List[Dict]:
         """Most required technologies ranked by post count."""
-        query = """
-            SELECT 
-                technology,
-                COUNT(*) AS post_count,
-                COUNT(DISTINCT company_id) AS company_count
-            FROM posts
-            WHERE technology IS NOT NULL AND technology != ''
-            GROUP BY technology
-            ORDER BY post_count DESC
-            LIMIT %s
-        """
-        return self._fetchall(query, (limit,))
+        return self._fetchall(TOP_TECHNOLOGIES_SQL, (limit,))
 
     def get_company_count_by_technology(self, technology: str) -> int:
         """Number of distinct companies posting for a technology."""
-        row = self._fetchone(
-            """
-            SELECT COUNT(DISTINCT company_id) AS companies
-            FROM posts
-            WHERE technology LIKE %s
-            """,
-            (f"%{technology}%",),
-        )
+        if self.skill_index is not None:
+            return self.skill_index.company_count(technology)
+        row = self._fetchone(COMPANY_COUNT_BY_TECHNOLOGY_SQL, (f"%{technology}%",))
         return int(row["companies"] if row else 0)
 
     def get_posts_by_technology(self, technology: str, limit: int = 20) -> List[Dict]:
         """Posts for a given technology with company context."""
-        query = """
-            SELECT 
-                p.id AS post_id,
-                p.position,
-                p.technology,
-                p.description,
-                u.name AS company_name,
-                u.email AS company_email,
-                c.address,
-                c.website_link,
-                c.verification_status,
-                p.created_at
-            FROM posts p
-            JOIN companies c ON p.company_id = c.id
-            JOIN users u ON c.user_id = u.id
-            WHERE p.technology LIKE %s
-            ORDER BY p.created_at DESC
-            LIMIT %s
+        if self.skill_index is not None:
+            ids = self.skill_index.recent_posts(technology, limit)
+            if not ids:
+                return []
+            return self._fetchall(POSTS_BY_IDS_SQL.format(ids=", ".join(["%s"] * len(ids))), tuple(ids))
+        return self._fetchall(POSTS_BY_TECHNOLOGY_SQL, (f"%{technology}%", limit))
+
+    def get_technology_statistics(self, *technologies: str) -> Dict:
+        """Post/company counts and market share for one or more technologies.
+
+        From the skill index, like the other technology lookups: whole
+        tokens with aliases merged, so "java" does not count JavaScript
+        posts. Without it: a single LIKE aggregate round trip.
+
+        Returns:
+            Dict with 'total_posts', 'total_companies' and 'technologies'
+            (list of technology, post_count, company_count, post_pct, company_pct).
         """
-        return self._fetchall(query, (f"%{technology}%", limit))
+        if self.skill_index is not None:
+            return shape_technology_statistics(technologies, self.skill_index.technology_counts(technologies))
+        return self._get_technology_statistics_sql(*technologies)
+
+    @cached_query("technology_statistics", ttl=AGGREGATE_CACHE_TTL)
+    def _get_technology_statistics_sql(self, *technologies: str) -> Dict:
+        row = self._fetchone(
+            technology_statistics_sql(len(technologies)),
+            technology_statistics_params(technologies),
+        )
+        return shape_technology_statistics(technologies, row)
 
     # -------------------- Seeker supply --------------------
     def get_seekers_by_skill(self, skill_name: str, limit: int = 25) -> List[Dict]:
         """Seekers whose skills include the given term (pivot + free-text)."""
+        if self.skill_index is not None:
+            ids = sorted(self.skill_index.seekers_with(skill_name))[:limit]
+            if not ids:
+                return []
+            return self._fetchall(SEEKERS_BY_IDS_SQL.format(ids=", ".join(["%s"] * len(ids))), tuple(ids))
+
         # Pivot table match
-        pivot_query = """
-            SELECT DISTINCT 
-                s.id,
-                u.name AS seeker_name,
-                u.email,
-                s.description,
-                GROUP_CONCAT(DISTINCT sk.name SEPARATOR ', ') AS skills
-            FROM seekers s
-            JOIN users u ON s.user_id = u.id
-            LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
-            LEFT JOIN skills sk ON ss.skill_id = sk.id
-            WHERE sk.name LIKE %s
-            GROUP BY s.id, u.name, u.email, s.description
-            LIMIT %s
-        """
-        pivot_rows = self._fetchall(pivot_query, (f"%{skill_name}%", limit))
+        pivot_rows = self._fetchall(SEEKERS_BY_SKILL_PIVOT_SQL, (f"%{skill_name}%", limit))
 
         # Free-text field match
-        text_query = """
-            SELECT DISTINCT 
-                s.id,
-                u.name AS seeker_name,
-                u.email,
-                s.description,
-                s.skills AS skills
-            FROM seekers s
-            JOIN users u ON s.user_id = u.id
-            WHERE s.skills LIKE %s
-            LIMIT %s
-        """
-        text_rows = self._fetchall(text_query, (f"%{skill_name}%", limit))
-
-        # Merge unique seekers by id
-        seen = set()
-        merged = []
-        for row in pivot_rows + text_rows:
-            if row["id"] in seen:
-                continue
-            seen.add(row["id"])
-            merged.append(row)
-        return merged[:limit]
+        text_rows = self._fetchall(SEEKERS_BY_SKILL_TEXT_SQL, (f"%{skill_name}%", limit))
+
+        return merge_seekers(pivot_rows, text_rows, limit)
 
     def count_available_seekers_with_skill(self, skill_name: str) -> int:
         """Count seekers with a skill who are not in accepted applications."""
-        query = """
-            SELECT COUNT(DISTINCT s.id) AS available
-            FROM seekers s
-            JOIN users u ON s.user_id = u.id
-            LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
-            LEFT JOIN skills sk ON ss.skill_id = sk.id
-            LEFT JOIN applications a 
-              ON a.internship_seeker_id = s.id AND a.status = 'accepted'
-            WHERE (sk.name LIKE %s OR s.skills LIKE %s)
-              AND a.id IS NULL
-        """
-        row = self._fetchone(query, (f"%{skill_name}%", f"%{skill_name}%"))
+        if self.skill_index is not None:
+            return self.skill_index.count_available_seekers(skill_name)
+        row = self._fetchone(AVAILABLE_SEEKERS_WITH_SKILL_SQL, (f"%{skill_name}%", f"%{skill_name}%"))
         return int(row["available"] if row else 0)
 
     def get_skill_distribution(self, limit: int = 15) -> List[Dict]:
-        """Top skills by seeker count (active skills only)."""
-        query = """
-            SELECT 
-                sk.name AS skill,
-                COUNT(DISTINCT ss.seeker_id) AS seeker_count
-            FROM skills sk
-            LEFT JOIN seeker_skill ss ON sk.id = ss.skill_id
-            WHERE sk.is_active = 1
-            GROUP BY sk.id, sk.name
-            ORDER BY seeker_count DESC
-            LIMIT %s
+        """Top skills by seeker count.
+
+        From the skill index: canonical skills across active pivot skills
+        and free-text skills. Without it: active skills.name rows only.
         """
-        return self._fetchall(query, (limit,))
+        if self.skill_index is not None:
+            return self.skill_index.skill_distribution(limit)
+        return self._get_skill_distribution_sql(limit)
+
+    @cached_query("skill_distribution", ttl=AGGREGATE_CACHE_TTL)
+    def _get_skill_distribution_sql(self, limit: int) -> List[Dict]:
+        return self._fetchall(SKILL_DISTRIBUTION_SQL, (limit,))
+
+    def get_talent_pool_size(self) -> int:
+        """Number of seekers."""
+        if self.skill_index is not None:
+            return self.skill_index.seeker_count()
+        row = self._fetchone("SELECT COUNT(*) AS n FROM seekers")
+        return int(row["n"]) if row else 0
 
     # -------------------- Demand vs supply for universities --------------------
     def get_demand_supply_gap(self, limit: int = 15) -> List[Dict]:
-        """Compare company demand (posts) vs seeker supply (skills)."""
-        demand_query = """
-            SELECT technology AS name, COUNT(*) AS demand
-            FROM posts
-            WHERE technology IS NOT NULL AND technology != ''
-            GROUP BY technology
-        """
-        supply_query = """
-            SELECT sk.name AS name, COUNT(DISTINCT ss.seeker_id) AS supply
-            FROM skills sk
-            LEFT JOIN seeker_skill ss ON sk.id = ss.skill_id
-            WHERE sk.is_active = 1
-            GROUP BY sk.id, sk.name
+        """Compare company demand (posts) vs seeker supply (skills).
+
+        From the skill index aliases are merged ("ReactJS" counts as React)
+        and free-text seeker skills count towards supply.
         """
-        demand_rows = {row["name"].lower(): row["demand"] for row in self._fetchall(demand_query)}
-        supply_rows = {row["name"].lower(): row["supply"] for row in self._fetchall(supply_query)}
-
-        combined_keys = set(demand_rows.keys()) | set(supply_rows.keys())
-        combined = []
-        for key in combined_keys:
-            combined.append(
-                {
-                    "technology": key,
-                    "demand": demand_rows.get(key, 0),
-                    "supply": supply_rows.get(key, 0),
-                    "gap": demand_rows.get(key, 0) - supply_rows.get(key, 0),
-                }
-            )
-        combined.sort(key=lambda x: x["gap"], reverse=True)
-        return combined[:limit]
+        if self.skill_index is not None:
+            return self.skill_index.demand_supply_gap(limit)
+        return self._get_demand_supply_gap_sql(limit)
+
+    @cached_query("demand_supply_gap", ttl=AGGREGATE_CACHE_TTL)
+    def _get_demand_supply_gap_sql(self, limit: int) -> List[Dict]:
+        return combine_demand_supply(
+            self._fetchall(TECHNOLOGY_DEMAND_SQL), self._fetchall(SKILL_SUPPLY_SQL), limit
+        )
 
     # -------------------- Partnership candidates for universities --------------------
+    @cached_query("partnership_candidates", ttl=AGGREGATE_CACHE_TTL)
     def get_partnership_candidates(self, limit: int = 20) -> List[Dict]:
         """Verified companies with active posts and their tech/position coverage."""
-        query = """
-            SELECT 
-                u.name AS company_name,
-                u.email AS company_email,
-                c.address,
-                c.website_link,
-                c.verification_status,
-                COUNT(p.id) AS active_posts,
-                GROUP_CONCAT(DISTINCT p.technology SEPARATOR ', ') AS technologies,
-                GROUP_CONCAT(DISTINCT p.position SEPARATOR ', ') AS positions
-            FROM companies c
-            JOIN users u ON c.user_id = u.id
-            LEFT JOIN posts p ON c.id = p.company_id
-            WHERE c.verification_status = 'verified'
-            GROUP BY c.id, u.name, u.email, c.address, c.website_link, c.verification_status
-            HAVING active_posts > 0
-            ORDER BY active_posts DESC
-            LIMIT %s
-        """
-        return self._fetchall(query, (limit,))
+        return self._fetchall(PARTNERSHIP_CANDIDATES_SQL, (limit,))
 
     # -------------------- Technology statistics helpers --------------------
+    @cached_query("technology_usage_counts", ttl=AGGREGATE_CACHE_TTL)
     def get_technology_usage_counts(self) -> List[Dict]:
         """Counts of posts per technology with company coverage."""
-        query = """
-            SELECT technology, COUNT(*) AS post_count, COUNT(DISTINCT company_id) AS company_count
-            FROM posts
-            WHERE technology IS NOT NULL AND technology != ''
-            GROUP BY technology
-            ORDER BY post_count DESC
-        """
-        return self._fetchall(query)
+        return self._fetchall(TECHNOLOGY_USAGE_COUNTS_SQL)
 
     def get_statistics_snapshot(self) -> Dict:
         """High-level snapshot for health endpoints."""
-        posts_count = self._fetchone("SELECT COUNT(*) AS n FROM posts")
-        seekers_count = self._fetchone("SELECT COUNT(*) AS n FROM seekers")
-        companies_count = self._fetchone("SELECT COUNT(*) AS n FROM companies")
-        skills_count = self._fetchone("SELECT COUNT(*) AS n FROM skills")
-        return {
-            "posts": int(posts_count["n"]) if posts_count else 0,
-            "seekers": int(seekers_count["n"]) if seekers_count else 0,
-            "companies": int(companies_count["n"]) if companies_count else 0,
-            "skills": int(skills_count["n"]) if skills_count else 0,
-        }
+        snapshot = {}
+        for table in SNAPSHOT_TABLES:
+            row = self._fetchone(f"SELECT COUNT(*) AS n FROM {table}")
+            snapshot[table] = int(row["n"]) if row else 0
+        return snapshot
 
     def close(self):
-        self.connection.close()
+        self.pool.close()
 
 __all__ = ["DatabaseLoader"]
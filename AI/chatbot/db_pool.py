@@ -0,0 +1,201 @@
+"""
+Thread-safe pymysql connection pool used by DatabaseLoader.
+
+A single pymysql connection cannot be shared between threads, cannot run two
+queries at once and is dead for good after MySQL's wait_timeout. The pool
+hands each query its own connection, pings it on borrow (reconnecting if the
+server dropped it) and caps how many connections can be open at once.
+
+Config (env):
+  - DB_POOL_MIN_SIZE: connections opened up front (default 1)
+  - DB_POOL_MAX_SIZE: hard cap on open connections (default 10)
+  - DB_POOL_TIMEOUT: seconds to wait for a free connection (default 10)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import pymysql
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of pymysql connections with ping-on-borrow."""
+
+    def __init__(
+        self,
+        connect_kwargs: Dict,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size if min_size is not None else int(os.getenv("DB_POOL_MIN_SIZE", 1))
+        self.max_size = max_size or int(os.getenv("DB_POOL_MAX_SIZE", 10))
+        self.timeout = timeout or float(os.getenv("DB_POOL_TIMEOUT", 10))
+        if self.min_size > self.max_size:
+            raise ValueError("DB_POOL_MIN_SIZE cannot be larger than DB_POOL_MAX_SIZE")
+
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Metrics
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+
+        # Fail fast on bad credentials, same as the old single connection
+        for _ in range(self.min_size):
+            self._idle.append(self._connect())
+            self._size += 1
+
+    def _connect(self):
+        return pymysql.connect(**self.connect_kwargs)
+
+    # -------------------- Checkout / return --------------------
+    def acquire(self, timeout: Optional[float] = None):
+        """Borrow a live connection, opening one if under max_size.
+
+        Raises:
+            PoolTimeoutError: if all connections stay busy for `timeout` seconds.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise pymysql.err.InterfaceError("Connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserve the slot, connect outside the lock
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {timeout:.1f}s "
+                            f"({self.max_size} in use)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            else:
+                conn = self._ping(conn)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._total_wait += time.perf_counter() - started
+        return conn
+
+    def _ping(self, conn):
+        """Make sure a pooled connection survived wait_timeout; reopen if not."""
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except Exception:
+            self._reconnects += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return self._connect()
+
+    def release(self, conn, discard: bool = False):
+        """Return a connection; `discard` closes it instead (e.g. after an error)."""
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed or not conn.open:
+                self._size -= 1
+                self._discarded += 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager: borrow a connection and always give it back."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # Connection-level failure: don't hand this one out again
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    # -------------------- Lifecycle / metrics --------------------
+    def close(self):
+        """Close idle connections; borrowed ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn = self._idle.pop()
+                self._size -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify_all()
+
+    def get_statistics(self) -> Dict:
+        """Pool size, utilisation and checkout metrics."""
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "reconnects": self._reconnects,
+                "discarded": self._discarded,
+                "avg_checkout_ms": round(self._total_wait / self._checkouts * 1000, 2)
+                if self._checkouts else 0.0,
+            }
+
+
+__all__ = ["ConnectionPool", "PoolTimeoutError"]
@@ -0,0 +1,238 @@
+"""
+Persistent content-hash embedding cache for indexing.
+
+Most posts and seeker profiles are byte-identical between index runs, so
+re-embedding them is wasted CPU. EmbeddingCache maps
+(model name, hash of document text) -> embedding and keeps it on disk:
+
+  - vectors.f32: float32 matrix (capacity x dim), memory-mapped
+  - keys.bin:    16-byte blake2b digest per row, memory-mapped
+  - meta.json:   model, dim, the committed row count and the file generation
+
+Rows are append-only. meta.json is rewritten (atomically) after the data
+files are flushed, so a crash mid-write just loses the uncommitted rows.
+The digest -> row index is rebuilt from keys.bin when the cache is opened.
+
+Text that is edited or deleted leaves its old row behind, so a full
+reindex compacts the cache: start_tracking() records every digest the run
+looks up, and compact() copies just those rows into the next generation of
+files (vectors.N.f32, keys.N.bin), switches meta.json to it and removes the
+old files.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+KEY_BYTES = 16
+
+
+class EmbeddingCache:
+    """Disk-backed (model, text hash) -> float32 embedding cache."""
+
+    def __init__(self, directory: str, model_name: str, dim: int, initial_capacity: int = 1024):
+        self.model_name = model_name
+        self.dim = dim
+        # One sub-directory per model so switching models never mixes vectors
+        self.directory = os.path.join(directory, model_name.replace("/", "__"))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._compactions = 0
+        # Digests seen since start_tracking(); None when not tracking
+        self._live: Optional[Set[bytes]] = None
+
+        self._generation = 0
+        self._count = self._load_meta()
+        self._capacity = max(initial_capacity, self._count)
+        self._open(self._capacity)
+        self._index: Dict[bytes, int] = {
+            self._keys[row].tobytes(): row for row in range(self._count)
+        }
+
+    # -------------------- Storage --------------------
+    def _load_meta(self) -> int:
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if meta.get("model") != self.model_name or meta.get("dim") != self.dim:
+            print(f"  Embedding cache at {self.directory} does not match the model, starting fresh")
+            return 0
+        self._generation = int(meta.get("generation", 0))
+        return int(meta.get("count", 0))
+
+    def _write_meta(self):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"model": self.model_name, "dim": self.dim, "count": self._count, "generation": self._generation},
+                f,
+            )
+        os.replace(tmp_path, self._meta_path)
+
+    @property
+    def _vectors_path(self) -> str:
+        name = "vectors.f32" if self._generation == 0 else f"vectors.{self._generation}.f32"
+        return os.path.join(self.directory, name)
+
+    @property
+    def _keys_path(self) -> str:
+        name = "keys.bin" if self._generation == 0 else f"keys.{self._generation}.bin"
+        return os.path.join(self.directory, name)
+
+    def _open(self, capacity: int):
+        """(Re)map the data files, growing them to `capacity` rows if needed."""
+        for path, row_bytes in ((self._vectors_path, self.dim * 4), (self._keys_path, KEY_BYTES)):
+            needed = capacity * row_bytes
+            mode = "r+b" if os.path.exists(path) else "w+b"
+            with open(path, mode) as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < needed:
+                    f.truncate(needed)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode="r+", shape=(capacity, KEY_BYTES))
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        new_capacity = max(rows, self._capacity * 2)
+        self._vectors.flush()
+        self._keys.flush()
+        del self._vectors, self._keys
+        self._open(new_capacity)
+        self._capacity = new_capacity
+
+    def _key(self, text: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=KEY_BYTES)
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    # -------------------- Lookups --------------------
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """Look up embeddings for `texts`.
+
+        Returns:
+            (vectors, missing): a float32 array with cached rows filled in and
+            the positions of texts that still need embedding.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                if self._live is not None:
+                    self._live.add(key)
+                row = self._index.get(key)
+                if row is None:
+                    missing.append(i)
+                else:
+                    vectors[i] = self._vectors[row]
+            self._hits += len(texts) - len(missing)
+            self._misses += len(missing)
+        return vectors, missing
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Store freshly computed embeddings and commit them to disk."""
+        with self._lock:
+            new_rows = []
+            for text, vector in zip(texts, vectors):
+                key = self._key(text)
+                if self._live is not None:
+                    self._live.add(key)
+                if key in self._index:
+                    continue
+                new_rows.append((key, vector))
+                # Reserve the row now so duplicates inside one batch are skipped
+                self._index[key] = self._count + len(new_rows) - 1
+            if not new_rows:
+                return
+
+            self._ensure_capacity(self._count + len(new_rows))
+            for offset, (key, vector) in enumerate(new_rows):
+                row = self._count + offset
+                self._vectors[row] = vector
+                self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+            self._vectors.flush()
+            self._keys.flush()
+            self._count += len(new_rows)
+            self._write_meta()
+
+    # -------------------- Compaction --------------------
+    def start_tracking(self):
+        """Record the digests looked up from now on (call before a full reindex)."""
+        with self._lock:
+            self._live = set()
+
+    def stop_tracking(self):
+        """Forget the tracked digests without compacting (e.g. an aborted run)."""
+        with self._lock:
+            self._live = None
+
+    def compact(self) -> int:
+        """Keep only rows looked up since start_tracking(); stops tracking.
+
+        Only meaningful after a run that embedded every live document.
+
+        Returns:
+            Number of rows dropped.
+        """
+        with self._lock:
+            live, self._live = self._live, None
+            if live is None:
+                return 0
+            rows = [row for row in range(self._count) if self._keys[row].tobytes() in live]
+            dropped = self._count - len(rows)
+            if not dropped:
+                return 0
+
+            old_vectors, old_keys = self._vectors, self._keys
+            stale = (self._vectors_path, self._keys_path)
+            self._generation += 1
+            self._capacity = max(len(rows), 1)
+            self._open(self._capacity)
+            if rows:
+                self._vectors[: len(rows)] = old_vectors[rows]
+                self._keys[: len(rows)] = old_keys[rows]
+            self._vectors.flush()
+            self._keys.flush()
+            del old_vectors, old_keys
+            self._count = len(rows)
+            self._write_meta()
+            self._index = {self._keys[row].tobytes(): row for row in range(self._count)}
+            self._compactions += 1
+
+            for path in stale:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return dropped
+
+    def get_statistics(self) -> Dict:
+        """Entries, on-disk size and hit rate since the cache was opened."""
+        lookups = self._hits + self._misses
+        return {
+            "model": self.model_name,
+            "entries": self._count,
+            "size_mb": round(self._count * (self.dim * 4 + KEY_BYTES) / (1024 * 1024), 2),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "generation": self._generation,
+            "compactions": self._compactions,
+        }
+
+
+__all__ = ["EmbeddingCache"]
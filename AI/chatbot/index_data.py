@@ -2,100 +2,232 @@
 Indexing script: Load data from MySQL database into ChromaDB.
 Run this whenever you want to refresh the RAG embeddings.
 
+Modes:
+  - full: re-embed every post and seeker into new collections, then switch
+    collections.json to them (a running API keeps serving the current ones
+    until the switch and picks the new ones up after it)
+  - incremental: upsert only rows whose updated_at is at/after the last
+    run's high-water mark and delete rows removed from MySQL. The mark is
+    stored in index_state.json next to the ChromaDB files. Cheap enough to
+    run every few minutes; run a full pass occasionally (e.g. nightly) to
+    pick up changes that leave no timestamp, like a detached skill.
+
+Both modes stream rows from MySQL through a pipeline (fetch -> build docs
+-> embed -> write, see index_pipeline.py) with posts and seekers side by
+side, and print per-stage throughput at the end.
+
 Usage:
-    python index_data.py
+    python index_data.py                 # incremental if a previous run exists, else full
+    python index_data.py --full
+    python index_data.py --incremental
+    python index_data.py --full --processes 0 --batch-size 128   # encode on every core
+    python index_data.py --full --chunk-size 5000                # rows streamed per DB round
+    python index_data.py --full --embed-workers 2 --queue-size 8 # more pipeline parallelism
+    python index_data.py --full --backend numpy                  # exact-search NumPy store
 """
 
 import sys
 import os
+import json
+import argparse
+from datetime import datetime
+
+# Add parent directory to path (so `chatbot.*` imports resolve like in the API)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot.db_loader import DatabaseLoader
+from chatbot.rag_system import RAGSystem
+from chatbot.index_pipeline import IndexPipeline, Stage, print_report
+from chatbot.vector_backends import BACKENDS
+
+CHROMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_db")
+STATE_FILE = os.path.join(CHROMA_DIR, "index_state.json")
+
+
+# ==================== HELPERS ====================
+def merge_seeker_skills(seekers):
+    """Merge pivot skill names and free-text skills into one 'skills' string."""
+    for seeker in seekers:
+        pivot_skills = seeker.get("skill_names") or ""
+        free_text_skills = seeker.get("skills") or ""
+        all_skills = f"{pivot_skills}, {free_text_skills}".strip(", ")
+        seeker["skills"] = all_skills or "No skills listed"
+    return seekers
+
+
+def load_state(backend):
+    """Last run's high-water mark, or None if there is no usable state for `backend`."""
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not state.get("watermark") or state.get("backend", "chroma") != backend:
+        return None
+    return state
+
+
+def save_state(watermark, mode, backend):
+    os.makedirs(CHROMA_DIR, exist_ok=True)
+    state = {
+        "watermark": str(watermark) if watermark is not None else None,
+        "mode": mode,
+        "backend": backend,
+        "finished_at": datetime.now().isoformat(),
+    }
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def build_stages(rag, embed_workers=1, write_workers=1, build_workers=1):
+    """build docs -> embed -> write stages over a RAGSystem (see index_pipeline.py)."""
+    def build(kind, rows):
+        if kind == "seekers":
+            merge_seeker_skills(rows)
+        return rag.build_documents(kind, rows)
+
+    def embed(kind, batch):
+        documents, metadatas, ids = batch
+        return documents, metadatas, ids, rag.embed_documents(documents)
+
+    def write(kind, batch):
+        return rag.write_embedded(kind, *batch)
+
+    return [
+        Stage("build", build, build_workers),
+        Stage("embed", embed, embed_workers),
+        Stage("write", write, write_workers),
+    ]
+
+
+def run_pipeline(rag, sources, options):
+    """Stream the sources through the indexing pipeline and print stage stats."""
+    pipeline = IndexPipeline(
+        sources,
+        build_stages(rag, options.embed_workers, options.write_workers),
+        queue_size=options.queue_size,
+    )
+    # One encode process pool (--processes) for every chunk of the run
+    with rag.encode_pool():
+        report = pipeline.run()
+    print_report(report)
+    return report["rows"]
+
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# ==================== FULL REINDEX ====================
+def run_full(db, rag, options):
+    # Read the mark before loading rows so anything edited mid-run is
+    # picked up again by the next incremental pass
+    watermark = db.get_index_watermark()
+
+    # Build into fresh collections; the live ones keep serving meanwhile
+    rag.begin_rebuild()
+    print(f"\n Building new collections {rag.collection_names['posts']}, {rag.collection_names['seekers']}")
+
+    # ========== INDEX POSTS + SEEKERS ==========
+    print("\n" + "-"*70)
+    print(" INDEXING POSTS (for seeker search) AND SEEKERS (for company search)")
+    print("-"*70)
+
+    # Rows are streamed from MySQL in chunks and pipelined through
+    # build -> embed -> write, posts and seekers side by side
+    try:
+        rows = run_pipeline(rag, {
+            "posts": db.iter_all_posts(options.chunk_size),
+            "seekers": db.iter_all_seekers(options.chunk_size),
+        }, options)
+    except BaseException:
+        rag.abort_rebuild()
+        raise
+    rag.finish_rebuild()
+    print(" Switched to the new collections")
+    for kind, count in rows.items():
+        if count:
+            print(f" Indexed {count} {kind}")
+        else:
+            print(f"  No {kind} found in database")
+
+    save_state(watermark, "full", rag.backend)
+
+
+# ==================== INCREMENTAL REINDEX ====================
+def run_incremental(db, rag, state, options):
+    since = state["watermark"]
+    watermark = db.get_index_watermark()
+    print(f"\n Incremental reindex of rows changed since {since}")
+
+    # ========== CHANGED POSTS + SEEKERS ==========
+    print("\n" + "-"*70)
+    print(" UPDATING POSTS AND SEEKERS")
+    print("-"*70)
+    rows = run_pipeline(rag, {
+        "posts": db.iter_posts_changed_since(since, options.chunk_size),
+        "seekers": db.iter_seekers_changed_since(since, options.chunk_size),
+    }, options)
+
+    # ========== REMOVED ROWS ==========
+    removed_posts = rag.get_indexed_post_ids() - db.get_post_ids()
+    deleted_posts = rag.delete_posts(sorted(removed_posts))
+    removed_seekers = rag.get_indexed_seeker_ids() - db.get_seeker_ids()
+    deleted_seekers = rag.delete_seekers(sorted(removed_seekers))
+    print(f" Upserted {rows['posts']} changed posts, deleted {deleted_posts} removed posts")
+    print(f" Upserted {rows['seekers']} changed seekers, deleted {deleted_seekers} removed seekers")
+
+    save_state(watermark, "incremental", rag.backend)
 
-from db_loader import DatabaseLoader
-from rag_system import RAGSystem
 
 def main():
+    parser = argparse.ArgumentParser(description="Index MySQL posts/seekers into ChromaDB")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--full", action="store_true", help="re-embed everything into new collections")
+    mode.add_argument("--incremental", action="store_true", help="only changed/removed rows")
+    parser.add_argument("--batch-size", type=int, help="texts per embedding batch (RAG_EMBED_BATCH_SIZE)")
+    parser.add_argument(
+        "--processes", type=int, help="CPU processes for encoding, 0 = all cores (RAG_EMBED_PROCESSES)"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, help="rows streamed from MySQL per chunk (DB_STREAM_CHUNK_SIZE)"
+    )
+    parser.add_argument("--embed-workers", type=int, default=1, help="embedding stage threads")
+    parser.add_argument("--write-workers", type=int, default=1, help="ChromaDB write stage threads")
+    parser.add_argument(
+        "--queue-size", type=int, default=4, help="chunks buffered between pipeline stages"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, help="vector store to index into (RAG_BACKEND, default chroma)"
+    )
+    args = parser.parse_args()
+
     print("\n" + "="*70)
     print(" STARTING DATA INDEXING INTO CHROMADB")
     print("="*70)
-    
+
     try:
         # Initialize
         print("\n Initializing database connection...")
         db = DatabaseLoader()
         print(" Database connected")
-        
+
         print("\n  Initializing ChromaDB...")
-        rag = RAGSystem(persist_directory=os.path.join(os.path.dirname(__file__), "chroma_db"))
+        rag = RAGSystem(
+            persist_directory=CHROMA_DIR,
+            batch_size=args.batch_size,
+            encode_processes=args.processes,
+            backend=args.backend,
+        )
         print(" ChromaDB initialized")
-        
-        # Clear old data (optional - comment out to keep old data)
-        print("\n Clearing old ChromaDB data...")
-        rag.clear_all_data()
-        rag.reinitialize()
-        print(" Old data cleared")
-        
-        # ========== INDEX POSTS ==========
-        print("\n" + "-"*70)
-        print(" INDEXING POSTS (for seeker search)")
-        print("-"*70)
-        
-        print(" Loading posts from database...")
-        posts = db.get_all_posts()
-        print(f"   Found {len(posts)} posts")
-        
-        if posts:
-            print(" Indexing posts into ChromaDB...")
-            indexed_count = rag.index_posts(posts)
-            print(f" Indexed {indexed_count} posts")
+
+        state = None if args.full else load_state(rag.backend)
+        if args.incremental and state is None:
+            print("  No previous index state found, running a full reindex instead")
+
+        if state is None:
+            run_full(db, rag, args)
         else:
-            print("  No posts found in database")
-        
-        # ========== INDEX SEEKERS ==========
-        print("\n" + "-"*70)
-        print(" INDEXING SEEKERS (for company search)")
-        print("-"*70)
-        
-        print(" Loading seekers from database...")
-        try:
-            with db.connection.cursor() as cursor:
-                seekers_query = """
-                    SELECT 
-                        s.id,
-                        u.name as seeker_name,
-                        u.email,
-                        s.description,
-                        s.skills,
-                        GROUP_CONCAT(sk.name SEPARATOR ', ') as skill_names
-                    FROM seekers s
-                    JOIN users u ON s.user_id = u.id
-                    LEFT JOIN seeker_skill ss ON s.id = ss.seeker_id
-                    LEFT JOIN skills sk ON ss.skill_id = sk.id
-                    GROUP BY s.id, u.name, u.email, s.description, s.skills
-                """
-                cursor.execute(seekers_query)
-                seekers = cursor.fetchall()
-            
-            print(f"   Found {len(seekers)} seekers")
-            
-            if seekers:
-                # Merge skill sources
-                for seeker in seekers:
-                    pivot_skills = seeker.get("skill_names") or ""
-                    free_text_skills = seeker.get("skills") or ""
-                    all_skills = f"{pivot_skills}, {free_text_skills}".strip(", ")
-                    seeker["skills"] = all_skills or "No skills listed"
-                
-                print(" Indexing seekers into ChromaDB...")
-                indexed_count = rag.index_seekers(seekers)
-                print(f" Indexed {indexed_count} seekers")
-            else:
-                print("  No seekers found in database")
-        
-        except Exception as e:
-            print(f" Error indexing seekers: {e}")
-        
+            run_incremental(db, rag, state, args)
+
         # ========== SUMMARY ==========
         print("\n" + "="*70)
         stats = rag.get_statistics()
@@ -103,12 +235,16 @@ def main():
         print("="*70)
         print(f" Total posts indexed:   {stats['posts']}")
         print(f" Total seekers indexed: {stats['seekers']}")
-        print(f"\n ChromaDB location: {os.path.join(os.path.dirname(__file__), 'chroma_db')}")
+        cache_stats = stats.get("embedding_cache")
+        if cache_stats:
+            print(f" Embedding cache:       {cache_stats['hits']} reused, {cache_stats['misses']} embedded "
+                  f"(hit rate {cache_stats['hit_rate']:.0%}, {cache_stats['entries']} cached)")
+        print(f"\n ChromaDB location: {CHROMA_DIR}")
         print("="*70 + "\n")
-        
+
         # Cleanup
         db.close()
-        
+
     except Exception as e:
         print(f"\n ERROR: {str(e)}")
         import traceback
@@ -0,0 +1,206 @@
+"""
+Pipelined indexing: fetch -> build docs -> embed -> write.
+
+Stages run concurrently on their own worker threads with a bounded queue
+between each pair, so MySQL reads, document building, embedding and
+ChromaDB writes overlap instead of running phase after phase. A full queue
+blocks the stage feeding it (backpressure), so the slowest stage sets the
+pace and memory stays bounded to roughly `queue_size` chunks per stage.
+
+Several sources (e.g. posts and seekers) feed the same pipeline, one fetch
+thread each, so they index at the same time and share the embedding model.
+Items are (kind, payload, rows) tuples; each stage function is called as
+fn(kind, payload) and returns the next payload.
+
+Per-stage stats: rows, chunks, busy time, throughput and utilization; the
+stage with the highest utilization is the bottleneck.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+_DONE = object()
+
+
+class Stage:
+    """One pipeline step run by `workers` threads."""
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.rows = 0
+        self.chunks = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, rows: int, seconds: float):
+        with self._lock:
+            self.rows += rows
+            self.chunks += 1
+            self.busy += seconds
+
+    def get_statistics(self, wall: float) -> Dict:
+        # Busy time is summed over workers; throughput is what the stage
+        # could sustain with all its workers busy
+        return {
+            "workers": self.workers,
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "busy_s": round(self.busy, 2),
+            "rows_per_s": round(self.rows / self.busy * self.workers, 1) if self.busy else None,
+            "utilization": round(self.busy / (wall * self.workers), 2) if wall else 0.0,
+        }
+
+
+class IndexPipeline:
+    """Runs sources through stages with bounded queues and per-stage stats."""
+
+    def __init__(self, sources: Dict[str, Iterable[List]], stages: List[Stage], queue_size: int = 4):
+        self.sources = sources
+        self.fetch = Stage("fetch", None, workers=len(sources))
+        self.stages = stages
+        self.queue_size = queue_size
+        self.rows_by_kind = {kind: 0 for kind in sources}
+
+        self._stop = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+
+    # -------------------- Plumbing --------------------
+    def _fail(self, error: Exception):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, out: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, inbox: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _finish_worker(self, remaining: List[int], lock: threading.Lock, out: queue.Queue, downstream: int):
+        """Last worker of a stage to finish tells every downstream worker."""
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(downstream):
+                self._put(out, _DONE)
+
+    def _fetch(self, kind: str, chunks: Iterable[List], out: queue.Queue, remaining, lock, downstream: int):
+        try:
+            iterator = iter(chunks)
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                rows = next(iterator, None)
+                if rows is None:
+                    break
+                self.fetch.record(len(rows), time.perf_counter() - started)
+                if not self._put(out, (kind, rows, len(rows))):
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # Release the DB connection of an abandoned stream
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self._finish_worker(remaining, lock, out, downstream)
+
+    def _work(self, stage: Stage, inbox: queue.Queue, out, remaining, lock, downstream: int):
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+                kind, payload, rows = item
+                started = time.perf_counter()
+                result = stage.fn(kind, payload)
+                stage.record(rows, time.perf_counter() - started)
+                if out is None:
+                    with lock:
+                        self.rows_by_kind[kind] += rows
+                elif not self._put(out, (kind, result, rows)):
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if out is not None:
+                self._finish_worker(remaining, lock, out, downstream)
+
+    # -------------------- Run --------------------
+    def run(self) -> Dict:
+        """Run to completion; re-raises the first stage error.
+
+        Returns:
+            Dict with 'rows' per source kind, 'elapsed_s' and per-stage 'stages' stats.
+        """
+        started = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+
+        fetch_remaining, fetch_lock = [self.fetch.workers], threading.Lock()
+        for kind, chunks in self.sources.items():
+            threads.append(threading.Thread(
+                target=self._fetch,
+                args=(kind, chunks, queues[0], fetch_remaining, fetch_lock, self.stages[0].workers),
+                name=f"index-fetch-{kind}",
+                daemon=True,
+            ))
+
+        for position, stage in enumerate(self.stages):
+            out = queues[position + 1] if position + 1 < len(self.stages) else None
+            downstream = self.stages[position + 1].workers if out is not None else 0
+            remaining, lock = [stage.workers], threading.Lock()
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[position], out, remaining, lock, downstream),
+                    name=f"index-{stage.name}-{worker}",
+                    daemon=True,
+                ))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        wall = time.perf_counter() - started
+        stages = {stage.name: stage.get_statistics(wall) for stage in [self.fetch, *self.stages]}
+        return {
+            "rows": dict(self.rows_by_kind),
+            "elapsed_s": round(wall, 2),
+            "stages": stages,
+            "bottleneck": max(stages, key=lambda name: stages[name]["utilization"]),
+        }
+
+
+def print_report(report: Dict):
+    """Per-stage throughput table for index_data.py."""
+    print(f" Pipeline finished in {report['elapsed_s']}s, bottleneck: {report['bottleneck']}")
+    for name, stats in report["stages"].items():
+        rate = f"{stats['rows_per_s']:.0f} rows/s" if stats["rows_per_s"] else "-"
+        print(f"   {name:<6} x{stats['workers']}: {stats['rows']} rows in {stats['chunks']} chunks, "
+              f"busy {stats['busy_s']}s, {rate}, utilization {stats['utilization']:.0%}")
+
+
+__all__ = ["IndexPipeline", "Stage", "print_report"]
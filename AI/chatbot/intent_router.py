@@ -0,0 +1,369 @@
+"""
+Deterministic fast path for the common chat intents.
+
+Most questions map straight onto one agent tool ("what's trending?",
+"how many React developers?", "skills gap?", "how do I learn Python?").
+IntentRouter recognizes those locally so InternHubAgent can call the tool
+and return a templated answer without the two LLM round trips (tool choice
++ phrasing) of an agent turn:
+
+  1. rules: keyword patterns per intent plus the technology/skill named in
+     the question (matched against a vocabulary of known terms). Exactly one
+     intent has to match, with its required term present.
+  2. embeddings (optional, when no rule matched): similarity between the
+     question and a few example phrasings per intent, with the term masked
+     out. The best intent needs INTENT_ROUTER_THRESHOLD similarity and a
+     clear margin over the runner-up.
+
+The tools take at most one technology, so a question is only routed when
+that covers all of it: anything qualifying it further (a negation, a place
+or company, an application/verification status, a timeframe) goes to the
+agent, whose tools and SQL can take it into account.
+
+Anything ambiguous or unrecognized returns None and goes to the agent.
+
+Config (env):
+  - INTENT_ROUTER_ENABLED: 0 disables the fast path (default 1)
+  - INTENT_ROUTER_THRESHOLD: min cosine similarity for an embedding match (default 0.8)
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from chatbot.skill_index import SKILL_ALIASES
+
+# Terms recognized even before the DB vocabulary is loaded (roadmap topics included)
+BASE_VOCABULARY = [
+    "React", "Python", "JavaScript", "Java", "Node.js", "TypeScript", "CSS", "HTML",
+    "SQL", "MongoDB", "Docker", "Kubernetes", "AWS", "PHP", "Laravel", "Vue", "Angular",
+    "Django", "Flutter", "C#", "C++", "Backend", "Frontend", "Fullstack", "DevOps",
+]
+
+# Skill names that are also everyday words; only recognized through an alias
+AMBIGUOUS_TERMS = {"go", "c", "r", "rest", "express", "spring", "swift"}
+
+# Spellings folded onto one vocabulary term: the skill aliases plus role names
+TERM_ALIASES = {
+    **{alias: name for alias, name in SKILL_ALIASES.items() if alias not in AMBIGUOUS_TERMS},
+    "full stack": "Fullstack", "full-stack": "Fullstack",
+    "back end": "Backend", "back-end": "Backend", "front end": "Frontend", "front-end": "Frontend",
+}
+
+SLOT_MASK = "technology"
+
+# intent -> (tool name, argument name for the term or None, patterns)
+INTENTS = {
+    "top_technologies": ("get_top_technologies", None, [
+        r"\b(trending|hottest|popular|in[- ]demand)\b.*\b(tech|technolog|skills?|stacks?|languages?)",
+        r"\bmost (used|wanted|requested|popular|demanded)\b",
+        r"\btop (\d+ )?(tech|technolog|skills|languages)",
+        r"\bwhat (tech|technolog|skills|languages)\w* (are|is) (trending|popular|in demand)",
+        r"\bwhat('s| is) (trending|hot|popular)\b",
+    ]),
+    "technology_details": ("get_technology_details", "tech", [
+        r"\bhow many (\w+ ){0,3}(jobs|posts|positions|openings|internships|offers|companies)\b",
+        r"\b(demand|statistics|stats|percentage|market share) (for|of|on)\b",
+    ]),
+    "count_developers": ("count_developers_with_skill", "skill", [
+        r"\bhow many (\w+ ){0,3}(developers|devs|seekers|candidates|students|engineers|programmers|people)\b",
+        r"\bnumber of (\w+ ){0,3}(developers|devs|seekers|candidates|students|engineers|programmers)\b",
+        r"\b(developer|seeker|candidate) count\b",
+    ]),
+    "skill_distribution": ("get_skill_distribution", None, [
+        r"\b(what|which) skills do (the )?(developers|devs|seekers|candidates|students) have\b",
+        r"\bskills? (breakdown|distribution)\b",
+    ]),
+    "demand_supply_gap": ("get_demand_supply_gap", None, [
+        r"\b(skills?|talent) gaps?\b",
+        r"\bgap analysis\b",
+        r"\bdemand (vs\.?|versus|and|against) supply\b",
+        r"\bsupply (vs\.?|versus|and|against) demand\b",
+        r"\bindustry needs\b",
+    ]),
+    "partnership_companies": ("get_partnership_companies", None, [
+        r"\bpartner(ship)?s?\b.*\b(compan|opportunit|candidates?)",
+        r"\bcompanies (to|we could|should we) partner\b",
+    ]),
+    "learning_roadmap": ("get_learning_roadmap", "topic", [
+        r"\bhow (do|can|should|would) (i|we|you) (start )?(learn|get started|study)\b",
+        r"\bhow to (learn|get started|study)\b",
+        r"\b(learning )?(roadmap|learning path)\b",
+        r"\b(want|need) to learn\b",
+    ]),
+}
+
+# A few phrasings per intent for the embedding stage (term masked)
+EXAMPLES = {
+    "top_technologies": [
+        "what technologies are trending", "which skills are companies hiring for the most",
+        "most in demand programming languages", "top technologies in the job market",
+    ],
+    "technology_details": [
+        f"how many job posts ask for {SLOT_MASK}", f"how many companies use {SLOT_MASK}",
+        f"what is the demand for {SLOT_MASK}", f"{SLOT_MASK} market statistics",
+    ],
+    "count_developers": [
+        f"how many {SLOT_MASK} developers are there", f"number of candidates who know {SLOT_MASK}",
+        f"how many seekers have {SLOT_MASK} skills",
+    ],
+    "skill_distribution": [
+        "what skills do developers have", "breakdown of skills among candidates",
+        "most common skills of job seekers",
+    ],
+    "demand_supply_gap": [
+        "what is the skills gap", "industry demand compared to talent supply",
+        "which skills are in short supply",
+    ],
+    "partnership_companies": [
+        "which companies should we partner with", "partnership opportunities with companies",
+        "good companies for a university partnership",
+    ],
+    "learning_roadmap": [
+        f"how do i learn {SLOT_MASK}", f"roadmap to become a {SLOT_MASK} developer",
+        f"where should i start learning {SLOT_MASK}",
+    ],
+}
+
+# Qualifiers no routed tool can honor; any of them sends the question to the agent
+QUALIFIERS = {
+    "negation": re.compile(
+        r"n't\b|\b(not|no|never|without|except|excluding|besides|instead|avoid|rather than|other than)\b"
+    ),
+    "status": re.compile(
+        r"\b(accepted|rejected|pending|hired|employed|unemployed|shortlisted|interviewed|applied|"
+        r"applications?|verified|unverified|remote|on-?site|hybrid|part[- ]time|full[- ]time|"
+        r"senior|junior|entry[- ]level|paid|unpaid|salar(y|ies))\b"
+    ),
+    "timeframe": re.compile(
+        r"\b(this|last|past|next|previous) (\d+ )?(days?|weeks?|months?|quarters?|years?)\b"
+        r"|\b(since|yesterday|recently)\b|\b(19|20)\d\d\b"
+    ),
+    # "in Beirut", "at Google", "among Lebanese universities"
+    "scope": re.compile(
+        r"\b(in|at|from|near|around|among|across|within|outside|inside) (?:the |our |this |these )?([\w.&'-]+)"
+    ),
+    # "Google's", but not "what's"/"it's"
+    "possessive": re.compile(r"\b([a-z][\w.-]*)'s\b"),
+}
+
+# Words after "in"/"at"/... that do not narrow the question
+GENERIC_SCOPES = {
+    SLOT_MASK, "demand", "total", "general", "short", "high", "use", "market", "job", "jobs",
+    "platform", "industry", "field", "sector", "tech", "it", "now", "today", "here", "moment",
+    "terms", "particular", "order", "mind", "detail", "depth", "a", "an",
+}
+CONTRACTIONS = {"what", "that", "it", "there", "who", "where", "how", "let", "here", "today", "he", "she"}
+
+# Qualifiers an intent's tool already applies
+COVERED_QUALIFIERS = {"partnership_companies": {"verified"}}
+
+# Templated answers around the tool output
+TEMPLATES = {
+    "top_technologies": "Here is what companies on the platform are hiring for most right now.\n\n{result}",
+    "technology_details": "{result}",
+    "count_developers": "{result}",
+    "skill_distribution": "{result}",
+    "demand_supply_gap": "Here is how company demand compares with the skills candidates have.\n\n{result}",
+    "partnership_companies": "These verified companies are actively posting and could be good partners.\n\n{result}",
+    "learning_roadmap": "{result}",
+}
+
+
+class IntentRouter:
+    """Rule + embedding classifier that maps a question onto one agent tool."""
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        vocabulary_fn: Optional[Callable[[], Iterable[str]]] = None,
+        threshold: Optional[float] = None,
+        margin: float = 0.05,
+        vocabulary_ttl: float = 300,
+    ):
+        self.embed_fn = embed_fn
+        self.vocabulary_fn = vocabulary_fn
+        self.threshold = threshold or float(os.getenv("INTENT_ROUTER_THRESHOLD", 0.8))
+        self.margin = margin
+        self.vocabulary_ttl = vocabulary_ttl
+
+        self._patterns = {
+            intent: [re.compile(p) for p in spec[2]] for intent, spec in INTENTS.items()
+        }
+        self._lock = threading.Lock()
+        self._terms: Dict[str, str] = {}
+        self._term_pattern = None
+        self._vocabulary_loaded_at = None
+        self._example_vectors = None
+
+        self._routed: Dict[str, int] = {intent: 0 for intent in INTENTS}
+        self._rule_hits = 0
+        self._embedding_hits = 0
+        self._fallbacks = 0
+
+    # -------------------- Vocabulary --------------------
+    def _refresh_vocabulary(self):
+        """(Re)build the term matcher from the base list plus the DB vocabulary."""
+        now = time.monotonic()
+        if self._vocabulary_loaded_at is not None and now - self._vocabulary_loaded_at < self.vocabulary_ttl:
+            return
+        terms = {term.lower(): term for term in BASE_VOCABULARY}
+        if self.vocabulary_fn is not None:
+            try:
+                for term in self.vocabulary_fn():
+                    term = (term or "").strip()
+                    if term and term.lower() not in AMBIGUOUS_TERMS:
+                        terms.setdefault(term.lower(), term)
+            except Exception as e:
+                print(f"  Intent router vocabulary load failed: {e}")
+        for alias, term in TERM_ALIASES.items():
+            terms.setdefault(alias, term)
+        # Longest first so "Node.js" wins over "Node", "JavaScript" over "Java"
+        alternatives = sorted(terms, key=len, reverse=True)
+        pattern = re.compile(r"(?<![\w#+.])(" + "|".join(re.escape(t) for t in alternatives) + r")(?![\w#+])")
+        with self._lock:
+            self._terms = terms
+            self._term_pattern = pattern
+            self._vocabulary_loaded_at = now
+
+    def _find_term(self, text: str):
+        """(canonical term, text as written) for the known term in `text`.
+
+        Returns (None, None) when no term, or more than one distinct term, is named.
+        """
+        self._refresh_vocabulary()
+        found = {}
+        for match in self._term_pattern.finditer(text.lower()):
+            found.setdefault(self._terms[match.group(1)], match.group(1))
+        if len(found) != 1:
+            return None, None
+        return next(iter(found.items()))
+
+    def extract_term(self, text: str) -> Optional[str]:
+        """The technology/skill named in `text` (canonical spelling), if any."""
+        return self._find_term(text)[0]
+
+    def extract_terms(self, text: str) -> Set[str]:
+        """Every technology/skill named in `text` (canonical spellings)."""
+        self._refresh_vocabulary()
+        return {self._terms[match.group(1)] for match in self._term_pattern.finditer(" ".join(text.lower().split()))}
+
+    # -------------------- Classification --------------------
+    @staticmethod
+    def _qualifiers(text: str, written: Optional[str]) -> set:
+        """Words in `text` that narrow it beyond one technology (see QUALIFIERS)."""
+        text = text.replace("\u2019", "'")
+        if written:
+            text = re.sub(r"(?<![\w#+.])" + re.escape(written) + r"(?![\w#+])", SLOT_MASK, text)
+        found = set()
+        for name, pattern in QUALIFIERS.items():
+            for match in pattern.finditer(text):
+                if name == "scope":
+                    if match.group(2) not in GENERIC_SCOPES:
+                        found.add(match.group(0))
+                elif name == "possessive":
+                    if match.group(1) not in CONTRACTIONS and match.group(1) != SLOT_MASK:
+                        found.add(match.group(0))
+                else:
+                    found.add(match.group(0))
+        return found
+
+    def _by_rules(self, text: str, term: Optional[str]) -> Optional[str]:
+        matched = [
+            intent for intent, patterns in self._patterns.items()
+            if any(p.search(text) for p in patterns)
+        ]
+        # A term-less intent asked about one technology ("is React trending?")
+        # is not what its tool answers
+        matched = [
+            intent for intent in matched
+            if (INTENTS[intent][1] is None) == (term is None)
+        ]
+        return matched[0] if len(matched) == 1 else None
+
+    def _by_embedding(self, text: str, term: Optional[str], written: Optional[str]) -> Optional[str]:
+        if self.embed_fn is None:
+            return None
+        if self._example_vectors is None:
+            self._example_vectors = {
+                intent: np.asarray([self.embed_fn(example) for example in examples], dtype=np.float32)
+                for intent, examples in EXAMPLES.items()
+            }
+        masked = text.replace(written, SLOT_MASK) if written else text
+        query = np.asarray(self.embed_fn(masked), dtype=np.float32)
+        scores = sorted(
+            ((float(np.max(vectors @ query)), intent) for intent, vectors in self._example_vectors.items()),
+            reverse=True,
+        )
+        (best, intent), (second, _) = scores[0], scores[1]
+        if best < self.threshold or best - second < self.margin:
+            return None
+        if (INTENTS[intent][1] is None) != (term is None):
+            return None
+        return intent
+
+    def classify(self, question: str) -> Optional[Dict]:
+        """Route a question to a tool, or None when the agent should handle it.
+
+        Returns:
+            Dict with 'intent', 'tool', 'args', 'method' ('rule'/'embedding')
+            and 'template'.
+        """
+        text = " ".join(question.lower().split())
+        term, written = self._find_term(text)
+        if term is None and self._term_pattern.search(text):
+            # Several technologies in one question: leave it to the agent
+            with self._lock:
+                self._fallbacks += 1
+            return None
+
+        qualifiers = self._qualifiers(text, written)
+        method = "rule"
+        intent = self._by_rules(text, term)
+        if intent is None and not qualifiers:
+            method = "embedding"
+            intent = self._by_embedding(text, term, written)
+        if intent is not None and qualifiers - COVERED_QUALIFIERS.get(intent, set()):
+            # The tool would answer a broader question than the one asked
+            intent = None
+        if intent is None:
+            with self._lock:
+                self._fallbacks += 1
+            return None
+
+        tool, arg, _ = INTENTS[intent]
+        with self._lock:
+            self._routed[intent] += 1
+            if method == "rule":
+                self._rule_hits += 1
+            else:
+                self._embedding_hits += 1
+        return {
+            "intent": intent,
+            "tool": tool,
+            "args": {arg: term} if arg else {},
+            "method": method,
+            "template": TEMPLATES[intent],
+        }
+
+    def get_statistics(self) -> Dict:
+        """How many questions took the fast path (per intent/method) vs the agent."""
+        with self._lock:
+            routed = self._rule_hits + self._embedding_hits
+            total = routed + self._fallbacks
+            return {
+                "fast_path": routed,
+                "agent_fallbacks": self._fallbacks,
+                "fast_path_rate": round(routed / total, 3) if total else 0.0,
+                "by_rule": self._rule_hits,
+                "by_embedding": self._embedding_hits,
+                "by_intent": dict(self._routed),
+                "vocabulary_size": len(self._terms),
+            }
+
+
+__all__ = ["QUALIFIERS", "IntentRouter"]
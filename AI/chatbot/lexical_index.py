@@ -0,0 +1,138 @@
+"""
+In-process BM25 keyword index and reciprocal rank fusion for RAGSystem.
+
+Vector search alone ranks short keyword queries ("Kubernetes", "Laravel")
+poorly: the query embedding carries little signal and near-miss profiles
+score about as well as exact ones. BM25 over the same document text ranks
+exact term matches first, and fusing both rankings with reciprocal rank
+fusion (score = sum of 1 / (k + rank)) keeps semantic matches for longer,
+descriptive queries.
+
+Tokens are lower-cased words (C++, C#, Node.js kept whole) folded through
+the skill aliases, so "ReactJS" in a profile matches a "React" query.
+Documents are added/removed one at a time, so the index follows upserts
+and deletions without a rebuild.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chatbot.skill_index import canonical_key
+from chatbot.vector_backends import matches
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+# Field labels of the RAG documents plus common English filler
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "of", "on", "or", "the", "to", "with", "who", "what", "which", "me",
+    "find", "show", "looking", "n/a", "position", "technology", "company", "location",
+    "description", "info", "name", "skills",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, alias-folded tokens of `text` without stopwords."""
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            tokens.append(canonical_key(token))
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked id lists; ids ranked high in any list (or in several) come first."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Okapi BM25 over (id, text, metadata) documents, updatable in place."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._documents: Dict[str, str] = {}
+        self._metadatas: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _remove(self, doc_id: str):
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in set(tokenize(self._documents.pop(doc_id))):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._metadatas.pop(doc_id, None)
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        """Insert or replace documents."""
+        with self._lock:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                self._remove(doc_id)
+                tokens = tokenize(document)
+                for term, tf in Counter(tokens).items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                self._lengths[doc_id] = len(tokens)
+                self._total_length += len(tokens)
+                self._documents[doc_id] = document
+                self._metadatas[doc_id] = metadata or {}
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def search(self, query: str, n_results: int = 10, where: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        """Top (id, score) pairs for `query`, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._lengths)
+            if not terms or not count:
+                return []
+            average = self._total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            if where:
+                scores = {d: s for d, s in scores.items() if matches(self._metadatas[d], where)}
+        return heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+
+    def get(self, doc_id: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """(document, metadata) of an indexed id."""
+        with self._lock:
+            return self._documents.get(doc_id), self._metadatas.get(doc_id)
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {"documents": len(self._lengths), "terms": len(self._postings)}
+
+
+__all__ = ["BM25Index", "reciprocal_rank_fusion", "tokenize"]
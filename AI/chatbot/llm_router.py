@@ -0,0 +1,298 @@
+"""
+Runtime LLM provider selection for InternHubAgent.
+
+Each provider (DeepSeek, Gemini) gets its own health record:
+
+  - rolling latency window (p50/p95/p99) and success/error counters
+  - a circuit breaker: after LLM_BREAKER_FAILURES consecutive failures the
+    provider is skipped for LLM_BREAKER_COOLDOWN seconds, then one probe
+    request is let through (half-open) to decide whether to close it again
+
+LLMRouter.call() runs a turn on the first healthy provider in priority order
+and moves on to the next one when it fails. With hedging enabled
+(LLM_HEDGE=1) a turn that is still running after the primary's
+LLM_HEDGE_PERCENTILE latency is also started on the backup, and whichever
+finishes first wins; the loser still completes in the background and only
+feeds the metrics. Each attempt runs in a copy of the caller's context, so
+both see the turn's tool memo (tool_runner.py) and a hedged agent turn
+reuses the primary's tool results instead of querying again. Streamed
+turns (stream()) fail over too, but only before their first event.
+
+Config (env):
+  - LLM_BREAKER_FAILURES: consecutive failures that open the circuit (default 3)
+  - LLM_BREAKER_COOLDOWN: seconds before a half-open probe (default 30)
+  - LLM_HEDGE: 1 to enable hedged requests (default 0)
+  - LLM_HEDGE_PERCENTILE: primary latency percentile that triggers the hedge (default 95)
+  - LLM_HEDGE_MIN_SAMPLES: latency samples needed before hedging (default 20)
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class NoProviderAvailableError(RuntimeError):
+    """Every provider failed for this call."""
+
+
+class ProviderHealth:
+    """Latency/error tracking and circuit breaker for one provider."""
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float, window: int = 200):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+
+        self._successes = 0
+        self._failures = 0
+        self._circuit_opens = 0
+        self._last_error: Optional[str] = None
+
+    def allow_request(self) -> bool:
+        """True if the circuit lets a call through (claims the half-open probe)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._successes += 1
+            self._consecutive_failures = 0
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self._failures += 1
+            self._consecutive_failures += 1
+            self._last_error = f"{type(error).__name__}: {error}"
+            if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self._circuit_opens += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def cancel(self):
+        """Release a claimed half-open probe that never ran to completion."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            return float(np.percentile(list(self._latencies), percentile))
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            latencies = list(self._latencies)
+            calls = self._successes + self._failures
+            stats = {
+                "state": self.state,
+                "successes": self._successes,
+                "failures": self._failures,
+                "error_rate": round(self._failures / calls, 3) if calls else 0.0,
+                "consecutive_failures": self._consecutive_failures,
+                "circuit_opens": self._circuit_opens,
+                "last_error": self._last_error,
+            }
+        if latencies:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            stats.update(latency_ms={
+                "p50": round(p50 * 1000, 1),
+                "p95": round(p95 * 1000, 1),
+                "p99": round(p99 * 1000, 1),
+                "samples": len(latencies),
+            })
+        return stats
+
+
+class LLMRouter:
+    """Priority-ordered providers with circuit breakers and optional hedging."""
+
+    def __init__(
+        self,
+        providers: List[str],
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+    ):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        failure_threshold = failure_threshold or int(os.getenv("LLM_BREAKER_FAILURES", 3))
+        cooldown = cooldown or float(os.getenv("LLM_BREAKER_COOLDOWN", 30))
+        self.providers = list(providers)
+        self.health = {name: ProviderHealth(name, failure_threshold, cooldown) for name in self.providers}
+
+        self.hedge = hedge if hedge is not None else os.getenv("LLM_HEDGE", "0") == "1"
+        self.hedge_percentile = hedge_percentile or float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+        self.hedge_min_samples = hedge_min_samples or int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+        # Hedged calls run here so the caller's thread can wait on both
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge") if self.hedge else None
+
+        self._lock = threading.Lock()
+        self._failovers = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def _next_available(self, names: List[str]) -> Optional[str]:
+        """Pop providers off `names` until one whose circuit lets a call through."""
+        while names:
+            name = names.pop(0)
+            if self.health[name].allow_request():
+                return name
+        return None
+
+    def _timed(self, name: str, fn: Callable[[str], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            result = fn(name)
+        except Exception as e:
+            self.health[name].record_failure(e)
+            raise
+        self.health[name].record_success(time.perf_counter() - started)
+        return result
+
+    def call(self, fn: Callable[[str], Any]) -> Any:
+        """Run fn(provider_name) on the best provider, failing over on errors.
+
+        Raises:
+            NoProviderAvailableError: every provider tried raised (chained to the last error).
+        """
+        remaining = list(self.providers)
+        # If every circuit is open, try the primary anyway rather than failing outright
+        name = self._next_available(remaining) or self.providers[0]
+        last_error = None
+        while name is not None:
+            try:
+                if self.hedge and remaining:
+                    return self._hedged(fn, name, remaining)
+                return self._timed(name, fn)
+            except Exception as e:
+                last_error = e
+            failed, name = name, self._next_available(remaining)
+            if name is not None:
+                with self._lock:
+                    self._failovers += 1
+                print(f"  LLM provider {failed} failed ({last_error}), failing over to {name}")
+        raise NoProviderAvailableError(f"All LLM providers failed: {last_error}") from last_error
+
+    def stream(self, fn: Callable[[str], Iterator]) -> Iterator:
+        """call() for generators: fails over only until the first item is produced.
+
+        Once output has been yielded to the caller a failure is raised as is;
+        streamed turns are never hedged.
+        """
+        remaining = list(self.providers)
+        name = self._next_available(remaining) or self.providers[0]
+        last_error = None
+        while name is not None:
+            started = time.perf_counter()
+            produced = False
+            try:
+                for item in fn(name):
+                    produced = True
+                    yield item
+            except GeneratorExit:
+                self.health[name].cancel()
+                raise
+            except Exception as e:
+                self.health[name].record_failure(e)
+                if produced:
+                    raise
+                last_error = e
+            else:
+                self.health[name].record_success(time.perf_counter() - started)
+                return
+            failed, name = name, self._next_available(remaining)
+            if name is not None:
+                with self._lock:
+                    self._failovers += 1
+                print(f"  LLM provider {failed} failed ({last_error}), failing over to {name}")
+        raise NoProviderAvailableError(f"All LLM providers failed: {last_error}") from last_error
+
+    def _hedged(self, fn: Callable[[str], Any], primary: str, remaining: List[str]) -> Any:
+        """Also start the next provider if `primary` runs past its latency percentile."""
+        health = self.health[primary]
+        first = self._submit(primary, fn)
+        if health.samples < self.hedge_min_samples:
+            return first.result()
+
+        done, _ = wait([first], timeout=health.latency_percentile(self.hedge_percentile))
+        backup = None if done else self._next_available(remaining)
+        if backup is None:
+            return first.result()
+
+        with self._lock:
+            self._hedges += 1
+        second = self._submit(backup, fn)
+        pending = {first, second}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self._hedge_wins += 1
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def _submit(self, name: str, fn: Callable[[str], Any]):
+        # One context copy per attempt: a Context can't be entered by two threads at once
+        return self._executor.submit(contextvars.copy_context().run, self._timed, name, fn)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def get_statistics(self) -> Dict:
+        """Per-provider health/latency plus failover and hedging counters."""
+        with self._lock:
+            counters = {
+                "failovers": self._failovers,
+                "hedging": self.hedge,
+                "hedge_percentile": self.hedge_percentile,
+                "hedges_fired": self._hedges,
+                "hedge_wins": self._hedge_wins,
+            }
+        return {
+            "providers": {name: self.health[name].get_statistics() for name in self.providers},
+            **counters,
+        }
+
+
+__all__ = ["LLMRouter", "NoProviderAvailableError", "ProviderHealth"]
@@ -0,0 +1,186 @@
+"""
+In-memory LRU/TTL cache, used for DB aggregate queries (and, with no TTL,
+for RAGSystem's query embeddings).
+
+The market aggregates (top technologies, skill distribution, demand/supply
+gap, partnership candidates) are full GROUP BY scans whose results only
+change when posts or skills change. QueryCache keeps them in memory with:
+
+  - per-entry TTLs and a bounded size with LRU eviction
+  - hit/miss/eviction counters
+  - a data version: the loader periodically probes a cheap
+    COUNT(*)/MAX(updated_at) fingerprint and the cache drops everything
+    when it changes, so edits show up without waiting for the TTL
+  - explicit invalidate() for callers that know data changed
+
+`cached_query` wires a loader method (sync or async) to `self.cache`.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL and data-version invalidation."""
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        version_check_interval: Optional[float] = None,
+    ):
+        self.max_size = max_size or int(os.getenv("DB_CACHE_MAX_SIZE", 256))
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("DB_CACHE_TTL", 300))
+        self.version_check_interval = (
+            version_check_interval
+            if version_check_interval is not None
+            else float(os.getenv("DB_CACHE_VERSION_INTERVAL", 10))
+        )
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._last_version_check = 0.0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    # -------------------- Lookups --------------------
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value); expired entries count as misses."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return False, None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value; ttl=None uses the default, ttl<=0 means no expiry."""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, name: Optional[str] = None) -> int:
+        """Drop every entry, or only those for one query name. Returns count dropped."""
+        with self._lock:
+            if name is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [k for k in self._entries if isinstance(k, tuple) and k and k[0] == name]
+                for k in keys:
+                    del self._entries[k]
+                dropped = len(keys)
+            self._invalidations += 1
+            return dropped
+
+    # -------------------- Data version --------------------
+    def version_check_due(self) -> bool:
+        """True (once per interval, for one caller) when the data version should be re-probed."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_version_check < self.version_check_interval:
+                return False
+            self._last_version_check = now
+            return True
+
+    def update_version(self, version: Any):
+        """Record the latest data version, clearing the cache if it changed."""
+        with self._lock:
+            changed = self._version is not None and version != self._version
+            self._version = version
+        if changed:
+            self.invalidate()
+
+    @property
+    def version(self) -> Any:
+        return self._version
+
+    def get_statistics(self) -> Dict:
+        """Size, hit rate and eviction counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "data_version": str(self._version) if self._version is not None else None,
+            }
+
+
+def cached_query(name: str, ttl: Optional[float] = None):
+    """Cache a loader method's result in `self.cache` under (name, args).
+
+    Works for both sync (DatabaseLoader) and async (AsyncDatabaseLoader)
+    methods; the loader provides `_check_data_version()` with the matching
+    sync/async flavour. Cached results are shared, treat them as read-only.
+    """
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):
+                cache = getattr(self, "cache", None)
+                if cache is None:
+                    return await fn(self, *args, **kwargs)
+                await self._check_data_version()
+                key = (name, args, tuple(sorted(kwargs.items())))
+                hit, value = cache.get(key)
+                if hit:
+                    return value
+                value = await fn(self, *args, **kwargs)
+                cache.set(key, value, ttl)
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "cache", None)
+            if cache is None:
+                return fn(self, *args, **kwargs)
+            self._check_data_version()
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = fn(self, *args, **kwargs)
+            cache.set(key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ["QueryCache", "cached_query"]
@@ -1,67 +1,545 @@
-﻿import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional
+﻿from typing import List, Dict, Iterable, Optional, Set, Union
+import numpy as np
 import json
 import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from chatbot.embedding_cache import EmbeddingCache
+from chatbot.lexical_index import BM25Index, reciprocal_rank_fusion
+from chatbot.query_cache import QueryCache
+from chatbot.vector_backends import BACKENDS, NumpyVectorStore, combine_filters
+
+# Recorded in each collection's metadata; a store built with a different
+# model/dimension is flagged as stale on warm start instead of silently
+# returning mismatched results.
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+INDEX_FORMAT_VERSION = 1
+
+# kind -> (base collection name, description). A full reindex builds
+# "<base>_<timestamp>" collections and only then switches collections.json
+# (in the persist directory) to them; every process re-resolves its
+# collections when that file changes, so searches keep working during and
+# after a rebuild. The generation before stays until the next full run, for
+# requests still holding it.
+COLLECTIONS = {
+    "posts": ("internship_posts", "Internship posts indexed for seeker search"),
+    "seekers": ("seekers_profiles", "Seeker profiles indexed for company search"),
+}
+ALIASES_FILE = "collections.json"
+
+# Post metadata that query_posts can filter on; the numpy backend keeps an
+# ID set per value of each so filters are resolved before vector scoring
+POST_FILTER_FIELDS = ("technology", "company_location", "company_name", "company_id", "verification_status")
 
 class RAGSystem:
-    """Semantic search using ChromaDB + embeddings for posts and seekers."""
+    """Semantic search using ChromaDB (or the NumPy backend) + embeddings for posts and seekers."""
 
-    def __init__(self, persist_directory: Optional[str] = None):
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        encode_processes: Optional[int] = None,
+        persistent: Optional[bool] = None,
+        backend: Optional[str] = None,
+        quantize: Optional[str] = None,
+    ):
         """Initialize ChromaDB client and embedding model.
         
         Args:
             persist_directory: Where to store ChromaDB files. 
                               Defaults to ./chroma_db in current directory.
+            batch_size: Texts per embedding forward pass
+                        (env RAG_EMBED_BATCH_SIZE, default 64).
+            encode_processes: CPU processes for bulk encoding; 1 keeps it
+                              in-process, 0 uses every core
+                              (env RAG_EMBED_PROCESSES, default 1).
+            persistent: Keep the index on disk so restarts warm-start from
+                        it (env RAG_STORE=persistent|memory, default persistent).
+            backend: Vector store, 'chroma' or 'numpy' (exact search, see
+                     vector_backends.py) (env RAG_BACKEND, default chroma).
+            quantize: 'int8' keeps numpy-backend vectors as int8 codes and
+                      re-ranks a shortlist at float32 (env RAG_QUANTIZE,
+                      default none; shortlist size RAG_RERANK_FACTOR x k).
         """
         if persist_directory is None:
             persist_directory = os.path.join(os.path.dirname(__file__), "chroma_db")
+        if persistent is None:
+            persistent = os.getenv("RAG_STORE", "persistent") != "memory"
+        self.persist_directory = persist_directory
+        self.persistent = persistent
+        self.backend = backend or os.getenv("RAG_BACKEND", "chroma")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown RAG backend {self.backend!r}, expected one of {BACKENDS}")
+        self.load_times = {}
+        started = time.perf_counter()
+
+        # Initialize the vector store (on-disk unless RAG_STORE=memory)
+        self.quantize = quantize or os.getenv("RAG_QUANTIZE", "none")
+        if self.backend == "numpy":
+            if self.quantize == "int8" and not persistent:
+                print("  RAG_QUANTIZE=int8 with RAG_STORE=memory keeps the float32 vectors resident too; "
+                      "it speeds up scans but uses more memory, not less")
+            self.client = NumpyVectorStore(
+                os.path.join(persist_directory, "numpy_store") if persistent else None,
+                EMBEDDING_DIM,
+                quantize=self.quantize,
+                rerank_factor=int(os.getenv("RAG_RERANK_FACTOR", 4)),
+                recall_sample=float(os.getenv("RAG_QUANT_RECALL_SAMPLE", 0)),
+                indexed_fields=POST_FILTER_FIELDS,
+            )
+        else:
+            if self.quantize != "none":
+                print(f"  RAG_QUANTIZE={self.quantize} needs the numpy backend; ChromaDB stores float32")
+                self.quantize = "none"
+            self.client = self._create_client(persist_directory, persistent)
+        self.load_times["client_ms"] = self._elapsed_ms(started)
+
+        # Embedding model (384-dim, lightweight). This is the only model copy:
+        # embeddings are computed here and handed to ChromaDB, collections are
+        # opened without Chroma's own embedding function. Loading it (torch)
+        # dominates startup, so it happens on first use or in warm_up().
+        self._embedding_model = None
+        self._model_lock = threading.Lock()
+        self.embedding_dim = EMBEDDING_DIM
+        self.batch_size = batch_size or int(os.getenv("RAG_EMBED_BATCH_SIZE", 64))
+        if encode_processes is None:
+            encode_processes = int(os.getenv("RAG_EMBED_PROCESSES", 1))
+        self.encode_processes = encode_processes if encode_processes > 0 else (os.cpu_count() or 1)
+        # Multi-process pool held open by encode_pool() for a whole indexing run
+        self._encode_pool = None
+        self._encode_pool_lock = threading.Lock()
+        # ChromaDB rejects very large single writes; split adds/upserts
+        self.write_batch_size = int(os.getenv("RAG_WRITE_BATCH_SIZE", 1000))
+        # Content-hash cache so unchanged documents are never re-embedded;
+        # opened on first use (only indexing needs it). RAG_EMBED_CACHE=0 disables.
+        self.embedding_cache_enabled = os.getenv("RAG_EMBED_CACHE", "1") != "0"
+        self._embedding_cache = None
+        # In-memory LRU for search query vectors (same queries repeat a lot)
+        self.query_embedding_cache = QueryCache(
+            max_size=int(os.getenv("RAG_QUERY_CACHE_SIZE", 1024)), default_ttl=0
+        )
+
+        # Hybrid retrieval: BM25 over the same documents, fused with the
+        # vector ranking (RAG_HYBRID=0 for vector-only). The keyword index
+        # lives in memory; it is loaded from ChromaDB on first use and
+        # reloaded when index_data.py has written since (index_state.json
+        # or a collection count changed), checked at most every
+        # RAG_LEXICAL_CHECK_INTERVAL seconds.
+        self.hybrid = os.getenv("RAG_HYBRID", "1") != "0"
+        self.rrf_k = int(os.getenv("RAG_RRF_K", 60))
+        self.hybrid_candidates = int(os.getenv("RAG_HYBRID_CANDIDATES", 50))
+        self.lexical_check_interval = float(os.getenv("RAG_LEXICAL_CHECK_INTERVAL", 30))
+        self.lexical = {"posts": BM25Index(), "seekers": BM25Index()}
+        self._lexical_signature = {}
+        self._lexical_checked_at = {}
+        self._lexical_lock = threading.Lock()
+
+        # Create or get collections (names from collections.json)
+        step = time.perf_counter()
+        self._collections_lock = threading.Lock()
+        self._rebuild_names = None
+        self._aliases_signature = self._aliases_stat()
+        self._open_collections(self._read_aliases()["current"])
+        self.load_times["collections_ms"] = self._elapsed_ms(step)
+
+        # Warm start: verify what we opened before serving from it
+        step = time.perf_counter()
+        self._check_collections()
+        self.load_times["integrity_check_ms"] = self._elapsed_ms(step)
+        self.load_times["total_ms"] = self._elapsed_ms(started)
+
+        for name, status in self.index_status.items():
+            if status["status"] not in ("ok", "empty"):
+                print(f"  RAG {name} index is {status['status']}: {status['detail']} (run index_data.py --full)")
+        print(f" RAG store loaded in {self.load_times['total_ms']:.0f} ms "
+              f"({self.backend}, {'persistent' if persistent else 'in-memory'})")
 
-        # Initialize ChromaDB with persistence
-        self.client = chromadb.Client(
+    @staticmethod
+    def _create_client(persist_directory: str, persistent: bool):
+        """On-disk ChromaDB client (PersistentClient), or in-memory if requested."""
+        import chromadb
+        from chromadb.config import Settings
+
+        settings = Settings(anonymized_telemetry=False)
+        if not persistent:
+            return chromadb.Client(settings)
+        os.makedirs(persist_directory, exist_ok=True)
+        if hasattr(chromadb, "PersistentClient"):
+            return chromadb.PersistentClient(path=persist_directory, settings=settings)
+        # chromadb < 0.4 persisted through duckdb+parquet
+        return chromadb.Client(
             Settings(
+                chroma_db_impl="duckdb+parquet",
                 persist_directory=persist_directory,
                 anonymized_telemetry=False,
             )
         )
 
-        # Initialize embedding model (384-dim, lightweight)
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
 
-        # Create or get collections
-        self.posts_collection = self._get_or_create_collection(
-            "internship_posts",
-            "Internship posts indexed for seeker search",
-        )
-        self.seekers_collection = self._get_or_create_collection(
-            "seekers_profiles", "Seeker profiles indexed for company search"
-        )
+    def _collection_metadata(self, description: str) -> Dict:
+        return {
+            "description": description,
+            "embedding_model": EMBEDDING_MODEL_NAME,
+            "embedding_dim": self.embedding_dim,
+            "index_format": INDEX_FORMAT_VERSION,
+        }
 
     def _get_or_create_collection(self, name: str, description: str):
         """Get existing collection or create new one."""
         try:
-            return self.client.get_collection(name)
+            return self.client.get_collection(name, embedding_function=None)
         except Exception:
             return self.client.create_collection(
-                name=name, metadata={"description": description}
+                name=name,
+                metadata=self._collection_metadata(description),
+                embedding_function=None,
             )
 
-    # ================== POSTS INDEXING (for seekers) ==================
-    def index_posts(self, posts: List[Dict]) -> int:
-        """Index all posts for seeker discovery.
-        
-        Args:
-            posts: List of post dicts with id, position, technology, 
-                   company_name, company_location, description, etc.
-        
+    # ================== COLLECTION GENERATIONS ==================
+    @property
+    def _aliases_path(self) -> str:
+        return os.path.join(self.persist_directory, ALIASES_FILE)
+
+    def _aliases_stat(self):
+        if not self.persistent:
+            return None
+        try:
+            st = os.stat(self._aliases_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_aliases(self) -> Dict:
+        """{'current': {kind: name}, 'previous': {kind: name}}; base names without collections.json."""
+        aliases = {}
+        if self.persistent:
+            try:
+                with open(self._aliases_path, "r", encoding="utf-8") as f:
+                    aliases = json.load(f)
+            except (OSError, ValueError):
+                aliases = {}
+        current = {kind: base for kind, (base, _) in COLLECTIONS.items()}
+        current.update(aliases.get("current") or {})
+        return {"current": current, "previous": aliases.get("previous") or {}}
+
+    def _write_aliases(self, current: Dict, previous: Dict):
+        os.makedirs(self.persist_directory, exist_ok=True)
+        tmp_path = self._aliases_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "current": current,
+                "previous": previous,
+                "switched_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }, f, indent=2)
+        os.replace(tmp_path, self._aliases_path)
+        self._aliases_signature = self._aliases_stat()
+
+    def _open_collections(self, names: Dict):
+        self.collection_names = dict(names)
+        self.posts_collection = self._get_or_create_collection(names["posts"], COLLECTIONS["posts"][1])
+        self.seekers_collection = self._get_or_create_collection(names["seekers"], COLLECTIONS["seekers"][1])
+
+    def _check_collections(self):
+        self.index_status = {
+            "posts": self._check_collection(self.posts_collection),
+            "seekers": self._check_collection(self.seekers_collection),
+        }
+
+    def _reset_lexical(self):
+        with self._lexical_lock:
+            for index in self.lexical.values():
+                index.clear()
+            self._lexical_signature = {kind: None for kind in self.lexical}
+            self._lexical_checked_at = {}
+
+    def _sync_collections(self):
+        """Reopen the collections after a full reindex (any process) switched collections.json."""
+        if self._rebuild_names is not None:
+            return  # this process is the one rebuilding
+        signature = self._aliases_stat()
+        if signature == self._aliases_signature:
+            return
+        with self._collections_lock:
+            if signature == self._aliases_signature:
+                return
+            names = self._read_aliases()["current"]
+            if names != self.collection_names:
+                self._open_collections(names)
+                self._check_collections()
+                self._reset_lexical()
+                print(f" RAG collections switched to {names['posts']}, {names['seekers']}")
+            self._aliases_signature = signature
+
+    def _drop_collections(self, names: Iterable[str]):
+        for name in names:
+            try:
+                self.client.delete_collection(name)
+            except Exception:
+                pass  # already gone
+
+    def begin_rebuild(self):
+        """Open empty collections under new names for a full reindex.
+
+        This process writes into them; everyone else keeps serving the
+        current collections until finish_rebuild() switches collections.json.
+        The embedding cache notes which texts the run embeds so
+        finish_rebuild() can drop the rest.
+        """
+        if self.embedding_cache is not None:
+            self.embedding_cache.start_tracking()
+        suffix = f"{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        names = {kind: f"{base}_{suffix}" for kind, (base, _) in COLLECTIONS.items()}
+        with self._collections_lock:
+            self._rebuild_names = names
+            self._open_collections(names)
+            self._check_collections()
+            self._reset_lexical()
+
+    def finish_rebuild(self):
+        """Switch collections.json to the rebuilt collections.
+
+        The generation they replace is kept (requests may still hold it) and
+        the one before it is dropped. The embedding cache is compacted to
+        the texts this run embedded.
+        """
+        aliases = self._read_aliases()
+        current, previous = self._rebuild_names, aliases["current"]
+        self._write_aliases(current, previous)
+        keep = set(current.values()) | set(previous.values())
+        self._drop_collections(name for name in aliases["previous"].values() if name not in keep)
+        self._rebuild_names = None
+        if self._embedding_cache is not None:
+            self._embedding_cache.compact()
+
+    def abort_rebuild(self):
+        """Drop a half-built generation and go back to the current collections."""
+        if self._rebuild_names is None:
+            return
+        names, self._rebuild_names = self._rebuild_names, None
+        self._drop_collections(names.values())
+        if self._embedding_cache is not None:
+            self._embedding_cache.stop_tracking()
+        with self._collections_lock:
+            self._open_collections(self._read_aliases()["current"])
+            self._check_collections()
+            self._reset_lexical()
+
+    def _check_collection(self, collection) -> Dict:
+        """Integrity/compatibility check of a warm-started collection.
+
+        Status is one of: ok, empty, legacy (built before model metadata was
+        recorded), stale (different embedding model/dimension) or corrupt.
+        """
+        try:
+            count = collection.count()
+        except Exception as e:
+            return {"status": "corrupt", "count": 0, "detail": f"count failed: {e}"}
+        if count == 0:
+            return {"status": "empty", "count": 0, "detail": "no documents indexed"}
+
+        metadata = collection.metadata or {}
+        try:
+            sample = collection.peek(limit=1)
+            vectors = sample.get("embeddings")
+            stored_dim = len(vectors[0]) if vectors is not None and len(vectors) else None
+        except Exception as e:
+            return {"status": "corrupt", "count": count, "detail": f"read failed: {e}"}
+
+        if stored_dim is not None and stored_dim != self.embedding_dim:
+            return {
+                "status": "stale",
+                "count": count,
+                "detail": f"stored vectors are {stored_dim}-dim, model is {self.embedding_dim}-dim",
+            }
+        if "embedding_model" not in metadata:
+            return {"status": "legacy", "count": count, "detail": "no embedding model recorded"}
+        if metadata.get("embedding_model") != EMBEDDING_MODEL_NAME:
+            return {
+                "status": "stale",
+                "count": count,
+                "detail": f"built with {metadata.get('embedding_model')}, model is {EMBEDDING_MODEL_NAME}",
+            }
+        return {"status": "ok", "count": count, "detail": ""}
+
+    # ================== EMBEDDINGS ==================
+    @property
+    def embedding_model(self):
+        """The SentenceTransformer, loaded on first access."""
+        if self._embedding_model is None:
+            with self._model_lock:
+                if self._embedding_model is None:
+                    self._embedding_model = self._load_model()
+        return self._embedding_model
+
+    def _load_model(self):
+        from sentence_transformers import SentenceTransformer
+
+        step = time.perf_counter()
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        dim = model.get_sentence_embedding_dimension()
+        if dim != self.embedding_dim:
+            raise ValueError(f"{EMBEDDING_MODEL_NAME} produces {dim}-dim vectors, expected {self.embedding_dim}")
+        self.load_times["model_ms"] = self._elapsed_ms(step)
+        return model
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._embedding_model is not None
+
+    def warm_up(self):
+        """Load the model (and keyword indexes) so the first query pays for neither."""
+        step = time.perf_counter()
+        self._encode(["warm up"])
+        self.load_times["warm_up_ms"] = self._elapsed_ms(step)
+        if self.hybrid:
+            try:
+                for kind in self.lexical:
+                    self._lexical_index(kind)
+            except Exception as e:
+                print(f"  Keyword index load failed (retried on a later query): {e}")
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        if self._embedding_cache is None and self.embedding_cache_enabled:
+            self._embedding_cache = EmbeddingCache(
+                os.path.join(self.persist_directory, "embedding_cache"),
+                EMBEDDING_MODEL_NAME,
+                self.embedding_dim,
+            )
+        return self._embedding_cache
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for documents, reusing cached vectors for unchanged text.
+
         Returns:
-            Number of posts indexed.
+            float32 array of L2-normalized embeddings, one row per text.
         """
-        if not posts:
-            print("  No posts to index")
-            return 0
+        cache = self.embedding_cache
+        if cache is None:
+            return self._encode(texts)
+
+        vectors, missing = cache.get_many(texts)
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = self._encode(missing_texts)
+            cache.put_many(missing_texts, fresh)
+            vectors[missing] = fresh
+        return vectors
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run the model over texts in batches (optionally across CPU processes)."""
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+
+        if self._encode_pool is not None and len(texts) > self.batch_size:
+            # One pool (input/output queues) serves one call at a time
+            with self._encode_pool_lock:
+                embeddings = self.embedding_model.encode_multi_process(
+                    texts, self._encode_pool, batch_size=self.batch_size
+                )
+        # Spawning workers only pays off for bulk indexing
+        elif self.encode_processes > 1 and len(texts) >= self.batch_size * self.encode_processes:
+            pool = self.embedding_model.start_multi_process_pool(
+                target_devices=["cpu"] * self.encode_processes
+            )
+            try:
+                embeddings = self.embedding_model.encode_multi_process(
+                    texts, pool, batch_size=self.batch_size
+                )
+            finally:
+                self.embedding_model.stop_multi_process_pool(pool)
+        else:
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    @contextmanager
+    def encode_pool(self):
+        """Keep one multi-process encode pool open for a whole indexing run.
+
+        The pipeline embeds chunk by chunk; without this every chunk would
+        spawn the worker processes and reload the model.
+        """
+        if self.encode_processes <= 1 or self._encode_pool is not None:
+            yield
+            return
+        self._encode_pool = self.embedding_model.start_multi_process_pool(
+            target_devices=["cpu"] * self.encode_processes
+        )
+        try:
+            yield
+        finally:
+            pool, self._encode_pool = self._encode_pool, None
+            self.embedding_model.stop_multi_process_pool(pool)
+
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        """Cache key for a query: lower-cased, whitespace collapsed.
+
+        The model is uncased and ignores whitespace, so this never changes
+        the resulting vector.
+        """
+        return " ".join(text.lower().split())
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embedding for a single search query, served from the LRU when repeated."""
+        key = self.normalize_query(text)
+        hit, vector = self.query_embedding_cache.get(key)
+        if hit:
+            return vector
+        vector = self._encode([key])[0].tolist()
+        self.query_embedding_cache.set(key, vector)
+        return vector
+
+    def _write_documents(self, collection, documents, metadatas, ids, upsert: bool = False, embeddings=None) -> int:
+        """Embed documents (unless `embeddings` is given) and add/upsert them in write batches."""
+        if embeddings is None:
+            embeddings = self.embed_documents(documents)
+        write = collection.upsert if upsert else collection.add
+        for start in range(0, len(ids), self.write_batch_size):
+            end = start + self.write_batch_size
+            write(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end].tolist(),
+            )
+        kind = self._kind_of(collection)
+        if kind in self._lexical_signature:
+            self.lexical[kind].add(ids, documents, metadatas)
+        return len(ids)
+
+    # ================== PIPELINE STEPS (see index_pipeline.py) ==================
+    def build_documents(self, kind: str, rows: List[Dict]):
+        """(documents, metadatas, ids) for a chunk of 'posts' or 'seekers' rows."""
+        builder = self._build_post_documents if kind == "posts" else self._build_seeker_documents
+        return builder(rows)
+
+    def write_embedded(self, kind: str, documents, metadatas, ids, embeddings) -> int:
+        """Upsert already-embedded documents into the posts or seekers collection.
 
+        Unlike index_*/upsert_*, errors are raised so the caller can abort.
+        """
+        collection = self._collection(kind)
+        return self._write_documents(collection, documents, metadatas, ids, upsert=True, embeddings=embeddings)
+
+    # ================== POSTS INDEXING (for seekers) ==================
+    def _build_post_documents(self, posts: List[Dict]):
+        """Build (documents, metadatas, ids) for a batch of posts."""
         documents = []
         metadatas = []
         ids = []
@@ -85,69 +563,115 @@ Company Info: {post.get("company_description", "N/A")}
                     "technology": post.get("technology", "") or "",
                     "company_name": post.get("company_name", "") or "",
                     "company_location": post.get("company_location", "") or "",
+                    "company_id": str(post.get("company_id", "") or ""),
+                    "verification_status": post.get("verification_status", "") or "",
                 }
             )
             ids.append(f"post_{post.get('id', 'unknown')}")
 
-        # Add to ChromaDB
+        return documents, metadatas, ids
+
+    def index_posts(self, posts: List[Dict]) -> int:
+        """Index all posts for seeker discovery.
+        
+        Args:
+            posts: List of post dicts with id, position, technology, 
+                   company_name, company_location, description, etc.
+        
+        Returns:
+            Number of posts indexed.
+        """
+        if not posts:
+            print("  No posts to index")
+            return 0
+
+        documents, metadatas, ids = self._build_post_documents(posts)
+
+        # Embed locally, then add vectors to ChromaDB
         try:
-            self.posts_collection.add(documents=documents, metadatas=metadatas, ids=ids)
-            print(f" Indexed {len(documents)} posts")
-            return len(documents)
+            count = self._write_documents(self._collection("posts"), documents, metadatas, ids)
+            print(f" Indexed {count} posts")
+            return count
         except Exception as e:
             print(f" Error indexing posts: {e}")
             return 0
 
+    def upsert_posts(self, posts: List[Dict]) -> int:
+        """Insert or replace posts (incremental reindex). Returns number written."""
+        if not posts:
+            return 0
+
+        documents, metadatas, ids = self._build_post_documents(posts)
+        try:
+            return self._write_documents(
+                self._collection("posts"), documents, metadatas, ids, upsert=True
+            )
+        except Exception as e:
+            print(f" Error upserting posts: {e}")
+            return 0
+
+    def delete_posts(self, post_ids: List) -> int:
+        """Remove posts from the index by DB id."""
+        return self._delete_ids(self._collection("posts"), [f"post_{pid}" for pid in post_ids])
+
+    def get_indexed_post_ids(self) -> Set[int]:
+        """DB ids of every post currently in the index."""
+        return self._indexed_ids(self._collection("posts"), "post_")
+
     def query_posts(
         self,
         query_text: str,
         n_results: int = 5,
-        technology_filter: Optional[str] = None,
+        technology_filter: Union[str, List[str], None] = None,
+        company_location: Union[str, List[str], None] = None,
+        company: Union[str, List[str], None] = None,
+        verification_status: Union[str, List[str], None] = None,
+        match: str = "all",
+        where: Optional[Dict] = None,
     ) -> Dict:
         """Query posts by semantic similarity.
         
         Args:
             query_text: User question or search query.
             n_results: Max results to return.
-            technology_filter: Optional tech to filter by.
+            technology_filter: Optional tech (or list of techs) to filter by.
+            company_location: Optional location(s) to filter by.
+            company: Optional company name(s) to filter by.
+            verification_status: Optional company verification status(es).
+            match: 'all' to AND the filters above, 'any' to OR them.
+            where: Extra ChromaDB-style filter, ANDed with the rest.
         
         Returns:
             Dict with 'documents', 'metadatas', 'distances'.
         """
-        where_clause = None
-        if technology_filter:
-            where_clause = {"technology": technology_filter}
+        if match not in ("all", "any"):
+            raise ValueError(f"match must be 'all' or 'any', got {match!r}")
+        clauses = []
+        for field, value in (
+            ("technology", technology_filter),
+            ("company_location", company_location),
+            ("company_name", company),
+            ("verification_status", verification_status),
+        ):
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                if len(value) == 1:
+                    value = value[0]
+            if isinstance(value, list) and value:
+                clauses.append({field: {"$in": value}})
+            elif value:
+                clauses.append({field: value})
+        where_clause = combine_filters([combine_filters(clauses, match), where])
 
         try:
-            results = self.posts_collection.query(
-                query_texts=[query_text],
-                n_results=n_results,
-                where=where_clause,
-            )
-            return {
-                "documents": results["documents"][0] if results["documents"] else [],
-                "metadatas": results["metadatas"][0] if results["metadatas"] else [],
-                "distances": results["distances"][0] if results["distances"] else [],
-            }
+            return self._retrieve("posts", query_text, n_results, where_clause)
         except Exception as e:
             print(f" Error querying posts: {e}")
             return {"documents": [], "metadatas": [], "distances": []}
 
     # ================== SEEKERS INDEXING (for companies) ==================
-    def index_seekers(self, seekers: List[Dict]) -> int:
-        """Index seeker profiles for company talent search.
-        
-        Args:
-            seekers: List of seeker dicts with id, seeker_name, 
-                     email, skills, description.
-        
-        Returns:
-            Number of seekers indexed.
-        """
-        if not seekers:
-            print("  No seekers to index")
-            return 0
-
+    def _build_seeker_documents(self, seekers: List[Dict]):
+        """Build (documents, metadatas, ids) for a batch of seekers."""
         documents = []
         metadatas = []
         ids = []
@@ -171,19 +695,57 @@ Description: {seeker.get("description", "N/A")}
             )
             ids.append(f"seeker_{seeker.get('id', 'unknown')}")
 
-        # Add to ChromaDB
+        return documents, metadatas, ids
+
+    def index_seekers(self, seekers: List[Dict]) -> int:
+        """Index seeker profiles for company talent search.
+        
+        Args:
+            seekers: List of seeker dicts with id, seeker_name, 
+                     email, skills, description.
+        
+        Returns:
+            Number of seekers indexed.
+        """
+        if not seekers:
+            print("  No seekers to index")
+            return 0
+
+        documents, metadatas, ids = self._build_seeker_documents(seekers)
+
+        # Embed locally, then add vectors to ChromaDB
         try:
-            self.seekers_collection.add(
-                documents=documents, metadatas=metadatas, ids=ids
-            )
-            print(f" Indexed {len(documents)} seekers")
-            return len(documents)
+            count = self._write_documents(self._collection("seekers"), documents, metadatas, ids)
+            print(f" Indexed {count} seekers")
+            return count
         except Exception as e:
             print(f" Error indexing seekers: {e}")
             return 0
 
+    def upsert_seekers(self, seekers: List[Dict]) -> int:
+        """Insert or replace seekers (incremental reindex). Returns number written."""
+        if not seekers:
+            return 0
+
+        documents, metadatas, ids = self._build_seeker_documents(seekers)
+        try:
+            return self._write_documents(
+                self._collection("seekers"), documents, metadatas, ids, upsert=True
+            )
+        except Exception as e:
+            print(f" Error upserting seekers: {e}")
+            return 0
+
+    def delete_seekers(self, seeker_ids: List) -> int:
+        """Remove seekers from the index by DB id."""
+        return self._delete_ids(self._collection("seekers"), [f"seeker_{sid}" for sid in seeker_ids])
+
+    def get_indexed_seeker_ids(self) -> Set[int]:
+        """DB ids of every seeker currently in the index."""
+        return self._indexed_ids(self._collection("seekers"), "seeker_")
+
     def query_seekers(self, query_text: str, n_results: int = 10) -> Dict:
-        """Query seekers by semantic similarity (skills/description).
+        """Query seekers by keyword + semantic similarity (skills/description).
         
         Args:
             query_text: Search query (e.g., "React developers").
@@ -193,30 +755,142 @@ Description: {seeker.get("description", "N/A")}
             Dict with 'documents', 'metadatas', 'distances'.
         """
         try:
-            results = self.seekers_collection.query(
-                query_texts=[query_text], n_results=n_results
-            )
-            return {
-                "documents": results["documents"][0] if results["documents"] else [],
-                "metadatas": results["metadatas"][0] if results["metadatas"] else [],
-                "distances": results["distances"][0] if results["distances"] else [],
-            }
+            return self._retrieve("seekers", query_text, n_results)
         except Exception as e:
             print(f" Error querying seekers: {e}")
             return {"documents": [], "metadatas": [], "distances": []}
 
+    # ================== HYBRID RETRIEVAL ==================
+    def _collection(self, kind: str):
+        """Current posts/seekers collection (re-resolved after a full reindex elsewhere)."""
+        self._sync_collections()
+        return self._opened(kind)
+
+    def _opened(self, kind: str):
+        return self.posts_collection if kind == "posts" else self.seekers_collection
+
+    def _kind_of(self, collection) -> str:
+        return "posts" if collection is self.posts_collection else "seekers"
+
+    def _lexical_source_signature(self, kind: str):
+        """Changes whenever an indexing run (any process) may have changed `kind`."""
+        try:
+            state_mtime = os.path.getmtime(os.path.join(self.persist_directory, "index_state.json"))
+        except OSError:
+            state_mtime = None
+        return state_mtime, self._opened(kind).count()
+
+    def _lexical_index(self, kind: str) -> BM25Index:
+        """The BM25 index for `kind`, (re)loaded from ChromaDB when stale."""
+        self._sync_collections()
+        now = time.monotonic()
+        with self._lexical_lock:
+            if now - self._lexical_checked_at.get(kind, float("-inf")) < self.lexical_check_interval:
+                return self.lexical[kind]
+            self._lexical_checked_at[kind] = now
+            signature = self._lexical_source_signature(kind)
+            if self._lexical_signature.get(kind) != signature:
+                self._load_lexical(kind)
+                self._lexical_signature[kind] = signature
+        return self.lexical[kind]
+
+    def _load_lexical(self, kind: str):
+        """Rebuild the BM25 index from the documents stored in ChromaDB."""
+        started = time.perf_counter()
+        collection = self._opened(kind)
+        index = BM25Index()
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["documents", "metadatas"], limit=self.write_batch_size, offset=offset
+            )
+            if not page["ids"]:
+                break
+            index.add(page["ids"], page["documents"], page["metadatas"])
+            offset += len(page["ids"])
+        self.lexical[kind] = index
+        self.load_times[f"lexical_{kind}_ms"] = self._elapsed_ms(started)
+
+    def _retrieve(self, kind: str, query_text: str, n_results: int, where: Optional[Dict] = None) -> Dict:
+        """Vector search, fused with BM25 by reciprocal rank when hybrid is on.
+
+        Documents only the keyword side found have no vector distance (None).
+        """
+        candidates = max(n_results, self.hybrid_candidates) if self.hybrid else n_results
+        results = self._collection(kind).query(
+            query_embeddings=[self.embed_query(query_text)],
+            n_results=candidates,
+            where=where,
+        )
+        vector = {
+            doc_id: (document, metadata, distance)
+            for doc_id, document, metadata, distance in zip(
+                results["ids"][0] if results["ids"] else [],
+                results["documents"][0] if results["documents"] else [],
+                results["metadatas"][0] if results["metadatas"] else [],
+                results["distances"][0] if results["distances"] else [],
+            )
+        }
+        vector_ranking = list(vector)
+
+        if self.hybrid:
+            lexical = self._lexical_index(kind)
+            keyword_ranking = [doc_id for doc_id, _ in lexical.search(query_text, candidates, where)]
+            ranking = [doc_id for doc_id, _ in reciprocal_rank_fusion([vector_ranking, keyword_ranking], self.rrf_k)]
+        else:
+            lexical = None
+            ranking = vector_ranking
+
+        documents, metadatas, distances = [], [], []
+        for doc_id in ranking[:n_results]:
+            if doc_id in vector:
+                document, metadata, distance = vector[doc_id]
+            else:
+                (document, metadata), distance = lexical.get(doc_id), None
+            documents.append(document)
+            metadatas.append(metadata)
+            distances.append(distance)
+        return {"documents": documents, "metadatas": metadatas, "distances": distances}
+
     # ================== UTILITY ==================
+    def _indexed_ids(self, collection, prefix: str) -> Set[int]:
+        """Numeric DB ids stored in a collection (ids look like '<prefix><id>')."""
+        try:
+            stored = collection.get(include=[])["ids"]
+        except Exception as e:
+            print(f" Error reading indexed ids: {e}")
+            return set()
+        ids = set()
+        for doc_id in stored:
+            suffix = doc_id[len(prefix):]
+            if doc_id.startswith(prefix) and suffix.isdigit():
+                ids.add(int(suffix))
+        return ids
+
+    def _delete_ids(self, collection, ids: List[str]) -> int:
+        if not ids:
+            return 0
+        try:
+            collection.delete(ids=ids)
+            kind = self._kind_of(collection)
+            if kind in self._lexical_signature:
+                self.lexical[kind].remove(ids)
+            return len(ids)
+        except Exception as e:
+            print(f" Error deleting from index: {e}")
+            return 0
+
     def get_posts_count(self) -> int:
         """Total indexed posts."""
         try:
-            return self.posts_collection.count()
+            return self._collection("posts").count()
         except Exception:
             return 0
 
     def get_seekers_count(self) -> int:
         """Total indexed seekers."""
         try:
-            return self.seekers_collection.count()
+            return self._collection("seekers").count()
         except Exception:
             return 0
 
@@ -225,26 +899,46 @@ Description: {seeker.get("description", "N/A")}
         return {
             "posts": self.get_posts_count(),
             "seekers": self.get_seekers_count(),
+            "store": "persistent" if self.persistent else "memory",
+            "backend": self.backend,
+            "collections": self.collection_names,
+            "vector_store": {
+                "posts": self.posts_collection.get_statistics(),
+                "seekers": self.seekers_collection.get_statistics(),
+            } if self.backend == "numpy" else None,
+            "persist_directory": self.persist_directory,
+            "embedding_model": EMBEDDING_MODEL_NAME,
+            "model_loaded": self.model_loaded,
+            "index_status": self.index_status,
+            "load_times": self.load_times,
+            "embedding_cache": self._embedding_cache.get_statistics() if self._embedding_cache else None,
+            "query_embedding_cache": self.query_embedding_cache.get_statistics(),
+            "hybrid": self.hybrid,
+            "lexical": {kind: index.get_statistics() for kind, index in self.lexical.items()},
         }
 
     def clear_all_data(self):
-        """Clear all indexed data from ChromaDB."""
-        try:
-            self.client.delete_collection("internship_posts")
-            self.client.delete_collection("seekers_profiles")
-            print(" All ChromaDB collections cleared")
-        except Exception as e:
-            print(f"  Error clearing data: {e}")
+        """Clear all indexed data (every collection generation) from ChromaDB.
+
+        Running API processes lose their collections too; a full reindex
+        should use begin_rebuild()/finish_rebuild() instead.
+        """
+        aliases = self._read_aliases()
+        names = set(aliases["current"].values()) | set(aliases["previous"].values())
+        names |= {base for base, _ in COLLECTIONS.values()} | set(self.collection_names.values())
+        self._drop_collections(names)
+        if self.persistent and os.path.exists(self._aliases_path):
+            os.remove(self._aliases_path)
+        self._aliases_signature = None
+        print(" All ChromaDB collections cleared")
 
     def reinitialize(self):
         """Reinitialize collections (drops and recreates)."""
         self.clear_all_data()
-        self.posts_collection = self._get_or_create_collection(
-            "internship_posts", "Internship posts indexed for seeker search"
-        )
-        self.seekers_collection = self._get_or_create_collection(
-            "seekers_profiles", "Seeker profiles indexed for company search"
-        )
+        with self._collections_lock:
+            self._open_collections(self._read_aliases()["current"])
+            self._check_collections()
+            self._reset_lexical()
         print(" RAG system reinitialized")
 
 
@@ -1,11 +1,12 @@
 import os
 import json
-from typing import Dict, List, Optional
+import time
+from typing import Dict, Iterator, List, Optional
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.tools import tool
-from langchain.agents import create_agent
+
+from chatbot.intent_router import IntentRouter
+from chatbot.llm_router import LLMRouter
+from chatbot.tool_runner import ToolRunner
 
 # Load .env from parent directory
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -17,66 +18,110 @@ class InternHubAgent:
     Uses @tool decorators and create_agent for clean architecture.
     """
 
-    def __init__(self, db=None, rag=None):
-        """Initialize agent with DB and RAG systems."""
+    def __init__(self, db=None, rag=None, answer_cache=None):
+        """Initialize agent with DB and RAG systems.
+        
+        Args:
+            answer_cache: Optional SemanticAnswerCache for repeated questions.
+        """
         self.db = db
         self.rag = rag
+        self.answer_cache = answer_cache
         
-        # Get LLM with fallback (DeepSeek -> Gemini)
-        self.llm = self._get_llm_with_fallback()
+        # One LLM per configured provider, picked per turn by the router
+        # (circuit breaker, failover, optional hedging)
+        self.llms = self._create_llms()
+        self.llm_router = LLMRouter(list(self.llms))
+        self.llm = self.llms[self.llm_router.providers[0]]
         
-        # Define all tools
+        # Define all tools (memoized per turn/session, timed, run in parallel)
+        self.tool_runner = ToolRunner()
         self.tools = self._create_tools()
+        self.tools_by_name = {t.name: t for t in self.tools}
         
-        # Create the agent
-        self.agent = self._create_chatbot_agent()
+        # Local fast path for common single-tool questions (INTENT_ROUTER_ENABLED=0 disables)
+        self.intent_router = None
+        if os.getenv("INTENT_ROUTER_ENABLED", "1") != "0":
+            self.intent_router = IntentRouter(
+                embed_fn=rag.embed_query if rag else None,
+                vocabulary_fn=self._router_vocabulary,
+            )
+            if self.answer_cache is not None and self.answer_cache.terms_fn is None:
+                # Semantic cache hits must name the same technologies
+                self.answer_cache.terms_fn = self.intent_router.extract_terms
+        
+        # Create one agent per provider over the same tools
+        self.agents = {name: self._create_chatbot_agent(llm) for name, llm in self.llms.items()}
+        self.agent = self.agents[self.llm_router.providers[0]]
 
     def _get_deepseek_model(self):
         """Initialize DeepSeek LLM."""
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model="deepseek-chat",
             temperature=0.6,
             max_tokens=250,
-            timeout=30,
+            timeout=float(os.getenv("LLM_TIMEOUT", 30)),
             api_key=os.getenv("DEEPSEEK_API_KEY"),
             base_url=os.getenv("DEEPSEEK_API_BASE"),
         )
 
     def _get_gemini_model(self):
         """Initialize Gemini LLM as fallback."""
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(
             model="gemini-2.5-flash",
             temperature=0.6,
             max_tokens=250,
-            timeout=30,
+            timeout=float(os.getenv("LLM_TIMEOUT", 30)),
             google_api_key=os.getenv("GEMINI_API_KEY"),
         )
 
-    def _get_llm_with_fallback(self):
-        """Get LLM with DeepSeek primary and Gemini fallback."""
-        try:
-            # Try DeepSeek first
-            deepseek = self._get_deepseek_model()
-            # Test with a simple call
-            deepseek.invoke("test")
-            print(" Using DeepSeek as primary LLM")
-            return deepseek
-        except Exception as e:
-            print(f" DeepSeek failed: {str(e)}")
-            print(" Falling back to Gemini...")
+    def _create_llms(self) -> Dict:
+        """LLMs in priority order (LLM_PROVIDERS, default "deepseek,gemini").
+
+        Providers without an API key are skipped; no test request is sent,
+        so building the agent never waits on the network. If no key is set
+        DeepSeek is used anyway and errors surface at runtime.
+        """
+        factories = {"deepseek": self._get_deepseek_model, "gemini": self._get_gemini_model}
+        api_keys = {"deepseek": "DEEPSEEK_API_KEY", "gemini": "GEMINI_API_KEY"}
+        llms = {}
+        for name in os.getenv("LLM_PROVIDERS", "deepseek,gemini").split(","):
+            name = name.strip().lower()
+            if name not in factories or name in llms or not os.getenv(api_keys[name]):
+                continue
             try:
-                gemini = self._get_gemini_model()
-                print(" Using Gemini as fallback LLM")
-                return gemini
-            except Exception as ge:
-                print(f" Gemini also failed: {str(ge)}")
-                # Return DeepSeek anyway, let errors happen at runtime
-                return self._get_deepseek_model()
+                llms[name] = factories[name]()
+            except Exception as e:
+                print(f" {name} LLM unavailable: {str(e)}")
+        if not llms:
+            llms["deepseek"] = self._get_deepseek_model()
+        print(f" LLM providers: {', '.join(llms)}")
+        return llms
+
+    def warm_up_llm(self) -> Dict[str, float]:
+        """Send one tiny request per provider so connections are open before the first turn.
+
+        Returns:
+            Round-trip time in milliseconds per provider.
+        """
+        timings = {}
+        for name, llm in self.llms.items():
+            started = time.perf_counter()
+            llm.invoke("ping")
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+        return timings
 
     def _create_tools(self):
         """Create all tools for the agent."""
+        from langchain.tools import tool
+        memoized = self.tool_runner.memoize
         
         @tool
+        @memoized
         def get_top_technologies(limit: int = 10) -> str:
             """Get top technologies by demand with percentages.
             Use when user asks: trending, popular, most-used technologies."""
@@ -97,6 +142,7 @@ class InternHubAgent:
                 return f"Error getting technologies: {str(e)}"
 
         @tool
+        @memoized
         def get_technology_details(tech: str) -> str:
             """Get detailed statistics for ONE specific technology with percentages.
             Use when user asks about counts, numbers, or statistics: 
@@ -111,29 +157,26 @@ class InternHubAgent:
                 tech: Technology name (e.g., 'React', 'Python', 'Java')
             """
             try:
-                tech_posts = self.db.get_posts_by_technology(tech, limit=1000)
-                post_count = len(tech_posts) if tech_posts else 0
-                
-                company_count = self.db.get_company_count_by_technology(tech) or 0
-                
-                all_techs = self.db.get_top_technologies(limit=100)
-                total_posts = sum(t['post_count'] for t in all_techs) if all_techs else 1
-                total_companies = sum(t['company_count'] for t in all_techs) if all_techs else 1
+                # One aggregate query: counts, market totals and percentages
+                stats = self.db.get_technology_statistics(tech)
+                tech_stats = stats["technologies"][0]
+                post_count = tech_stats["post_count"]
+                company_count = tech_stats["company_count"]
+                total_posts = stats["total_posts"]
+                total_companies = stats["total_companies"]
                 
                 if post_count == 0:
                     return f"No data found for {tech}."
                 
-                post_pct = (post_count / total_posts * 100) if total_posts > 0 else 0
-                company_pct = (company_count / total_companies * 100) if total_companies > 0 else 0
-                
                 return f"{tech} statistics:\n" \
-                       f"- {post_count} job posts ({post_pct:.1f}% of all jobs)\n" \
-                       f"- {company_count} companies ({company_pct:.1f}% of all companies)\n" \
+                       f"- {post_count} job posts ({tech_stats['post_pct']:.1f}% of all jobs)\n" \
+                       f"- {company_count} companies ({tech_stats['company_pct']:.1f}% of all companies)\n" \
                        f"Total market: {total_posts} jobs across {total_companies} companies"
             except Exception as e:
                 return f"Error getting {tech} details: {str(e)}"
 
         @tool
+        @memoized
         def get_companies_hiring(tech: str) -> str:
             """Get LIST of company NAMES hiring for a specific technology.
             Use ONLY when user wants to see company names/details:
@@ -161,6 +204,7 @@ class InternHubAgent:
                 return f"Error finding companies: {str(e)}"
 
         @tool
+        @memoized
         def search_developers(query: str) -> str:
             """Search for developers/seekers with specific skills.
             Use when user asks: 'Find React developers', 'Show me Python devs'
@@ -169,16 +213,10 @@ class InternHubAgent:
                 query: Search query describing desired skills
             """
             try:
-                # RAG search
+                # Hybrid keyword + semantic search; exact skill matches rank first
                 seekers = self.rag.query_seekers(query, n_results=10)
                 seekers_list = seekers.get("metadatas", [])
                 
-                # Fallback to DB
-                if not seekers_list:
-                    skill = self._extract_skill(query)
-                    if skill:
-                        seekers_list = self.db.get_seekers_by_skill(skill, limit=10)
-                
                 if not seekers_list:
                     return "No developers found matching your criteria."
                 
@@ -194,6 +232,7 @@ class InternHubAgent:
                 return f"Error searching developers: {str(e)}"
 
         @tool
+        @memoized
         def count_developers_with_skill(skill: str) -> str:
             """Count developers with a specific skill and show percentage of talent pool.
             Use when user asks: 'How many Python developers?', 'React developer count?'
@@ -202,11 +241,11 @@ class InternHubAgent:
                 skill: Skill name (e.g., 'React', 'Python')
             """
             try:
-                count = self.db.count_available_seekers_with_skill(skill)
-                
-                # Get total for percentage
-                all_skills = self.db.get_skill_distribution(limit=100)
-                total_seekers = sum(s['seeker_count'] for s in all_skills) if all_skills else 1
+                # Count and talent-pool total are independent; fetch both at once
+                count, total_seekers = self.tool_runner.run_parallel([
+                    (self.db.count_available_seekers_with_skill, (skill,), {}),
+                    (self.db.get_talent_pool_size, (), {}),
+                ])
                 
                 if count == 0:
                     return f"No developers found with {skill} skill."
@@ -220,6 +259,7 @@ class InternHubAgent:
                 return f"Error counting developers: {str(e)}"
 
         @tool
+        @memoized
         def get_skill_distribution() -> str:
             """Get distribution of skills across all developers with percentages.
             Use when user asks: 'What skills do developers have?', 'Skill breakdown?'
@@ -243,6 +283,7 @@ class InternHubAgent:
                 return f"Error getting skill distribution: {str(e)}"
 
         @tool
+        @memoized
         def get_demand_supply_gap() -> str:
             """Get industry demand vs talent supply gap analysis.
             Use when user asks: 'Skills gap?', 'Industry needs vs talent?'
@@ -262,6 +303,7 @@ class InternHubAgent:
                 return f"Error analyzing gap: {str(e)}"
 
         @tool
+        @memoized
         def get_partnership_companies() -> str:
             """Get companies suitable for partnerships (for universities).
             Use when user asks: 'Partnership opportunities?', 'Companies to partner with?'
@@ -283,6 +325,7 @@ class InternHubAgent:
                 return f"Error finding partnerships: {str(e)}"
 
         @tool
+        @memoized
         def get_learning_roadmap(topic: str) -> str:
             """Get learning roadmap for a technology or career path.
             Use when user asks: 'How to learn React?', 'Backend roadmap?'
@@ -325,10 +368,12 @@ class InternHubAgent:
             get_learning_roadmap,
         ]
 
-    def _create_chatbot_agent(self):
+    def _create_chatbot_agent(self, llm):
         """Create the LangChain agent with tools."""
+        from langchain.agents import create_agent
+
         return create_agent(
-            model=self.llm,
+            model=llm,
             tools=self.tools,
             system_prompt="""You are InternHub Assistant, a helpful chatbot for an internship platform.
 
@@ -358,52 +403,132 @@ Available data through tools:
 Be helpful, professional, and data-driven."""
         )
 
-    def _extract_skill(self, query: str) -> Optional[str]:
-        """Extract skill from query."""
-        skills = ["react", "python", "javascript", "java", "nodejs", "typescript", 
-                  "css", "html", "sql", "mongodb", "docker", "kubernetes", "aws"]
-        query_lower = query.lower()
-        for skill in skills:
-            if skill in query_lower:
-                return skill.capitalize()
-        return None
-
-    def get_response(self, query: str, role: str, history: Optional[List[dict]] = None) -> Dict:
+    # ==================== FAST PATH ====================
+    def _router_vocabulary(self) -> List[str]:
+        """Technology and skill names the intent router should recognize."""
+        terms = []
+        if self.db:
+            terms += [t["technology"] for t in self.db.get_technology_usage_counts()]
+            terms += [s["skill"] for s in self.db.get_skill_distribution(limit=500)]
+        return terms
+
+    def _fast_path(self, query: str) -> Optional[Dict]:
+        """Answer directly from one tool when the intent router is confident.
+
+        Returns:
+            Dict with 'response', 'intent', 'tool' and 'args', or None to use the agent.
+        """
+        if self.intent_router is None:
+            return None
+        try:
+            route = self.intent_router.classify(query)
+            if route is None:
+                return None
+            output = self.tools_by_name[route["tool"]].invoke(route["args"])
+        except Exception as e:
+            print(f"  Fast path failed, using the agent: {e}")
+            return None
+        if output.startswith("Error"):
+            return None
+        return {
+            "response": route["template"].format(result=output.strip()),
+            "intent": route["intent"],
+            "tool": route["tool"],
+            "args": route["args"],
+        }
+
+    def _data_version(self):
+        try:
+            return self.db.get_current_data_version() if self.db else None
+        except Exception as e:
+            print(f"  Data version lookup failed: {e}")
+            return None
+
+    def get_response(
+        self,
+        query: str,
+        role: str,
+        history: Optional[List[dict]] = None,
+        session_id: Optional[str] = None,
+    ) -> Dict:
         """Process user query and return response.
         
         Args:
             query: User question
             role: seeker/company/university
             history: Conversation history
+            session_id: Optional conversation/user key; tool results are
+                        memoized across the session's turns, not just this one
             
         Returns:
-            Dict with 'response' and 'intent'
+            Dict with 'response', 'intent' and 'cached'. 'intent' names the
+            path that answered: a fast-path intent (e.g. 'top_technologies'),
+            'tool_based' for the agent, or 'error'.
         """
+        # Only stand-alone questions are cacheable; follow-ups depend on history
+        use_cache = self.answer_cache is not None and not history
+        data_version = self._data_version() if use_cache or session_id is not None else None
+        if use_cache:
+            try:
+                cached = self.answer_cache.lookup(role, query, data_version)
+                if cached:
+                    return {"response": cached["response"], "intent": cached["intent"], "cached": True}
+            except Exception as e:
+                print(f"  Answer cache lookup failed: {e}")
+                use_cache = False
+
+        started = time.perf_counter()
+        with self.tool_runner.turn(session_id, data_version):
+            result = self._fast_path(query)
+            if result is not None:
+                result = {"response": result["response"], "intent": result["intent"]}
+            else:
+                result = self._run_agent(query, role, history)
+        result["cached"] = False
+
+        if use_cache and result.get("intent") != "error":
+            try:
+                self.answer_cache.store(
+                    role, query, result["response"], result["intent"],
+                    time.perf_counter() - started, data_version,
+                )
+            except Exception as e:
+                print(f"  Answer cache store failed: {e}")
+        return result
+
+    def _build_messages(self, query: str, role: str, history: Optional[List[dict]] = None) -> List[dict]:
+        """Agent input: last few history messages plus the role-tagged question."""
+        role_context = {
+            "seeker": "The user is a job seeker looking for internships.",
+            "company": "The user is a company looking to hire interns.",
+            "university": "The user is from a university looking for partnerships.",
+        }
+        
+        context_msg = role_context.get(role, "")
+        
+        # Add history if available
+        messages = []
+        if history:
+            for msg in history[-5:]:  # Last 5 messages
+                messages.append({
+                    "role": msg.get("role", "user"),
+                    "content": msg.get("content", "")
+                })
+        
+        # Add current query with context
+        user_message = f"{context_msg}\n\nUser question: {query}" if context_msg else query
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _run_agent(self, query: str, role: str, history: Optional[List[dict]] = None) -> Dict:
+        """Run the LangChain agent for one turn (no caching)."""
         try:
-            # Build messages with role context
-            role_context = {
-                "seeker": "The user is a job seeker looking for internships.",
-                "company": "The user is a company looking to hire interns.",
-                "university": "The user is from a university looking for partnerships.",
-            }
-            
-            context_msg = role_context.get(role, "")
-            
-            # Add history if available
-            messages = []
-            if history:
-                for msg in history[-5:]:  # Last 5 messages
-                    messages.append({
-                        "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
-                    })
+            messages = self._build_messages(query, role, history)
             
-            # Add current query with context
-            user_message = f"{context_msg}\n\nUser question: {query}" if context_msg else query
-            messages.append({"role": "user", "content": user_message})
-            
-            # Invoke agent
-            result = self.agent.invoke({"messages": messages})
+            # Invoke agent on the healthiest provider (fails over on errors)
+            result = self.llm_router.call(
+                lambda name: self.agents[name].invoke({"messages": messages}, config=self.tool_runner.graph_config())
+            )
             
             # Extract response - result is AIMessage object
             if hasattr(result, 'content'):
@@ -433,6 +558,127 @@ Be helpful, professional, and data-driven."""
                 "intent": "error",
             }
 
+    # ==================== STREAMING ====================
+    @staticmethod
+    def _text_of(content) -> str:
+        """Plain text from a message content (str, or list of parts for Gemini)."""
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return "".join(
+                part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+            )
+        return ""
+
+    def stream_response(
+        self,
+        query: str,
+        role: str,
+        history: Optional[List[dict]] = None,
+        session_id: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """Run one turn and yield progress events as they happen.
+        
+        Arguments as in get_response.
+        
+        Events (dicts with 'event' and 'data'):
+            - tool_start: {'tool', 'args'} when the agent calls a tool
+            - tool_end:   {'tool'} when the tool result is back
+            - token:      {'text'} LLM output as it is generated
+            - done:       {'response', 'intent', 'cached'} final answer ('intent'
+                          as in get_response)
+            - error:      {'detail'} the turn failed (same message as get_response)
+        """
+        use_cache = self.answer_cache is not None and not history
+        data_version = self._data_version() if use_cache or session_id is not None else None
+        with self.tool_runner.turn(session_id, data_version):
+            yield from self._stream_turn(query, role, history, use_cache, data_version)
+
+    def _stream_turn(self, query: str, role: str, history, use_cache: bool, data_version) -> Iterator[Dict]:
+        if use_cache:
+            try:
+                cached = self.answer_cache.lookup(role, query, data_version)
+                if cached:
+                    yield {"event": "token", "data": {"text": cached["response"]}}
+                    yield {"event": "done", "data": {
+                        "response": cached["response"], "intent": cached["intent"], "cached": True,
+                    }}
+                    return
+            except Exception as e:
+                print(f"  Answer cache lookup failed: {e}")
+                use_cache = False
+
+        started = time.perf_counter()
+        fast = self._fast_path(query)
+        if fast is not None:
+            yield {"event": "tool_start", "data": {"tool": fast["tool"], "args": fast["args"]}}
+            yield {"event": "tool_end", "data": {"tool": fast["tool"]}}
+            yield {"event": "token", "data": {"text": fast["response"]}}
+            if use_cache:
+                try:
+                    self.answer_cache.store(
+                        role, query, fast["response"], fast["intent"],
+                        time.perf_counter() - started, data_version,
+                    )
+                except Exception as e:
+                    print(f"  Answer cache store failed: {e}")
+            yield {"event": "done", "data": {"response": fast["response"], "intent": fast["intent"], "cached": False}}
+            return
+
+        final_response = ""
+        try:
+            messages = self._build_messages(query, role, history)
+            stream = self.llm_router.stream(
+                lambda name: self.agents[name].stream(
+                    {"messages": messages},
+                    config=self.tool_runner.graph_config(),
+                    stream_mode=["updates", "messages"],
+                )
+            )
+            for mode, chunk in stream:
+                if mode == "messages":
+                    message, _metadata = chunk
+                    # Only model output; tool results arrive via "updates"
+                    if getattr(message, "type", "") not in ("AIMessageChunk", "ai"):
+                        continue
+                    if getattr(message, "tool_call_chunks", None):
+                        continue
+                    text = self._text_of(message.content)
+                    if text:
+                        yield {"event": "token", "data": {"text": text}}
+                    continue
+
+                # mode == "updates": {node_name: {"messages": [...]}}
+                for update in chunk.values():
+                    for message in (update or {}).get("messages", []):
+                        tool_calls = getattr(message, "tool_calls", None)
+                        if tool_calls:
+                            for call in tool_calls:
+                                yield {"event": "tool_start", "data": {
+                                    "tool": call.get("name"), "args": call.get("args", {}),
+                                }}
+                        elif getattr(message, "type", "") == "tool":
+                            yield {"event": "tool_end", "data": {"tool": getattr(message, "name", None)}}
+                        elif getattr(message, "type", "") == "ai":
+                            final_response = self._text_of(message.content)
+        except Exception as e:
+            import traceback
+            print(f"ERROR in stream_response: {str(e)}")
+            print(traceback.format_exc())
+            yield {"event": "error", "data": {"detail": f"Error: {str(e)}"}}
+            return
+
+        final_response = final_response or "No response generated."
+        if use_cache:
+            try:
+                self.answer_cache.store(
+                    role, query, final_response, "tool_based",
+                    time.perf_counter() - started, data_version,
+                )
+            except Exception as e:
+                print(f"  Answer cache store failed: {e}")
+        yield {"event": "done", "data": {"response": final_response, "intent": "tool_based", "cached": False}}
+
 
 __all__ = ["InternHubAgent"]
 
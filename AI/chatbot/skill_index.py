@@ -0,0 +1,454 @@
+"""
+In-memory inverted index of skills and technologies.
+
+The seeker/post lookups behind the agent tools used to filter with
+LIKE '%term%', which MySQL answers with a full scan of seekers.skills /
+posts.technology (twice for seekers: pivot + free text). SkillIndex keeps
+posting lists instead:
+
+  - seekers: pivot skill names (skills/seeker_skill) + free-text seekers.skills
+  - posts:   posts.technology, with each post's company and created_at
+  - accepted: seekers with an accepted application (for availability counts)
+
+Text is split into phrases on , ; | / newlines and a spaced "and" or "&",
+and each phrase is indexed whole and word by word (connectives such as
+"of" or "with" dropped), so "React Native" is found by "react native" and
+by "react". Unlike LIKE, "java" no longer matches "javascript".
+
+Every phrase and word is folded onto a canonical skill through
+SKILL_ALIASES ("ReactJS", "react.js" and "React" are one skill), and the
+index keeps, per canonical skill, the posts that ask for it (demand) and the
+seekers that list it (supply). Skill distribution and the demand/supply gap
+are read straight from those counters. Supply counts the active pivot
+skills (skills.is_active = 1, like the SQL fallbacks) plus the free-text
+skills; lookups still find seekers by inactive pivot skills, as LIKE did.
+
+Only ids live in memory; callers fetch row details by primary key. The
+index is built on first use, refreshed incrementally (rows updated since
+the last watermark, plus deletions) when the data version changes, and
+rebuilt from scratch every SKILL_INDEX_REBUILD_INTERVAL seconds to pick up
+changes that leave no timestamp (a detached skill). A rebuild fills a new
+snapshot on a background thread and swaps it in whole, so lookups never see
+a half-loaded index; a refresh applies its rows in one step for the same
+reason.
+
+Config (env):
+  - SKILL_INDEX_REFRESH_INTERVAL: seconds between freshness checks (default 30)
+  - SKILL_INDEX_REBUILD_INTERVAL: seconds between full rebuilds (default 3600)
+"""
+
+import heapq
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+_PHRASE_SPLIT = re.compile(r"[,;|/\n]+|\s+(?:and|&)\s+", re.IGNORECASE)
+_EDGE_PUNCTUATION = " \t\"'()[]{}:!?-*"
+
+# Spellings (normalized) folded onto one canonical skill name
+SKILL_ALIASES = {
+    "react": "React", "reactjs": "React", "react.js": "React", "react js": "React",
+    "react native": "React Native", "react-native": "React Native",
+    "node": "Node.js", "nodejs": "Node.js", "node.js": "Node.js", "node js": "Node.js",
+    "vue": "Vue", "vuejs": "Vue", "vue.js": "Vue", "vue js": "Vue",
+    "angular": "Angular", "angularjs": "Angular", "angular.js": "Angular",
+    "next.js": "Next.js", "nextjs": "Next.js", "next js": "Next.js",
+    "express": "Express", "expressjs": "Express", "express.js": "Express",
+    "javascript": "JavaScript", "js": "JavaScript", "es6": "JavaScript",
+    "typescript": "TypeScript", "ts": "TypeScript",
+    "python": "Python", "python3": "Python", "py": "Python",
+    "go": "Go", "golang": "Go",
+    "c#": "C#", "csharp": "C#", "c sharp": "C#",
+    "c++": "C++", "cpp": "C++",
+    ".net": ".NET", "dotnet": ".NET", "asp.net": ".NET",
+    "html": "HTML", "html5": "HTML", "css": "CSS", "css3": "CSS",
+    "tailwind": "Tailwind CSS", "tailwindcss": "Tailwind CSS", "tailwind css": "Tailwind CSS",
+    "postgres": "PostgreSQL", "postgresql": "PostgreSQL",
+    "mysql": "MySQL", "sql": "SQL",
+    "mongo": "MongoDB", "mongodb": "MongoDB",
+    "k8s": "Kubernetes", "kubernetes": "Kubernetes", "docker": "Docker",
+    "aws": "AWS", "amazon web services": "AWS",
+    "php": "PHP", "laravel": "Laravel", "django": "Django", "flutter": "Flutter",
+    "spring boot": "Spring Boot", "springboot": "Spring Boot",
+    "machine learning": "Machine Learning", "ml": "Machine Learning",
+}
+
+# Connectives never indexed as words of a multi-word phrase
+STOP_WORDS = frozenset({
+    "&", "a", "an", "and", "as", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with",
+})
+
+
+def normalize_term(text: str) -> str:
+    """Lower-case, collapse whitespace, trim surrounding punctuation (keeps C++, C#, .NET, Node.js)."""
+    return " ".join((text or "").lower().split()).strip(_EDGE_PUNCTUATION).rstrip(".")
+
+
+def canonical_key(term: str) -> str:
+    """Index key of the canonical skill a spelling refers to."""
+    key = normalize_term(term)
+    return SKILL_ALIASES[key].lower() if key in SKILL_ALIASES else key
+
+
+def display_name(term: str) -> str:
+    """Canonical spelling for aliased skills, the trimmed text otherwise."""
+    key = normalize_term(term)
+    if key in SKILL_ALIASES:
+        return SKILL_ALIASES[key]
+    return " ".join((term or "").split()).strip(_EDGE_PUNCTUATION).rstrip(".")
+
+
+def split_skills(text: str) -> List[str]:
+    """Skill phrases of a string separated by , ; | / newlines or a spaced "and"/"&"."""
+    return [
+        phrase for phrase in _PHRASE_SPLIT.split(text or "")
+        if normalize_term(phrase) and normalize_term(phrase) not in STOP_WORDS
+    ]
+
+
+def _words(phrase: str) -> List[str]:
+    """Canonical keys of a phrase's words, connectives dropped."""
+    words = [normalize_term(word) for word in phrase.split()]
+    return [canonical_key(word) for word in words if word and word not in STOP_WORDS]
+
+
+def tokenize_skills(text: str) -> Set[str]:
+    """Index keys for a skills string: every phrase, plus the words of multi-word phrases."""
+    keys = set()
+    for phrase in split_skills(text):
+        phrase = canonical_key(phrase)
+        keys.add(phrase)
+        if len(phrase.split()) > 1:
+            keys.update(_words(phrase))
+    return keys
+
+
+def _discard(postings: Dict[str, Set[int]], key: str, doc_id: int):
+    ids = postings.get(key)
+    if ids is not None:
+        ids.discard(doc_id)
+        if not ids:
+            del postings[key]
+
+
+class _Postings:
+    """key -> ids, with the reverse map needed to update or remove a document.
+
+    `by_key` holds phrases and their words (for lookups); `by_skill` holds
+    whole phrases only, one entry per canonical skill, and its set sizes are
+    the per-skill counters.
+    """
+
+    def __init__(self):
+        self.by_key: Dict[str, Set[int]] = {}
+        self.by_skill: Dict[str, Set[int]] = {}
+        self.keys_of: Dict[int, Set[str]] = {}
+        self.skills_of: Dict[int, Set[str]] = {}
+
+    def set(self, doc_id: int, skills: Set[str], keys: Set[str]):
+        self.remove(doc_id)
+        self.keys_of[doc_id] = keys
+        self.skills_of[doc_id] = skills
+        for key in keys:
+            self.by_key.setdefault(key, set()).add(doc_id)
+        for skill in skills:
+            self.by_skill.setdefault(skill, set()).add(doc_id)
+
+    def remove(self, doc_id: int):
+        for key in self.keys_of.pop(doc_id, ()):
+            _discard(self.by_key, key, doc_id)
+        for skill in self.skills_of.pop(doc_id, ()):
+            _discard(self.by_skill, skill, doc_id)
+
+    def count(self, skill_key: str) -> int:
+        return len(self.by_skill.get(skill_key, ()))
+
+    def lookup(self, term: str) -> Set[int]:
+        key = canonical_key(term)
+        if key in self.by_key:
+            return self.by_key[key]
+        # Multi-word term that is not an indexed phrase: every word must match
+        words = _words(key)
+        if len(key.split()) < 2 or not words:
+            return set()
+        sets = [self.by_key.get(word, set()) for word in words]
+        return set.intersection(*sets)
+
+
+class _Snapshot:
+    """Everything lookups read; a rebuild fills a new one and swaps it in."""
+
+    def __init__(self):
+        self.seekers = _Postings()
+        self.posts = _Postings()
+        self.post_company: Dict[int, int] = {}
+        self.post_created: Dict[int, object] = {}
+        self.accepted: Set[int] = set()
+        # canonical key -> display spelling (skills.name wins over free text)
+        self.names: Dict[str, str] = {}
+
+    def register(self, text: str, curated: bool = False) -> Set[str]:
+        """Canonical skill keys of `text`, remembering how each is spelled."""
+        skills = set()
+        for phrase in split_skills(text):
+            key = canonical_key(phrase)
+            skills.add(key)
+            if curated or key not in self.names:
+                self.names[key] = display_name(phrase)
+        return skills
+
+    def set_post(self, row: Dict):
+        post_id = int(row["id"])
+        technology = row.get("technology")
+        self.posts.set(post_id, self.register(technology), tokenize_skills(technology))
+        self.post_company[post_id] = row.get("company_id")
+        self.post_created[post_id] = row.get("created_at")
+
+    def remove_post(self, post_id: int):
+        self.posts.remove(post_id)
+        self.post_company.pop(post_id, None)
+        self.post_created.pop(post_id, None)
+
+    def set_seeker(self, row: Dict):
+        pivot, text = row.get("skill_names"), row.get("skills")
+        active = row.get("active_skill_names", pivot)
+        skills = self.register(active, curated=True) | self.register(text)
+        self.seekers.set(int(row["id"]), skills, tokenize_skills(pivot) | tokenize_skills(text))
+
+    def apply(self, post_rows: Iterable[Dict], seeker_rows: Iterable[Dict]):
+        for row in post_rows:
+            self.set_post(row)
+        for row in seeker_rows:
+            self.set_seeker(row)
+
+
+def _rows(chunks: Iterable[List[Dict]]) -> Iterable[Dict]:
+    for rows in chunks:
+        yield from rows
+
+
+class SkillIndex:
+    """Posting lists for seeker skills and post technologies over a DatabaseLoader."""
+
+    def __init__(self, db, refresh_interval: Optional[float] = None, rebuild_interval: Optional[float] = None):
+        self.db = db
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else float(os.getenv("SKILL_INDEX_REFRESH_INTERVAL", 30))
+        )
+        self.rebuild_interval = (
+            rebuild_interval if rebuild_interval is not None
+            else float(os.getenv("SKILL_INDEX_REBUILD_INTERVAL", 3600))
+        )
+
+        self._lock = threading.Lock()        # guards reads/writes of the snapshot
+        self._build_lock = threading.Lock()  # one build/refresh at a time
+        self._data = _Snapshot()
+        self._rebuilding = False
+
+        self._built_at = None
+        self._last_check = 0.0
+        self._watermark = None
+        self._version = None
+        self._builds = 0
+        self._refreshes = 0
+        self._build_ms = None
+        self._refresh_ms = None
+
+    # -------------------- Loading --------------------
+    def rebuild(self):
+        """Load every post/seeker into a new snapshot, then swap it in."""
+        with self._build_lock:
+            started = time.perf_counter()
+            watermark = self.db.get_index_watermark()
+            version = self.db.get_current_data_version()
+            data = _Snapshot()
+            data.apply(_rows(self.db.iter_skill_index_posts()), _rows(self.db.iter_skill_index_seekers()))
+            data.accepted = self.db.get_accepted_seeker_ids()
+            with self._lock:
+                self._data = data
+                self._watermark = watermark
+                self._version = version
+                self._built_at = time.monotonic()
+                self._builds += 1
+                self._build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def _rebuild_in_background(self):
+        """Periodic rebuild off the request path; lookups keep the old snapshot meanwhile."""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"  Skill index rebuild failed: {e}")
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name="skill-index-rebuild", daemon=True).start()
+
+    def refresh(self):
+        """Apply rows changed since the last watermark and drop deleted ones."""
+        with self._build_lock:
+            started = time.perf_counter()
+            since = self._watermark
+            watermark = self.db.get_index_watermark()
+            version = self.db.get_current_data_version()
+            # Read everything first so the changes land in one step
+            posts = list(_rows(self.db.iter_skill_index_posts(since)))
+            seekers = list(_rows(self.db.iter_skill_index_seekers(since)))
+            post_ids = self.db.get_post_ids()
+            seeker_ids = self.db.get_seeker_ids()
+            accepted = self.db.get_accepted_seeker_ids()
+            with self._lock:
+                data = self._data
+                data.apply(posts, seekers)
+                for post_id in set(data.post_company) - post_ids:
+                    data.remove_post(post_id)
+                for seeker_id in set(data.seekers.keys_of) - seeker_ids:
+                    data.seekers.remove(seeker_id)
+                data.accepted = accepted
+                self._watermark = watermark
+                self._version = version
+                self._refreshes += 1
+                self._refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def ensure_fresh(self):
+        """Build on first use; afterwards re-check at most once per refresh interval."""
+        if self._built_at is None:
+            with self._build_lock:
+                needs_build = self._built_at is None
+            if needs_build:
+                self.rebuild()
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if self._rebuilding or now - self._last_check < self.refresh_interval:
+                return
+            self._last_check = now
+
+        if now - self._built_at >= self.rebuild_interval:
+            self._rebuild_in_background()
+            return
+        try:
+            if self.db.get_current_data_version() != self._version:
+                self.refresh()
+            else:
+                # Applications are not part of the data version; availability
+                # is cheap to reload on every check
+                accepted = self.db.get_accepted_seeker_ids()
+                with self._lock:
+                    self._data.accepted = accepted
+        except Exception as e:
+            # Keep serving the last good index
+            print(f"  Skill index refresh failed: {e}")
+
+    # -------------------- Lookups --------------------
+    def seekers_with(self, skill: str) -> Set[int]:
+        """Ids of seekers listing the skill (pivot or free text)."""
+        self.ensure_fresh()
+        with self._lock:
+            return set(self._data.seekers.lookup(skill))
+
+    def count_available_seekers(self, skill: str) -> int:
+        """Seekers with the skill who have no accepted application."""
+        self.ensure_fresh()
+        with self._lock:
+            return len(self._data.seekers.lookup(skill) - self._data.accepted)
+
+    def posts_with(self, technology: str) -> Set[int]:
+        self.ensure_fresh()
+        with self._lock:
+            return set(self._data.posts.lookup(technology))
+
+    def company_count(self, technology: str) -> int:
+        """Distinct companies with a post for the technology."""
+        self.ensure_fresh()
+        with self._lock:
+            return len({self._data.post_company[p] for p in self._data.posts.lookup(technology)})
+
+    def recent_posts(self, technology: str, limit: int) -> List[int]:
+        """Newest `limit` post ids for the technology."""
+        self.ensure_fresh()
+        with self._lock:
+            ids = list(self._data.posts.lookup(technology))
+            created = self._data.post_created
+            ids.sort(key=lambda p: (created.get(p) is not None, created.get(p) or 0, p), reverse=True)
+        return ids[:limit]
+
+    def technology_counts(self, technologies) -> Dict:
+        """Post/company totals and per-technology counts, in technology_statistics_sql's columns."""
+        self.ensure_fresh()
+        with self._lock:
+            data = self._data
+            posted = [post_id for post_id, keys in data.posts.keys_of.items() if keys]
+            row = {
+                "total_posts": len(posted),
+                "total_companies": len({data.post_company[p] for p in posted} - {None}),
+            }
+            for i, technology in enumerate(technologies):
+                ids = data.posts.lookup(technology)
+                row[f"posts_{i}"] = len(ids)
+                row[f"companies_{i}"] = len({data.post_company[p] for p in ids} - {None})
+        return row
+
+    def seeker_count(self) -> int:
+        """Size of the talent pool (all indexed seekers)."""
+        self.ensure_fresh()
+        with self._lock:
+            return len(self._data.seekers.keys_of)
+
+    def skill_distribution(self, limit: int = 15) -> List[Dict]:
+        """Canonical skills by number of seekers listing them (active pivot or free text)."""
+        self.ensure_fresh()
+        with self._lock:
+            top = heapq.nsmallest(
+                limit, self._data.seekers.by_skill.items(), key=lambda item: (-len(item[1]), item[0])
+            )
+            return [{"skill": self._data.names.get(key, key), "seeker_count": len(ids)} for key, ids in top]
+
+    def demand_supply_gap(self, limit: int = 15) -> List[Dict]:
+        """Posts (demand) vs seekers (supply) per canonical skill, largest gap first."""
+        self.ensure_fresh()
+        with self._lock:
+            rows = []
+            for key in self._data.posts.by_skill.keys() | self._data.seekers.by_skill.keys():
+                demand, supply = self._data.posts.count(key), self._data.seekers.count(key)
+                rows.append({
+                    "technology": self._data.names.get(key, key),
+                    "demand": demand,
+                    "supply": supply,
+                    "gap": demand - supply,
+                })
+        return heapq.nlargest(limit, rows, key=lambda row: row["gap"])
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                "built": self._built_at is not None,
+                "posts": len(self._data.post_company),
+                "seekers": len(self._data.seekers.keys_of),
+                "post_keys": len(self._data.posts.by_key),
+                "seeker_keys": len(self._data.seekers.by_key),
+                "canonical_skills": len(self._data.posts.by_skill.keys() | self._data.seekers.by_skill.keys()),
+                "accepted_seekers": len(self._data.accepted),
+                "builds": self._builds,
+                "rebuilding": self._rebuilding,
+                "refreshes": self._refreshes,
+                "last_build_ms": self._build_ms,
+                "last_refresh_ms": self._refresh_ms,
+                "watermark": str(self._watermark) if self._watermark is not None else None,
+            }
+
+
+__all__ = [
+    "SKILL_ALIASES", "STOP_WORDS", "SkillIndex", "canonical_key", "display_name", "normalize_term",
+    "split_skills", "tokenize_skills",
+]
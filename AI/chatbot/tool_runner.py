@@ -0,0 +1,156 @@
+"""
+Tool execution helpers for InternHubAgent: memoization, timing and
+parallel calls.
+
+  - memoize(fn): wraps a tool function so identical calls (same tool, same
+    arguments) inside one turn, or one session, return the first result
+    instead of hitting MySQL/ChromaDB again. The memo for the running turn
+    lives in a context variable; LangGraph copies the context into the
+    threads it runs tools on, so parallel tool calls share it.
+  - per-tool timing: calls, memo hits, average/max milliseconds.
+  - run_parallel(): run independent calls concurrently on a shared pool,
+    so a multi-call answer costs about as much as its slowest call.
+    TOOL_MAX_CONCURRENCY is passed to LangGraph as max_concurrency for the
+    tool calls the model issues in one step, which run in parallel too.
+
+Session memos expire after TOOL_MEMO_SESSION_TTL seconds and are dropped
+when the data version changes.
+
+Config (env):
+  - TOOL_MAX_CONCURRENCY: parallel tool calls per turn (default 4)
+  - TOOL_MEMO_SESSION_TTL: seconds a session's memo is kept (default 120)
+  - TOOL_MEMO_MAX_SESSIONS: sessions kept in memory (default 1000)
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from chatbot.query_cache import QueryCache
+
+_current_memo: contextvars.ContextVar = contextvars.ContextVar("tool_memo", default=None)
+
+
+class ToolRunner:
+    """Per-turn/session memoization and timing for agent tools."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        session_ttl: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+    ):
+        self.max_concurrency = max_concurrency or int(os.getenv("TOOL_MAX_CONCURRENCY", 4))
+        self.sessions = QueryCache(
+            max_size=max_sessions or int(os.getenv("TOOL_MEMO_MAX_SESSIONS", 1000)),
+            default_ttl=session_ttl if session_ttl is not None else float(os.getenv("TOOL_MEMO_SESSION_TTL", 120)),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency * 4, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict] = {}
+
+    # -------------------- Turn / session scope --------------------
+    @contextmanager
+    def turn(self, session_id: Optional[Hashable] = None, data_version: Any = None):
+        """Scope memoization to one turn, or to a session when `session_id` is given."""
+        memo = None
+        if session_id is not None:
+            hit, entry = self.sessions.get(session_id)
+            if hit and entry["version"] == data_version:
+                memo = entry["memo"]
+        if memo is None:
+            memo = {}
+            if session_id is not None:
+                self.sessions.set(session_id, {"version": data_version, "memo": memo})
+        token = _current_memo.set(memo)
+        try:
+            yield memo
+        finally:
+            try:
+                _current_memo.reset(token)
+            except ValueError:
+                # A streaming turn's generator was closed from another context
+                pass
+
+    # -------------------- Memoization / timing --------------------
+    def memoize(self, fn: Callable[..., str]) -> Callable[..., str]:
+        """Memoize and time a tool function (apply under @tool)."""
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            memo = _current_memo.get()
+            key = (name, args, tuple(sorted(kwargs.items())))
+            if memo is not None and key in memo:
+                self._record(name, 0.0, memo_hit=True)
+                return memo[key]
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self._record(name, time.perf_counter() - started)
+            # Errors are not memoized so a retry can succeed
+            if memo is not None and not str(result).startswith("Error"):
+                memo[key] = result
+            return result
+
+        return wrapper
+
+    def _record(self, name: str, seconds: float, memo_hit: bool = False):
+        with self._lock:
+            stats = self._timings.setdefault(
+                name, {"calls": 0, "memo_hits": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            if memo_hit:
+                stats["memo_hits"] += 1
+                return
+            ms = seconds * 1000
+            stats["calls"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+
+    # -------------------- Parallel calls --------------------
+    def run_parallel(self, calls: List[Tuple[Callable, tuple, dict]]) -> List[Any]:
+        """Run (fn, args, kwargs) calls concurrently; results in call order.
+
+        Each call runs in a copy of the caller's context, so memoization
+        still applies. The first exception is re-raised.
+        """
+        if len(calls) <= 1:
+            return [fn(*args, **kwargs) for fn, args, kwargs in calls]
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+            for fn, args, kwargs in calls
+        ]
+        return [future.result() for future in futures]
+
+    def graph_config(self) -> Dict:
+        """LangGraph run config bounding concurrent tool calls in one step."""
+        return {"max_concurrency": self.max_concurrency}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def get_statistics(self) -> Dict:
+        """Per-tool call counts, memo hits and latency."""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": s["calls"],
+                    "memo_hits": s["memo_hits"],
+                    "avg_ms": round(s["total_ms"] / s["calls"], 1) if s["calls"] else 0.0,
+                    "max_ms": round(s["max_ms"], 1),
+                }
+                for name, s in self._timings.items()
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "sessions": self.sessions.get_statistics()["size"],
+            "tools": tools,
+        }
+
+
+__all__ = ["ToolRunner"]
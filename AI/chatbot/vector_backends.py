@@ -0,0 +1,798 @@
+"""
+Vector storage backends for RAGSystem.
+
+RAGSystem talks to its store through the subset of the ChromaDB client and
+collection API it actually uses, so any object providing that subset can
+back it:
+
+  client:     get_collection(name, embedding_function=None)
+              create_collection(name, metadata=None, embedding_function=None)
+              delete_collection(name)
+  collection: metadata, count(), peek(limit)
+              add/upsert(ids, documents, metadatas, embeddings)
+              get(ids=None, include=..., limit=None, offset=0)
+              query(query_embeddings, n_results, where=None)
+              delete(ids)
+
+Backends (RAG_BACKEND):
+  - chroma: ChromaDB (HNSW, approximate), the default
+  - numpy:  NumpyVectorStore below, exact search. For tens of thousands of
+            documents one matrix-vector product over a contiguous float32
+            matrix plus an argpartition top-k beats Chroma's per-query
+            overhead, and memory use is simply rows x dim x 4 bytes.
+
+NumpyCollection files (one directory per collection):
+  - vectors[.N].f32: float32 matrix (capacity x dim), memory-mapped
+  - records.N.jsonl: append-only log of row writes/deletes (id, document, metadata)
+  - meta.json:       dim, collection metadata and uid, committed rows, current
+                     vector file and log generations and the log's length
+
+Like EmbeddingCache, meta.json is replaced atomically after the data files
+are flushed, so a crash mid-write only loses the uncommitted batch.
+
+The indexer (index_data.py) writes while the API process reads the same
+files, so committed rows are never rewritten: an upsert always appends a
+new row and the old one is only marked dead. Once dead rows/superseded log
+entries dominate, the live rows are copied to the next generation of the
+vector file and log, which meta.json then points at; a reader still mapping
+the previous files keeps a consistent (older) view. Every read first checks
+meta.json and replays the log tail another process committed, or reopens
+the collection after a compaction or a delete/recreate (new uid).
+
+Filters use ChromaDB's `where` syntax on both backends: {"field": value},
+{"field": {"$eq"/"$ne"/"$in"/"$nin": ...}}, several fields in one dict
+(AND), and {"$and": [...]} / {"$or": [...]}. NumpyCollection keeps an ID
+set per value of each indexed metadata field (indexed_fields) and resolves
+a filter to candidate rows by set intersection/union before any scoring.
+A selective filter (under GATHER_FRACTION of the rows) scores only those
+rows; otherwise the whole matrix is scored in place and dead or filtered-out
+rows are masked, since gathering would copy most of it. Conditions on
+fields that are not indexed are checked row by row.
+
+Distances follow Chroma's default l2 space: squared euclidean distance,
+which is 2 - 2 * cosine for the unit-length vectors RAGSystem stores.
+
+Quantized mode (RAG_QUANTIZE=int8, numpy backend only): every vector is
+also kept as int8 codes with one scale per dimension (code = x / scale,
+scale = max |x| over the stored rows / 127, plus headroom). Queries score
+all candidates on the codes, in blocks so the float upcast stays small,
+then re-rank a shortlist of k * RAG_RERANK_FACTOR rows against the float32
+vectors. The codes take a quarter of the float matrix's memory; the float
+matrix stays memory-mapped on disk and only shortlisted rows are read, so
+with a persistent store the resident index shrinks about 4x. An in-memory
+store (RAG_STORE=memory) has to keep the float matrix for re-ranking as
+well, so there int8 costs a quarter more memory and only speeds up scans;
+memory_bytes() reports what is actually resident. A larger
+rerank factor buys recall back. With RAG_QUANT_RECALL_SAMPLE > 0 that
+fraction of queries is also answered exactly and the observed recall@k is
+reported in get_statistics().
+"""
+
+import json
+import os
+import random
+import shutil
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BACKENDS = ("chroma", "numpy")
+QUANTIZATIONS = ("none", "int8")
+
+# Scales leave room for values a little beyond the current per-dimension max
+SCALE_HEADROOM = 1.1
+# Rows upcast per block when scoring int8 codes
+SCORE_BLOCK_ROWS = 8192
+# Filters keeping fewer than this fraction of the rows gather just those rows;
+# broader ones score the whole matrix in place and mask the rest
+GATHER_FRACTION = 0.25
+
+
+def _condition(value, condition) -> bool:
+    if not isinstance(condition, dict):
+        return value == condition
+    (operator, operand), = condition.items()
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    raise ValueError(f"Unsupported filter operator {operator!r}")
+
+
+def matches(metadata: Optional[Dict], where: Optional[Dict]) -> bool:
+    """Evaluate a ChromaDB-style `where` filter against one metadata dict."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, clause) for clause in condition):
+                return False
+        elif not _condition(metadata.get(key), condition):
+            return False
+    return True
+
+
+def combine_filters(clauses: List[Dict], match: str = "all") -> Optional[Dict]:
+    """Join `where` clauses with $and (match='all') or $or (match='any')."""
+    clauses = [clause for clause in clauses if clause]
+    if len(clauses) <= 1:
+        return clauses[0] if clauses else None
+    return {"$and" if match == "all" else "$or": clauses}
+
+
+class NumpyCollection:
+    """Exact cosine search over a (memory-mapped) float32 matrix."""
+
+    def __init__(
+        self,
+        name: str,
+        dim: int,
+        directory: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+        quantize: str = "none",
+        rerank_factor: int = 4,
+        recall_sample: float = 0.0,
+        indexed_fields=(),
+    ):
+        if quantize not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantize!r}, expected one of {QUANTIZATIONS}")
+        self.name = name
+        self.dim = dim
+        self.directory = directory
+        self.metadata = metadata or {}
+        self.quantize = quantize
+        self.rerank_factor = max(1, rerank_factor)
+        self.recall_sample = recall_sample
+        self.indexed_fields = tuple(indexed_fields)
+        self._lock = threading.Lock()
+        self._requantizations = 0
+        self._recall_queries = 0
+        self._recall_hits = 0
+        self._recall_expected = 0
+        # Old vector files/logs to delete once nothing maps them (Windows)
+        self._stale_files: List[str] = []
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._meta_path = os.path.join(directory, "meta.json")
+        self._reset()
+        self._load()
+
+    # -------------------- Storage --------------------
+    def _reset(self):
+        self._ids: List[Optional[str]] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict]] = []
+        self._row_of: Dict[str, int] = {}
+        # field -> value -> rows, plus sorted-array copies built on demand
+        self._value_rows: Dict[str, Dict] = {field: {} for field in self.indexed_fields}
+        self._value_arrays: Dict[tuple, np.ndarray] = {}
+        self._uid = None
+        self._meta_signature = None
+        self._log_entries = 0
+        self._log_bytes = 0
+        self._log_generation = 0
+        self._vector_generation = 0
+        self._vectors = None
+        # int8 codes and per-dimension scales (quantized mode only)
+        self._codes = None
+        self._scales = None
+
+    def _read_meta(self) -> Optional[Dict]:
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _meta_stat(self):
+        # os.replace gives meta.json a new inode on every commit
+        st = os.stat(self._meta_path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self):
+        """Replay the committed part of the log and map the vectors."""
+        meta = None
+        if self.directory is not None:
+            try:
+                signature = self._meta_stat()
+                meta = self._read_meta()
+            except (OSError, ValueError):
+                meta = None
+            if meta is not None and meta.get("dim") != self.dim:
+                print(f"  Vector store {self.directory} has {meta.get('dim')}-dim vectors, expected {self.dim}; starting fresh")
+                meta = None
+        if meta is not None:
+            self.metadata = meta.get("metadata") or self.metadata
+            self._uid = meta.get("uid")
+            self._meta_signature = signature
+            self._log_generation = int(meta.get("log_generation", 0))
+            self._vector_generation = int(meta.get("vector_generation", 0))
+            self._extend(int(meta.get("rows", 0)))
+            self._replay(int(meta.get("log_bytes", 0)))
+        capacity = max(1024, len(self._ids))
+        self._open(capacity)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[list(self._row_of.values())] = True
+        if self.quantize == "int8":
+            self._codes = np.zeros((capacity, self.dim), dtype=np.int8)
+            if self._row_of:
+                self._requantize()
+
+    def _replay(self, log_bytes: int) -> List[int]:
+        """Apply log entries up to `log_bytes`; returns the rows they wrote."""
+        written = []
+        if log_bytes > self._log_bytes:
+            with open(self._log_path, "rb") as f:
+                f.seek(self._log_bytes)
+                data = f.read(log_bytes - self._log_bytes)
+            for line in data.splitlines():
+                entry = json.loads(line)
+                superseded = self._apply(entry["row"], entry.get("id"), entry.get("document"), entry.get("metadata"))
+                if self._vectors is not None:
+                    self._live[entry["row"]] = entry.get("id") is not None
+                    if superseded is not None:
+                        self._live[superseded] = False
+                if entry.get("id") is not None:
+                    written.append(entry["row"])
+                self._log_entries += 1
+            self._log_bytes = log_bytes
+        return written
+
+    def _sync(self):
+        """Pick up what another process (the indexer) committed since we last looked."""
+        if self.directory is None:
+            return
+        try:
+            signature = self._meta_stat()
+            if signature == self._meta_signature:
+                return
+            meta = self._read_meta()
+            if (
+                meta.get("uid") != self._uid
+                or int(meta.get("vector_generation", 0)) != self._vector_generation
+                or int(meta.get("log_generation", 0)) != self._log_generation
+                or int(meta.get("log_bytes", 0)) < self._log_bytes
+            ):
+                # Compacted, or deleted and recreated: reopen from scratch
+                fresh = NumpyCollection(
+                    self.name, self.dim, self.directory, self.metadata, self.quantize,
+                    self.rerank_factor, self.recall_sample, self.indexed_fields,
+                )
+                for key in ("_lock", "_requantizations", "_recall_queries", "_recall_hits", "_recall_expected"):
+                    fresh.__dict__.pop(key)
+                self.__dict__.update(fresh.__dict__)
+                return
+            rows = int(meta.get("rows", 0))
+            self._ensure_capacity(rows)
+            self._extend(rows)
+            written = self._replay(int(meta.get("log_bytes", 0)))
+            if self._codes is not None and written:
+                self._quantize_rows(written, np.asarray(self._vectors[written]))
+            self._meta_signature = signature
+        except (OSError, ValueError):
+            # Caught mid-compaction or mid-rebuild: keep the current view, retry on the next access
+            pass
+
+    @property
+    def _log_path(self) -> str:
+        return os.path.join(self.directory, f"records.{self._log_generation}.jsonl")
+
+    @property
+    def _vectors_path(self) -> str:
+        suffix = f".{self._vector_generation}" if self._vector_generation else ""
+        return os.path.join(self.directory, f"vectors{suffix}.f32")
+
+    def _extend(self, rows: int):
+        grow = rows - len(self._ids)
+        if grow > 0:
+            self._ids.extend([None] * grow)
+            self._documents.extend([None] * grow)
+            self._metadatas.extend([None] * grow)
+
+    def _apply(self, row: int, doc_id: Optional[str], document: Optional[str], metadata: Optional[Dict]) -> Optional[int]:
+        """Write (or clear, doc_id None) one row; returns the row a rewritten id moved away from."""
+        superseded = self._row_of.get(doc_id) if doc_id is not None else None
+        if superseded == row:
+            superseded = None
+        if superseded is not None:
+            self._apply(superseded, None, None, None)
+        previous = self._ids[row]
+        if previous is not None and self._row_of.get(previous) == row:
+            del self._row_of[previous]
+        self._index_metadata(
+            row,
+            (self._metadatas[row] or {}) if previous is not None else None,
+            (metadata or {}) if doc_id is not None else None,
+        )
+        self._ids[row] = doc_id
+        self._documents[row] = document
+        self._metadatas[row] = metadata
+        if doc_id is not None:
+            self._row_of[doc_id] = row
+        return superseded
+
+    def _open(self, capacity: int):
+        """(Re)map the vector file (or allocate in memory), growing to `capacity` rows."""
+        if self.directory is None:
+            vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            if getattr(self, "_vectors", None) is not None:
+                vectors[: len(self._vectors)] = self._vectors
+            self._vectors = vectors
+            return
+        needed = capacity * self.dim * 4
+        mode = "r+b" if os.path.exists(self._vectors_path) else "w+b"
+        with open(self._vectors_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < needed:
+                f.truncate(needed)
+            # The writer may already have grown the file further
+            capacity = max(capacity, f.tell() // (self.dim * 4))
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, rows: int):
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+        if self.directory is not None:
+            self._vectors.flush()
+        self._open(max(rows, capacity * 2))
+        new_capacity = len(self._vectors)
+        live = np.zeros(new_capacity, dtype=bool)
+        live[: len(self._live)] = self._live
+        self._live = live
+        if self._codes is not None:
+            codes = np.zeros((new_capacity, self.dim), dtype=np.int8)
+            codes[: len(self._codes)] = self._codes
+            self._codes = codes
+
+    # -------------------- Quantization --------------------
+    def _requantize(self):
+        """Recompute per-dimension scales from every live row and re-encode them all."""
+        rows = len(self._ids)
+        live = self._live[:rows]
+        peak = np.zeros(self.dim, dtype=np.float32)
+        for start in range(0, rows, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, rows)
+            block = np.abs(self._vectors[start:end][live[start:end]])
+            if len(block):
+                peak = np.maximum(peak, block.max(axis=0))
+        self._scales = np.maximum(peak * SCALE_HEADROOM, 1e-6) / 127
+        for start in range(0, rows, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, rows)
+            self._codes[start:end] = self._encode(self._vectors[start:end])
+        self._requantizations += 1
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors / self._scales), -127, 127).astype(np.int8)
+
+    def _quantize_rows(self, rows: List[int], vectors: np.ndarray):
+        """Encode freshly written rows; rescale everything if they fall outside the scales."""
+        if self._scales is None or np.any(np.abs(vectors) > self._scales * 127):
+            self._requantize()
+        else:
+            self._codes[rows] = self._encode(vectors)
+
+    def _commit(self, entries: List[Dict]):
+        """Flush vectors, append the log entries, then publish meta.json."""
+        self._log_entries += len(entries)
+        if len(self._row_of) * 2 + 1000 < self._log_entries:
+            # Mostly dead rows / superseded entries
+            self._compact()
+        elif self.directory is not None:
+            self._vectors.flush()
+            with open(self._log_path, "ab") as f:
+                f.seek(self._log_bytes)
+                f.truncate()
+                for entry in entries:
+                    f.write(json.dumps(entry).encode("utf-8") + b"\n")
+                self._log_bytes = f.tell()
+        if self.directory is None:
+            return
+        self._write_meta()
+        for path in list(self._stale_files):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+                self._stale_files.remove(path)
+            except OSError:
+                pass  # still mapped (Windows); retried on the next commit
+
+    def _compact(self):
+        """Copy the live rows, renumbered, to the next vector file and log generation.
+
+        The previous files stay valid, for this process until meta.json
+        (written by the caller) points at the new ones and for readers until
+        they reopen.
+        """
+        rows = np.flatnonzero(self._live[: len(self._ids)])
+        capacity = max(1024, 2 * len(rows))
+        if self.directory is not None:
+            self._stale_files += [self._vectors_path, self._log_path]
+            self._vectors.flush()
+        previous = self._vectors
+        self._vector_generation += 1
+        self._log_generation += 1
+        if self.directory is not None and os.path.exists(self._vectors_path):
+            os.remove(self._vectors_path)  # leftover of a compaction that crashed before its commit
+        self._vectors = None
+        self._open(capacity)
+        for start in range(0, len(rows), SCORE_BLOCK_ROWS):
+            block = rows[start:start + SCORE_BLOCK_ROWS]
+            self._vectors[start:start + len(block)] = previous[block]
+        del previous
+        if self._codes is not None:
+            codes = np.zeros((len(self._vectors), self.dim), dtype=np.int8)
+            codes[: len(rows)] = self._codes[rows]
+            self._codes = codes
+
+        ids = [self._ids[row] for row in rows]
+        documents = [self._documents[row] for row in rows]
+        metadatas = [self._metadatas[row] for row in rows]
+        self._ids, self._documents, self._metadatas = [], [], []
+        self._row_of = {}
+        self._value_rows = {field: {} for field in self.indexed_fields}
+        self._value_arrays = {}
+        self._extend(len(rows))
+        for row, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+            self._apply(row, doc_id, document, metadata)
+        self._live = np.zeros(len(self._vectors), dtype=bool)
+        self._live[: len(rows)] = True
+        self._log_entries = len(rows)
+        self._log_bytes = 0
+        if self.directory is not None:
+            self._vectors.flush()
+            with open(self._log_path, "wb") as f:
+                for row, (doc_id, document, metadata) in enumerate(zip(ids, documents, metadatas)):
+                    entry = {"row": row, "id": doc_id, "document": document, "metadata": metadata}
+                    f.write(json.dumps(entry).encode("utf-8") + b"\n")
+                self._log_bytes = f.tell()
+
+    def _write_meta(self):
+        self._uid = self._uid or uuid.uuid4().hex
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "uid": self._uid,
+                "metadata": self.metadata,
+                "rows": len(self._ids),
+                "vector_generation": self._vector_generation,
+                "log_generation": self._log_generation,
+                "log_bytes": self._log_bytes,
+            }, f)
+        os.replace(tmp_path, self._meta_path)
+        self._meta_signature = self._meta_stat()
+
+    # -------------------- Writes --------------------
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict], embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dim embeddings, got shape {embeddings.shape}")
+        with self._lock:
+            self._sync()
+            entries = []
+            written = []
+            for doc_id, document, metadata, vector in zip(ids, documents, metadatas, embeddings):
+                # Always a fresh row: readers may still serve the old one
+                row = len(self._ids)
+                self._ensure_capacity(row + 1)
+                self._extend(row + 1)
+                self._vectors[row] = vector
+                superseded = self._apply(row, doc_id, document, metadata)
+                if superseded is not None:
+                    self._live[superseded] = False
+                self._live[row] = True
+                entries.append({"row": row, "id": doc_id, "document": document, "metadata": metadata})
+                written.append(row)
+            if self._codes is not None and written:
+                self._quantize_rows(written, embeddings[: len(written)])
+            self._commit(entries)
+
+    # Duplicate ids replace the stored row instead of being rejected
+    add = upsert
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            self._sync()
+            entries = []
+            for doc_id in ids:
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    continue
+                self._apply(row, None, None, None)
+                self._live[row] = False
+                entries.append({"row": row, "id": None})
+            if entries:
+                self._commit(entries)
+
+    # -------------------- Reads --------------------
+    def count(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._row_of)
+
+    def _live_rows(self) -> List[int]:
+        return [row for row, doc_id in enumerate(self._ids) if doc_id is not None]
+
+    def peek(self, limit: int = 10) -> Dict:
+        with self._lock:
+            self._sync()
+            rows = self._live_rows()[:limit]
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "embeddings": np.array(self._vectors[rows]) if rows else [],
+                "documents": [self._documents[row] for row in rows],
+                "metadatas": [self._metadatas[row] for row in rows],
+            }
+
+    def get(self, ids: Optional[List[str]] = None, include=("documents", "metadatas"), limit=None, offset: int = 0, where=None) -> Dict:
+        with self._lock:
+            self._sync()
+            if ids is not None:
+                rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            else:
+                rows = self.candidate_rows(where).tolist()
+            rows = rows[offset: offset + limit if limit is not None else None]
+            result = {"ids": [self._ids[row] for row in rows]}
+            if "documents" in include:
+                result["documents"] = [self._documents[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = np.array(self._vectors[rows])
+            return result
+
+    # -------------------- Filtering --------------------
+    def _index_metadata(self, row: int, old: Optional[Dict], new: Optional[Dict]):
+        """Move `row` between the value sets of the indexed fields (None = not live)."""
+        for field in self.indexed_fields:
+            values = self._value_rows[field]
+            if old is not None:
+                before = old.get(field)
+                values[before].discard(row)
+                if not values[before]:
+                    del values[before]
+                self._value_arrays.pop((field, before), None)
+            if new is not None:
+                after = new.get(field)
+                values.setdefault(after, set()).add(row)
+                self._value_arrays.pop((field, after), None)
+
+    def _value_array(self, field: str, value) -> np.ndarray:
+        key = (field, value)
+        array = self._value_arrays.get(key)
+        if array is None:
+            rows = self._value_rows[field].get(value, ())
+            array = np.fromiter(sorted(rows), dtype=np.int64, count=len(rows))
+            self._value_arrays[key] = array
+        return array
+
+    def _leaf_rows(self, field: str, condition, live: np.ndarray) -> np.ndarray:
+        if field not in self._value_rows:
+            return np.array([row for row in live if _condition((self._metadatas[row] or {}).get(field), condition)], dtype=np.int64)
+        operator, operand = next(iter(condition.items())) if isinstance(condition, dict) else ("$eq", condition)
+        if operator in ("$eq", "$ne"):
+            rows = self._value_array(field, operand)
+        elif operator in ("$in", "$nin"):
+            rows = np.unique(np.concatenate([self._value_array(field, v) for v in operand] or [np.empty(0, np.int64)]))
+        else:
+            raise ValueError(f"Unsupported filter operator {operator!r}")
+        return np.setdiff1d(live, rows, assume_unique=True) if operator in ("$ne", "$nin") else rows
+
+    def _filter_rows(self, where: Dict, live: np.ndarray) -> np.ndarray:
+        """Sorted rows matching `where` (live rows only)."""
+        parts = []
+        for key, condition in where.items():
+            if key == "$and":
+                parts.append(self._and([self._filter_rows(clause, live) for clause in condition]))
+            elif key == "$or":
+                rows = [self._filter_rows(clause, live) for clause in condition]
+                parts.append(np.unique(np.concatenate(rows)) if rows else np.empty(0, np.int64))
+            else:
+                parts.append(self._leaf_rows(key, condition, live))
+        return self._and(parts)
+
+    @staticmethod
+    def _and(parts: List[np.ndarray]) -> np.ndarray:
+        # Smallest first keeps every intersection cheap
+        parts = sorted(parts, key=len)
+        rows = parts[0] if parts else np.empty(0, np.int64)
+        for other in parts[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def candidate_rows(self, where: Optional[Dict]) -> np.ndarray:
+        """Rows eligible for a query: live and matching `where`, resolved from the value sets."""
+        live = np.flatnonzero(self._live[: len(self._ids)])
+        if not where:
+            return live
+        return self._filter_rows(where, live)
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Positions of the k highest scores, best first."""
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def _approximate_scores(self, codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """query . x for every row, from int8 codes (upcast block by block)."""
+        weighted = query * scales
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            scores[start:start + SCORE_BLOCK_ROWS] = codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32) @ weighted
+        return scores
+
+    @staticmethod
+    def _candidate_scores(score, matrix, candidates: np.ndarray, excluded: Optional[np.ndarray]) -> np.ndarray:
+        """score(rows) over just the candidates (excluded None) or over all rows with the rest at -inf.
+
+        Gathering copies the selected rows, so it only pays off for selective
+        filters; otherwise the whole matrix is scored in place.
+        """
+        if excluded is None:
+            return score(matrix[candidates])
+        scores = score(matrix)
+        scores[excluded] = -np.inf
+        return scores
+
+    def _search(self, vectors, codes, scales, candidates: np.ndarray, excluded, query: np.ndarray, k: int):
+        """(rows, float scores) of the top k candidates."""
+        gathered = excluded is None
+
+        def rows_of(positions):
+            return candidates[positions] if gathered else positions
+
+        def exact_scores(matrix):
+            return matrix @ query
+
+        if codes is None:
+            scores = self._candidate_scores(exact_scores, vectors, candidates, excluded)
+            top = self._top(scores, k)
+            return rows_of(top), scores[top]
+
+        approximate = self._candidate_scores(
+            lambda matrix: self._approximate_scores(matrix, scales, query), codes, candidates, excluded
+        )
+        shortlist = rows_of(self._top(approximate, min(len(candidates), k * self.rerank_factor)))
+        exact = vectors[shortlist] @ query
+        best = self._top(exact, k)
+        top, top_scores = shortlist[best], exact[best]
+
+        if self.recall_sample and random.random() < self.recall_sample:
+            truth = rows_of(self._top(self._candidate_scores(exact_scores, vectors, candidates, excluded), k))
+            with self._lock:
+                self._recall_queries += 1
+                self._recall_hits += len(set(truth.tolist()) & set(top.tolist()))
+                self._recall_expected += k
+        return top, top_scores
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict] = None, **kwargs) -> Dict:
+        """Top-k by cosine similarity; Chroma-shaped result lists (one per query).
+
+        Exact in float mode; int8 mode re-ranks a shortlist at full precision.
+        """
+        with self._lock:
+            self._sync()
+            rows = len(self._ids)
+            vectors = self._vectors[:rows]
+            codes = self._codes[:rows] if self._codes is not None else None
+            scales = self._scales
+            candidates = self.candidate_rows(where)
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+
+        # Dead rows and filtered-out rows are masked unless the filter is selective
+        excluded = None
+        if len(candidates) >= rows * GATHER_FRACTION:
+            excluded = np.ones(rows, dtype=bool)
+            excluded[candidates] = False
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query in np.asarray(query_embeddings, dtype=np.float32):
+            picked, distances = [], []
+            if len(candidates):
+                picked, scores = self._search(vectors, codes, scales, candidates, excluded, query, min(n_results, len(candidates)))
+                distances = (2 - 2 * scores).tolist()
+            result["ids"].append([ids[row] for row in picked])
+            result["documents"].append([documents[row] for row in picked])
+            result["metadatas"].append([metadatas[row] for row in picked])
+            result["distances"].append(distances)
+        return result
+
+    def scan_bytes(self) -> int:
+        """Bytes of the matrix every query scans (codes when quantized)."""
+        return len(self._ids) * self.dim * (1 if self._codes is not None else 4)
+
+    def memory_bytes(self) -> int:
+        """Resident index bytes: the scanned matrix, plus the float32 matrix
+        kept in memory for re-ranking when quantized without a memory map."""
+        float_bytes = len(self._ids) * self.dim * 4
+        if self._codes is None:
+            return float_bytes
+        return self.scan_bytes() + (float_bytes if self.directory is None else 0)
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            stats = {
+                "documents": len(self._row_of),
+                "rows": len(self._ids),
+                "quantize": self.quantize,
+                "scan_mb": round(self.scan_bytes() / (1024 * 1024), 2),
+                "resident_mb": round(self.memory_bytes() / (1024 * 1024), 2),
+                "float_mb": round(len(self._ids) * self.dim * 4 / (1024 * 1024), 2),
+                "memory_mapped": self.directory is not None,
+                "filter_index": {field: len(values) for field, values in self._value_rows.items()},
+            }
+            if self._codes is not None:
+                stats.update(
+                    rerank_factor=self.rerank_factor,
+                    requantizations=self._requantizations,
+                    sampled_queries=self._recall_queries,
+                    sampled_recall=(
+                        round(self._recall_hits / self._recall_expected, 4) if self._recall_expected else None
+                    ),
+                )
+            return stats
+
+
+class NumpyVectorStore:
+    """Client for NumpyCollections, on disk under `directory` or in memory (None)."""
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        dim: int,
+        quantize: str = "none",
+        rerank_factor: int = 4,
+        recall_sample: float = 0.0,
+        indexed_fields=(),
+    ):
+        self.directory = directory
+        self.dim = dim
+        # Passed to every collection
+        self.options = {
+            "quantize": quantize,
+            "rerank_factor": rerank_factor,
+            "recall_sample": recall_sample,
+            "indexed_fields": indexed_fields,
+        }
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Optional[str]:
+        return os.path.join(self.directory, name) if self.directory else None
+
+    def get_collection(self, name: str, embedding_function=None) -> NumpyCollection:
+        with self._lock:
+            if name not in self._collections:
+                path = self._path(name)
+                if path is None or not os.path.exists(os.path.join(path, "meta.json")):
+                    raise ValueError(f"Collection {name} does not exist")
+                self._collections[name] = NumpyCollection(name, self.dim, path, **self.options)
+            return self._collections[name]
+
+    def create_collection(self, name: str, metadata: Optional[Dict] = None, embedding_function=None) -> NumpyCollection:
+        with self._lock:
+            collection = NumpyCollection(name, self.dim, self._path(name), metadata, **self.options)
+            if collection.directory is not None:
+                collection._write_meta()
+            self._collections[name] = collection
+            return collection
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+            path = self._path(name)
+            if path is not None and os.path.exists(path):
+                shutil.rmtree(path)
+
+
+__all__ = ["BACKENDS", "QUANTIZATIONS", "NumpyCollection", "NumpyVectorStore", "combine_filters", "matches"]
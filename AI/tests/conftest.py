@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Resolve `chatbot.*` imports like the API and index_data.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
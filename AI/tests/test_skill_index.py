@@ -0,0 +1,72 @@
+from chatbot.skill_index import SkillIndex, canonical_key, split_skills, tokenize_skills
+
+
+class FakeDB:
+    def __init__(self, posts=(), seekers=()):
+        self.posts = list(posts)
+        self.seekers = list(seekers)
+
+    def get_index_watermark(self):
+        return None
+
+    def get_current_data_version(self):
+        return 1
+
+    def iter_skill_index_posts(self, since=None):
+        yield self.posts
+
+    def iter_skill_index_seekers(self, since=None):
+        yield self.seekers
+
+    def get_accepted_seeker_ids(self):
+        return set()
+
+
+def test_split_skills_on_separators_and_connectives():
+    assert split_skills("C++ / Machine Learning and Java") == ["C++ ", " Machine Learning", "Java"]
+    assert split_skills("Docker & Kubernetes; Go|Rust\nSQL") == ["Docker", "Kubernetes", " Go", "Rust", "SQL"]
+    # "&" inside a token and "and" inside a word are not separators
+    assert split_skills("R&D, Android") == ["R&D", " Android"]
+
+
+def test_tokenize_skills_drops_connectives():
+    assert tokenize_skills("C++ / Machine Learning and Java") == {
+        "c++", "machine learning", "machine", "learning", "java",
+    }
+    assert "of" not in tokenize_skills("Basics of Python")
+    assert tokenize_skills("and, &") == set()
+
+
+def test_alias_folding():
+    for spelling in ("React.js", "ReactJS", "react", "React JS", " REACT "):
+        assert canonical_key(spelling) == "react"
+    for spelling in ("Node.js", "nodejs", "Node"):
+        assert canonical_key(spelling) == "node.js"
+    assert canonical_key("C#") == canonical_key("csharp") == "c#"
+    assert canonical_key("C++") == canonical_key("cpp") == "c++"
+    assert canonical_key("C++") != canonical_key("C#")
+    assert tokenize_skills("React.js, ReactJS, react") == {"react"}
+
+
+def test_lookups_match_whole_tokens():
+    index = SkillIndex(FakeDB(posts=[
+        {"id": 1, "company_id": 1, "technology": "Java, Spring Boot"},
+        {"id": 2, "company_id": 2, "technology": "JavaScript, React Native"},
+        {"id": 3, "company_id": 2, "technology": "ReactJS"},
+    ]))
+    assert index.posts_with("java") == {1}
+    assert index.posts_with("react") == {2, 3}
+    assert index.posts_with("react native") == {2}
+    assert index.posts_with("spring and boot") == {1}
+    assert index.company_count("React") == 1
+
+
+def test_distribution_counts_active_pivot_and_free_text_skills():
+    index = SkillIndex(FakeDB(seekers=[
+        {"id": 1, "skill_names": "Cobol, Python", "active_skill_names": "Python", "skills": "ReactJS and Java"},
+        {"id": 2, "skill_names": "Cobol", "active_skill_names": None, "skills": "python, react.js"},
+    ]))
+    distribution = {row["skill"]: row["seeker_count"] for row in index.skill_distribution()}
+    assert distribution == {"Python": 2, "React": 2, "Java": 1}
+    # Inactive pivot skills are still found by lookups
+    assert index.seekers_with("cobol") == {1, 2}
@@ -0,0 +1,181 @@
+import numpy as np
+import pytest
+
+from chatbot.vector_backends import NumpyCollection, matches
+
+DIM = 32
+
+
+def unit_vectors(rng, rows, dim=DIM):
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def write(collection, vectors, metadatas=None, start=0):
+    ids = [f"doc{start + i}" for i in range(len(vectors))]
+    collection.upsert(
+        ids=ids,
+        documents=[f"text {doc_id}" for doc_id in ids],
+        metadatas=metadatas or [{"n": start + i} for i in range(len(vectors))],
+        embeddings=vectors,
+    )
+    return ids
+
+
+def brute_force(vectors, metadatas, query, k, where=None):
+    """Ids of the k nearest live vectors (metadata not None) matching `where`."""
+    rows = [row for row, metadata in enumerate(metadatas) if metadata is not None and matches(metadata, where)]
+    scores = vectors[rows] @ query
+    order = np.argsort(-scores, kind="stable")[:k]
+    return [f"doc{rows[i]}" for i in order]
+
+
+@pytest.fixture(params=["memory", "disk"])
+def directory(request, tmp_path):
+    return None if request.param == "memory" else str(tmp_path / "posts")
+
+
+def test_add_upsert_delete(directory):
+    rng = np.random.default_rng(0)
+    collection = NumpyCollection("posts", DIM, directory)
+    vectors = unit_vectors(rng, 20)
+    write(collection, vectors)
+    assert collection.count() == 20
+
+    # Upserting an existing id replaces it
+    replacement = unit_vectors(rng, 1)
+    collection.upsert(ids=["doc3"], documents=["new"], metadatas=[{"n": -1}], embeddings=replacement)
+    assert collection.count() == 20
+    got = collection.get(ids=["doc3"], include=("documents", "metadatas", "embeddings"))
+    assert got["documents"] == ["new"] and got["metadatas"] == [{"n": -1}]
+    np.testing.assert_allclose(got["embeddings"][0], replacement[0])
+    assert collection.query(replacement, n_results=1)["ids"] == [["doc3"]]
+
+    collection.delete(["doc3", "doc5", "missing"])
+    assert collection.count() == 18
+    assert collection.get(ids=["doc3", "doc5"])["ids"] == []
+    returned = collection.query(vectors, n_results=20)["ids"]
+    assert all("doc3" not in ids and "doc5" not in ids for ids in returned)
+
+    distances = collection.query(vectors[:1], n_results=1)["distances"][0]
+    assert distances == pytest.approx([0.0], abs=1e-5)
+
+
+def test_reopen_and_reader_sync(tmp_path):
+    rng = np.random.default_rng(1)
+    path = str(tmp_path / "posts")
+    writer = NumpyCollection("posts", DIM, path, metadata={"model": "m"})
+    vectors = unit_vectors(rng, 10)
+    write(writer, vectors)
+
+    reader = NumpyCollection("posts", DIM, path)
+    assert reader.count() == 10 and reader.metadata == {"model": "m"}
+
+    # The reader replays rows another instance committed after it opened
+    write(writer, unit_vectors(rng, 5), start=10)
+    writer.delete(["doc0"])
+    assert reader.count() == 14
+    assert reader.get(ids=["doc0", "doc12"])["ids"] == ["doc12"]
+    assert reader.query(vectors[1:2], n_results=1)["ids"] == [["doc1"]]
+
+
+def test_compaction_keeps_live_rows(tmp_path):
+    rng = np.random.default_rng(2)
+    path = str(tmp_path / "posts")
+    collection = NumpyCollection("posts", DIM, path)
+    reader = NumpyCollection("posts", DIM, path)
+
+    # Rewriting the same ids supersedes rows until compaction kicks in
+    for _ in range(30):
+        vectors = unit_vectors(rng, 100)
+        write(collection, vectors)
+    collection.delete([f"doc{i}" for i in range(50)])
+    assert collection._vector_generation > 0
+    assert collection.count() == 50
+    assert len(collection._ids) < 30 * 100
+
+    for instance in (collection, reader, NumpyCollection("posts", DIM, path)):
+        assert instance.count() == 50
+        assert instance.query(vectors[60:61], n_results=1)["ids"] == [["doc60"]]
+        got = instance.get(ids=["doc10", "doc99"], include=("embeddings",))
+        assert got["ids"] == ["doc99"]
+        np.testing.assert_allclose(got["embeddings"][0], vectors[99])
+
+
+FILTERS = [
+    {"company": "c1"},
+    {"company": {"$ne": "c1"}},
+    {"company": {"$in": ["c0", "c3"]}},
+    {"company": {"$nin": ["c0", "c3"]}},
+    {"$and": [{"company": {"$in": ["c1", "c2"]}}, {"status": "verified"}]},
+    {"$or": [{"company": "c4"}, {"status": {"$ne": "verified"}}]},
+    {"company": "c2", "status": {"$ne": "pending"}},
+    # Non-indexed field, checked row by row
+    {"$and": [{"level": {"$in": [1, 2]}}, {"company": {"$ne": "c0"}}]},
+    {"company": "nobody"},
+]
+
+
+@pytest.mark.parametrize("quantize", ["none", "int8"])
+@pytest.mark.parametrize("where", FILTERS)
+def test_filters_match_brute_force(where, quantize):
+    rng = np.random.default_rng(3)
+    collection = NumpyCollection(
+        "posts", DIM, quantize=quantize, rerank_factor=50, indexed_fields=("company", "status")
+    )
+    vectors = unit_vectors(rng, 400)
+    metadatas = [
+        {
+            "company": f"c{rng.integers(5)}",
+            "status": ["verified", "pending", "rejected"][rng.integers(3)],
+            "level": int(rng.integers(4)),
+        }
+        for _ in range(400)
+    ]
+    write(collection, vectors, metadatas)
+    # Dead rows must never come back through a filter
+    collection.delete(["doc0", "doc1", "doc2"])
+    for row in range(3):
+        metadatas[row] = None
+
+    expected_ids = {f"doc{row}" for row, metadata in enumerate(metadatas) if metadata and matches(metadata, where)}
+    assert set(collection.get(where=where)["ids"]) == expected_ids
+
+    queries = unit_vectors(rng, 5)
+    result = collection.query(queries, n_results=10, where=where)
+    for query, ids in zip(queries, result["ids"]):
+        assert ids == brute_force(vectors, metadatas, query, 10, where)
+
+
+def test_int8_recall():
+    rng = np.random.default_rng(4)
+    exact = NumpyCollection("exact", DIM)
+    quantized = NumpyCollection("quantized", DIM, quantize="int8", rerank_factor=4)
+    vectors = unit_vectors(rng, 3000)
+    write(exact, vectors)
+    write(quantized, vectors)
+
+    queries = unit_vectors(rng, 50)
+    expected = exact.query(queries, n_results=10)["ids"]
+    found = quantized.query(queries, n_results=10)["ids"]
+    recall = np.mean([len(set(e) & set(f)) / 10 for e, f in zip(expected, found)])
+    assert recall >= 0.95
+
+
+def test_int8_resident_memory(tmp_path):
+    rng = np.random.default_rng(5)
+    vectors = unit_vectors(rng, 100)
+    float_bytes = 100 * DIM * 4
+    collections = {
+        "float": NumpyCollection("float", DIM),
+        "memory": NumpyCollection("memory", DIM, quantize="int8"),
+        "mapped": NumpyCollection("mapped", DIM, str(tmp_path / "mapped"), quantize="int8"),
+    }
+    for collection in collections.values():
+        write(collection, vectors)
+        assert collection.scan_bytes() == float_bytes // (4 if collection.quantize == "int8" else 1)
+
+    assert collections["float"].memory_bytes() == float_bytes
+    # In memory the float matrix stays resident next to the codes for re-ranking
+    assert collections["memory"].memory_bytes() == float_bytes + float_bytes // 4
+    assert collections["mapped"].memory_bytes() == float_bytes // 4
@@ -44,6 +44,57 @@ public function chat(Request $request)
         }
     }
 
+    public function chatStream(Request $request)
+    {
+        $validated = $request->validate([
+            'message' => 'required|string',
+        ]);
+
+        $user = Auth::user();
+
+        if (!$user) {
+            return response()->json([
+                'error' => 'Unauthorized'
+            ], 401);
+        }
+
+        try {
+            $response = Http::withOptions(['stream' => true])
+                ->timeout(120)
+                ->post($this->pythonApiUrl . '/chat/stream', [
+                    'message' => $validated['message'],
+                    'user_role' => $user->role,
+                    'user_id' => $user->id,
+                    'conversation_history' => $request->input('history', [])
+                ]);
+        } catch (\Exception $e) {
+            return response()->json([
+                'error' => 'Chatbot service unavailable',
+                'message' => $e->getMessage()
+            ], 503);
+        }
+
+        if ($response->failed()) {
+            return response()->json($response->json(), $response->status());
+        }
+
+        // Relay the Server-Sent Events as they arrive instead of buffering the whole answer
+        return response()->stream(function () use ($response) {
+            $body = $response->toPsrResponse()->getBody();
+            while (!$body->eof()) {
+                echo $body->read(1024);
+                if (ob_get_level() > 0) {
+                    ob_flush();
+                }
+                flush();
+            }
+        }, 200, [
+            'Content-Type' => 'text/event-stream',
+            'Cache-Control' => 'no-cache',
+            'X-Accel-Buffering' => 'no',
+        ]);
+    }
+
     public function getStatistics()
     {
         try {
@@ -152,6 +152,7 @@
     // Chatbot routes
     Route::middleware('auth:sanctum')->group(function () {
         Route::post('/chatbot/chat', [ChatbotController::class, 'chat']);
+        Route::post('/chatbot/chat/stream', [ChatbotController::class, 'chatStream']);
         Route::get('/chatbot/statistics', [ChatbotController::class, 'getStatistics']);
     });
 });